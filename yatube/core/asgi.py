@@ -0,0 +1,187 @@
+"""ASGI-обёртка над WSGI-приложением Django.
+
+Django 2.2 не умеет ни ASGI, ни асинхронных view, поэтому view остаются
+синхронными и выполняются в ограниченном пуле потоков. Чтение тела
+запроса и отправка ответа идут в цикле событий: медленный клиент держит
+только корутину, а поток занят лишь на время работы view и базы.
+"""
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Сколько кусков потокового ответа ждут отправки, пока поток не встанет.
+STREAM_BUFFER = 8
+_DONE = object()
+
+
+def build_environ(scope, body):
+    """WSGI environ из ASGI scope HTTP-запроса."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        # WSGI хранит байты пути как строку latin-1.
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', ()):
+        key = name.decode('latin-1').upper().replace('-', '_')
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = f'HTTP_{key}'
+        value = value.decode('latin-1')
+        if key in environ:
+            value = f'{environ[key]},{value}'
+        environ[key] = value
+    return environ
+
+
+class WsgiToAsgi:
+    """ASGI-приложение, которое вызывает WSGI-приложение в пуле потоков.
+
+    Ответ передаётся из потока через очередь на STREAM_BUFFER кусков:
+    обычный ответ из одного куска отпускает поток сразу, а потоковый
+    ждёт, пока клиент заберёт данные.
+    """
+
+    def __init__(self, wsgi_application, max_workers):
+        self.wsgi_application = wsgi_application
+        self.executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix='asgi')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f'Неподдерживаемый тип ASGI: {scope["type"]}')
+        body = await self.read_body(receive)
+        if body is None:
+            return
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(STREAM_BUFFER)
+        state = {'cancelled': False}
+        producer = loop.run_in_executor(
+            self.executor, self.produce,
+            build_environ(scope, body), queue, loop, state,
+        )
+        try:
+            await self.respond(queue, send)
+        finally:
+            state['cancelled'] = True
+            # Освобождает поток, если он ждёт места в очереди.
+            while not queue.empty():
+                queue.get_nowait()
+            await producer
+
+    async def read_body(self, receive):
+        """Тело запроса целиком или None, если клиент отключился."""
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    async def respond(self, queue, send):
+        started = False
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                if started:
+                    raise item
+                await send({
+                    'type': 'http.response.start', 'status': 500,
+                    'headers': [(b'content-type', b'text/plain')],
+                })
+                await send({
+                    'type': 'http.response.body',
+                    'body': b'Internal Server Error',
+                })
+                return
+            if not started:
+                status, headers = item
+                await send({
+                    'type': 'http.response.start',
+                    'status': status,
+                    'headers': [
+                        (name.lower().encode('latin-1'),
+                         value.encode('latin-1'))
+                        for name, value in headers
+                    ],
+                })
+                started = True
+                continue
+            if item:
+                await send({
+                    'type': 'http.response.body',
+                    'body': item,
+                    'more_body': True,
+                })
+        await send({'type': 'http.response.body', 'body': b''})
+
+    def produce(self, environ, queue, loop, state):
+        """Вызывает WSGI-приложение в потоке пула и кладёт ответ в очередь.
+
+        Закрытие ответа идёт в том же потоке, что и view: Django закрывает
+        подключения к базе текущего потока по сигналу request_finished.
+        """
+        def put(item):
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['start'] = (int(status.split()[0]), headers)
+
+        try:
+            result = self.wsgi_application(environ, start_response)
+        except Exception as error:
+            put(error)
+            return
+        try:
+            self.forward(result, response, put, state)
+        except Exception as error:
+            put(error)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+    def forward(self, result, response, put, state):
+        """Кладёт в очередь начало ответа и куски тела."""
+        for chunk in result:
+            if 'start' in response:
+                put(response.pop('start'))
+            put(chunk)
+            if state['cancelled']:
+                break
+        if 'start' in response:
+            put(response.pop('start'))
+        put(_DONE)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
@@ -0,0 +1,104 @@
+"""Минификация HTML и сжатие ответов gzip или brotli.
+
+Минификация только убирает комментарии и пустые строки: пробельные
+символы вокруг перевода строки становятся одним переводом строки, что
+браузер отображает так же. Содержимое pre, textarea,
+script и style не меняется. Вывод linebreaksbr - это текст с <br>,
+поэтому он отображается как прежде.
+"""
+import gzip
+import re
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from .static import accepted_encodings
+
+PRESERVED = re.compile(
+    rb'(<(pre|textarea|script|style)\b.*?</\2\s*>)',
+    re.IGNORECASE | re.DOTALL,
+)
+# Условные комментарии IE оставляем.
+COMMENT = re.compile(rb'<!--(?!\[if).*?-->', re.DOTALL)
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript',
+    'application/xml', 'image/svg+xml',
+)
+GZIP_LEVEL = 6
+# Качество brotli для ответов на лету: 11 - для статики, здесь слишком
+# дорого по процессору.
+BROTLI_QUALITY = 5
+
+
+def _collapse(text):
+    """Пробельные символы вокруг переводов строк - один перевод строки.
+
+    Строки обрезаются str.strip() вместо регулярного выражения: так
+    быстрее в несколько раз. Пробелы внутри строки остаются как есть.
+    """
+    collapsed = b'\n'.join(filter(None, [
+        line.strip() for line in text.split(b'\n')]))
+    # Пробелы на краях куска отделяют его от сохраняемых блоков.
+    if not collapsed:
+        return b'\n' if text else b''
+    if text[:1].isspace():
+        collapsed = b'\n' + collapsed
+    if text[-1:].isspace():
+        collapsed += b'\n'
+    return collapsed
+
+
+def minify_html(content):
+    """HTML в UTF-8 без комментариев и пустых строк.
+
+    Работает с байтами: в UTF-8 пробельные символы ASCII не встречаются
+    внутри многобайтных символов, а неразрывный пробел не затрагивается.
+    """
+    parts = PRESERVED.split(content)
+    minified = []
+    # split с двумя группами: текст, сохраняемый блок, имя тега, текст...
+    for position in range(0, len(parts), 3):
+        minified.append(_collapse(COMMENT.sub(b'', parts[position])))
+        if position + 1 < len(parts):
+            minified.append(parts[position + 1])
+    return b''.join(minified)
+
+
+def choose_encoding(accept_encoding):
+    """br или gzip из заголовка Accept-Encoding, иначе None."""
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, GZIP_LEVEL, mtime=0)
+
+
+def compress_stream(chunks, encoding):
+    """Сжимает поток кусков, отдавая сжатое после каждого куска."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+    # wbits 16 + MAX_WBITS - формат gzip с заголовком и CRC.
+    compressor = zlib.compressobj(
+        GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        data += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,128 @@
+"""Очередь исходящей почты в таблице core.OutboundEmail.
+
+queue_mail() только записывает письма и ставит задачу send_queued, так
+что запрос не ждёт почтовый сервер. Задача отправляет письма пачками по
+MAIL_BATCH_SIZE через одно подключение EMAIL_BACKEND. Получателю уходит
+не больше MAIL_RECIPIENT_LIMIT писем за MAIL_RECIPIENT_PERIOD секунд,
+лишние письма не ставятся в очередь. Отправленные и неудачные письма
+старше этого периода для ограничения не нужны и удаляются задачей.
+"""
+import datetime
+import smtplib
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import OutboundEmail
+from .tasks import claim_rows, task
+
+# Ошибки отдельного письма; остальные ошибки значат, что отправка
+# невозможна, и задача повторится.
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError,
+                  smtplib.SMTPSenderRefused)
+
+
+def period_start():
+    return timezone.now() - datetime.timedelta(
+        seconds=settings.MAIL_RECIPIENT_PERIOD)
+
+
+def limited_recipients(recipients):
+    """Получатели, которые исчерпали лимит писем за период."""
+    since = period_start()
+    return set(OutboundEmail.objects.filter(
+        to__in=recipients, created__gte=since,
+    ).values('to').annotate(sent=Count('pk')).filter(
+        sent__gte=settings.MAIL_RECIPIENT_LIMIT,
+    ).values_list('to', flat=True))
+
+
+def queue_mail(subject, message, from_email, recipient_list,
+               html_message=None):
+    """Ставит письмо в очередь, как send_mail(); возвращает число писем."""
+    limited = limited_recipients(recipient_list)
+    emails = OutboundEmail.objects.bulk_create(
+        OutboundEmail(
+            to=recipient,
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+            subject=subject,
+            body=message,
+            html_body=html_message or '',
+        )
+        for recipient in dict.fromkeys(recipient_list)
+        if recipient not in limited
+    )
+    if emails:
+        send_queued.delay()
+    return len(emails)
+
+
+def build_message(email, connection):
+    message = EmailMultiAlternatives(
+        email.subject, email.body, email.from_email, [email.to],
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def claim_batch():
+    now = timezone.now()
+    stale = now - datetime.timedelta(seconds=settings.TASK_TIMEOUT)
+    ready = OutboundEmail.objects.filter(
+        status__in=(OutboundEmail.QUEUED, OutboundEmail.SENDING),
+    ).exclude(
+        status=OutboundEmail.SENDING, locked_at__gte=stale,
+    ).order_by('pk')
+    return claim_rows(
+        ready, settings.MAIL_BATCH_SIZE, 'mail',
+        status=OutboundEmail.SENDING, locked_at=now)
+
+
+def send_batch(emails, connection):
+    """Отправляет письма через открытое подключение."""
+    for position, email in enumerate(emails):
+        try:
+            connection.send_messages([build_message(email, connection)])
+        except MESSAGE_ERRORS as error:
+            email.status = OutboundEmail.FAILED
+            email.last_error = str(error)
+        except Exception:
+            # Письма, до которых не дошли, вернутся в очередь при повторе.
+            OutboundEmail.objects.filter(
+                pk__in=[rest.pk for rest in emails[position:]],
+            ).update(status=OutboundEmail.QUEUED, locked_by='')
+            raise
+        else:
+            email.status = OutboundEmail.SENT
+            email.sent_at = timezone.now()
+        email.save(update_fields=['status', 'last_error', 'sent_at'])
+
+
+def purge_finished():
+    """Удаляет отправленные и неудачные письма старше периода лимита."""
+    OutboundEmail.objects.filter(
+        status__in=(OutboundEmail.SENT, OutboundEmail.FAILED),
+        created__lt=period_start(),
+    ).delete()
+
+
+@task(atomic=False)
+def send_queued():
+    """Отправляет письма из очереди, пока она не опустеет.
+
+    Без общей транзакции: отметка об отправке фиксируется сразу, и
+    повтор задачи не отправит письмо второй раз.
+    """
+    connection = get_connection(fail_silently=False)
+    # Подключение открывается один раз на все пачки.
+    with connection:
+        while True:
+            emails = claim_batch()
+            if not emails:
+                break
+            send_batch(emails, connection)
+    purge_finished()
@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import resolve
+
+from core.metrics import registry
+from core.middleware import MetricsMiddleware
+
+# Бюджет накладных расходов MetricsMiddleware на запрос.
+BUDGET_US = 50
+
+
+class Command(BaseCommand):
+    help = ('Измеряет накладные расходы MetricsMiddleware на запрос '
+            'и на один запрос к базе.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20_000)
+        parser.add_argument(
+            '--queries', type=int, default=3,
+            help='Запросов к базе внутри view.')
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/')
+        request.resolver_match = resolve('/')
+
+        def view(request):
+            with connection.cursor() as cursor:
+                for _ in range(options['queries']):
+                    cursor.execute('SELECT 1')
+            return HttpResponse(content_type='text/plain')
+
+        bare = self.per_request(view, request, options['requests'])
+        wrapped = self.per_request(
+            MetricsMiddleware(view), request, options['requests'])
+        overhead = wrapped - bare
+        registry.clear()
+        self.stdout.write(f'без middleware:  {bare:8.2f} мкс/запрос')
+        self.stdout.write(f'с middleware:    {wrapped:8.2f} мкс/запрос')
+        self.stdout.write(
+            f'накладные:       {overhead:8.2f} мкс/запрос '
+            f'при {options["queries"]} запросах к базе')
+        if overhead < BUDGET_US:
+            self.stdout.write(self.style.SUCCESS(
+                f'В бюджете {BUDGET_US} мкс.'))
+        else:
+            self.stdout.write(self.style.ERROR(
+                f'Больше бюджета {BUDGET_US} мкс.'))
+
+    def per_request(self, handler, request, count):
+        for _ in range(min(count, 1000)):
+            handler(request)
+        start = time.perf_counter()
+        for _ in range(count):
+            handler(request)
+        return (time.perf_counter() - start) / count * 1e6
@@ -0,0 +1,143 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.metrics import Histogram
+from core.sqlite import apply_pragmas
+
+SCHEMA = (
+    'CREATE TABLE post (id INTEGER PRIMARY KEY, text TEXT, '
+    'pub_date REAL, author_id INTEGER)',
+    'CREATE INDEX post_feed_idx ON post (pub_date, id)',
+    'CREATE INDEX post_author_idx ON post (author_id, pub_date, id)',
+)
+FEED_SQL = (
+    'SELECT id, text, pub_date FROM post ORDER BY pub_date DESC LIMIT 10')
+AUTHOR_SQL = (
+    'SELECT id, text, pub_date FROM post WHERE author_id = ? '
+    'ORDER BY pub_date DESC LIMIT 10')
+INSERT_SQL = 'INSERT INTO post (text, pub_date, author_id) VALUES (?, ?, ?)'
+AUTHORS = 100
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает одновременные чтение и запись SQLite с PRAGMA '
+            'по умолчанию и с SQLITE_PRAGMAS, с подключением на каждый '
+            'запрос и с постоянным подключением.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=1)
+        parser.add_argument('--duration', type=float, default=5)
+
+    def handle(self, *args, **options):
+        configs = (
+            ('default', {}, False),
+            ('pragmas', settings.SQLITE_PRAGMAS, False),
+            ('pragmas+reuse', settings.SQLITE_PRAGMAS, True),
+        )
+        self.stdout.write(
+            f'{"config":<14} {"reads/s":>9} {"read p99, ms":>13} '
+            f'{"writes/s":>9} {"write p99, ms":>14} {"errors":>7}')
+        with tempfile.TemporaryDirectory() as directory:
+            for name, pragmas, reuse in configs:
+                path = os.path.join(directory, f'{name}.sqlite3')
+                self.create(path, pragmas, options['posts'])
+                self.run(name, path, pragmas, reuse, options)
+
+    def connect(self, path, pragmas):
+        # isolation_level=None: транзакции задаются явно, как в Django.
+        connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False)
+        apply_pragmas(connection, pragmas)
+        return connection
+
+    def create(self, path, pragmas, posts):
+        connection = self.connect(path, pragmas)
+        for statement in SCHEMA:
+            connection.execute(statement)
+        rng = random.Random(0)
+        connection.execute('BEGIN')
+        connection.executemany(INSERT_SQL, (
+            (f'Пост {i} ' * 20, time.time() - rng.random() * 1e7,
+             rng.randrange(AUTHORS))
+            for i in range(posts)
+        ))
+        connection.execute('COMMIT')
+        connection.close()
+
+    def run(self, name, path, pragmas, reuse, options):
+        self.reads, self.writes = Histogram(), Histogram()
+        self.errors = 0
+        deadline = time.perf_counter() + options['duration']
+        threads = [
+            threading.Thread(
+                target=self.reader, args=(i, path, pragmas, reuse, deadline))
+            for i in range(options['readers'])
+        ] + [
+            threading.Thread(
+                target=self.writer, args=(i, path, pragmas, deadline))
+            for i in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = options['duration']
+        self.stdout.write(
+            f'{name:<14} {self.reads.count / duration:>9.0f} '
+            f'{self.reads.percentile(99) / 1000:>13.2f} '
+            f'{self.writes.count / duration:>9.0f} '
+            f'{self.writes.percentile(99) / 1000:>14.2f} {self.errors:>7}')
+
+    def timed(self, histogram, action):
+        start = time.perf_counter()
+        try:
+            action()
+        except sqlite3.OperationalError:
+            # Потоки считают ошибки без блокировки: замер, а не учёт.
+            self.errors += 1
+            return
+        histogram.record(int((time.perf_counter() - start) * 1e6))
+
+    def reader(self, number, path, pragmas, reuse, deadline):
+        rng = random.Random(number)
+        connection = self.connect(path, pragmas) if reuse else None
+
+        def read():
+            current = connection or self.connect(path, pragmas)
+            current.execute(FEED_SQL).fetchall()
+            current.execute(AUTHOR_SQL, (rng.randrange(AUTHORS),)).fetchall()
+            if current is not connection:
+                current.close()
+
+        while time.perf_counter() < deadline:
+            self.timed(self.reads, read)
+        if connection:
+            connection.close()
+
+    def writer(self, number, path, pragmas, deadline):
+        rng = random.Random(-number)
+        connection = self.connect(path, pragmas)
+
+        def write():
+            # Как post_create: каждый пост в своей транзакции.
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.execute(INSERT_SQL, (
+                    'Новый пост', time.time(), rng.randrange(AUTHORS)))
+                connection.execute('COMMIT')
+            except sqlite3.OperationalError:
+                connection.execute('ROLLBACK')
+                raise
+
+        while time.perf_counter() < deadline:
+            self.timed(self.writes, write)
+        connection.close()
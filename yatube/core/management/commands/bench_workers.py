@@ -0,0 +1,49 @@
+import json
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import Job
+
+TASK = f'{__name__}.pause'
+
+
+def pause(seconds):
+    time.sleep(seconds)
+
+
+class Command(BaseCommand):
+    help = ('Замеряет пропускную способность run_workers: ставит в очередь '
+            'задачи с паузой --task-ms и выполняет их пулом из 1, 2, 4... '
+            'процессов. Нужна база в файле, общая для процессов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=2000)
+        parser.add_argument('--task-ms', type=float, default=1)
+        parser.add_argument('--max-processes', type=int, default=4)
+        parser.add_argument('--batch-size', type=int, default=50)
+
+    def handle(self, *args, **options):
+        payload = json.dumps({
+            'args': [options['task_ms'] / 1000], 'kwargs': {}})
+        self.stdout.write(f'{"processes":>9} {"jobs/s":>9} {"left":>6}')
+        processes = 1
+        while processes <= options['max_processes']:
+            Job.objects.bulk_create(
+                Job(task=TASK, payload=payload, max_attempts=1,
+                    run_at=timezone.now())
+                for _ in range(options['jobs'])
+            )
+            start = time.perf_counter()
+            call_command(
+                'run_workers', processes=processes, burst=True,
+                batch_size=options['batch_size'])
+            duration = time.perf_counter() - start
+            left = Job.objects.filter(task=TASK).count()
+            self.stdout.write(
+                f'{processes:>9} '
+                f'{(options["jobs"] - left) / duration:>9.0f} {left:>6}')
+            Job.objects.filter(task=TASK).delete()
+            processes *= 2
@@ -0,0 +1,75 @@
+import multiprocessing
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.tasks import Worker
+
+# Дочерние процессы наследуют настроенный Django от родителя: при spawn
+# модуль команды импортировал бы модели до django.setup().
+CONTEXT = multiprocessing.get_context('fork')
+
+
+def work(batch_size, poll_interval, burst, stop):
+    """Цикл обработчика в дочернем процессе."""
+    # Остановку по Ctrl+C ведёт родитель через stop, чтобы задача
+    # не прерывалась посередине.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    worker = Worker(batch_size)
+    try:
+        while not stop.is_set():
+            if worker.run_batch():
+                continue
+            if burst:
+                return
+            stop.wait(poll_interval)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = ('Запускает процессы, которые выполняют задачи из очереди '
+            'core.tasks. Останавливается по Ctrl+C или SIGTERM после '
+            'текущих задач.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=settings.TASK_WORKERS)
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.TASK_BATCH_SIZE)
+        parser.add_argument(
+            '--poll-interval', type=float, default=1,
+            help='Пауза в секундах, когда очередь пуста.')
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Завершиться, когда готовых задач не останется.')
+
+    def handle(self, *args, **options):
+        stop = CONTEXT.Event()
+        # Дочерние процессы не должны делить подключения родителя.
+        connections.close_all()
+        processes = [
+            CONTEXT.Process(
+                target=work,
+                args=(options['batch_size'], options['poll_interval'],
+                      options['burst'], stop),
+                name=f'worker-{number}',
+            )
+            for number in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+        signal.signal(signal.SIGTERM, lambda *args: stop.set())
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            stop.set()
+            for process in processes:
+                process.join()
+        failed = sum(process.exitcode != 0 for process in processes)
+        if failed:
+            self.stderr.write(f'Процессов с ошибкой: {failed}')
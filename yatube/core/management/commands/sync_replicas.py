@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.sqlite import copy_database
+from posts import cache
+
+
+class Command(BaseCommand):
+    help = ('Копирует базу default в файлы реплик SQLite из '
+            'DATABASE_REPLICAS. С --interval повторяет копирование, '
+            'пока процесс не остановят.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Пауза между копированиями в секундах; 0 - один раз.')
+
+    def handle(self, *args, **options):
+        targets = self.targets()
+        while True:
+            start = time.perf_counter()
+            for path in targets:
+                copy_database(settings.DATABASES['default']['NAME'], path)
+            # Фрагменты лент, отрисованные со старой копии, не читаются.
+            cache.bump(cache.GROUPS_FEED)
+            if options['verbosity'] >= 1:
+                self.stdout.write(
+                    f'Реплик: {len(targets)}, '
+                    f'{time.perf_counter() - start:.2f} с')
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
+
+    def targets(self):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError(
+                'Реплик нет: задайте SQLITE_REPLICAS=путь[,путь].')
+        databases = [settings.DATABASES['default']] + [
+            settings.DATABASES[alias] for alias in settings.DATABASE_REPLICAS]
+        if any(not database['ENGINE'].endswith('sqlite3')
+               for database in databases):
+            raise CommandError('Реплики поддерживаются только для SQLite.')
+        return [database['NAME'] for database in databases[1:]]
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template import TemplateSyntaxError
+
+from core.templates_warmup import template_names
+
+
+class Command(BaseCommand):
+    help = ('Загружает и компилирует все шаблоны проекта, '
+            'сообщая об ошибках до старта сервера.')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        loaded = 0
+        errors = []
+        for engine, name in template_names():
+            try:
+                engine.get_template(name)
+            except TemplateSyntaxError as error:
+                errors.append(f'{name}: {error}')
+            else:
+                loaded += 1
+        if errors:
+            raise CommandError('\n'.join(errors))
+        self.stdout.write(self.style.SUCCESS(
+            f'Шаблонов загружено: {loaded} за '
+            f'{(time.perf_counter() - start) * 1000:.1f} мс'))
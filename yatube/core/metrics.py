@@ -0,0 +1,150 @@
+"""Метрики запросов в памяти процесса и их вывод для Prometheus.
+
+Значения копятся в гистограммах с логарифмическими корзинами, как в
+HdrHistogram: относительная погрешность не больше 1/HALF_SUB_BUCKETS
+при любом масштабе, а запись - пара битовых операций.
+"""
+import threading
+
+# Точность корзин: 2 ** SUB_BUCKET_BITS корзин на каждую степень двойки.
+SUB_BUCKET_BITS = 5
+HALF_SUB_BUCKETS = 1 << (SUB_BUCKET_BITS - 1)
+
+# Метрика: (описание, множитель для вывода в секунды или штуки).
+# Времена записываются в микросекундах.
+METRICS = {
+    'yatube_request_duration_seconds': (
+        'Время обработки запроса', 1e-6),
+    'yatube_db_duration_seconds': (
+        'Время запросов к базе за один запрос', 1e-6),
+    'yatube_template_render_seconds': (
+        'Время отрисовки шаблонов за один запрос', 1e-6),
+    'yatube_db_queries': (
+        'Число запросов к базе за один запрос', 1),
+    'yatube_compression_seconds': (
+        'Время минификации и сжатия ответа', 1e-6),
+    'yatube_response_bytes_saved': (
+        'Сколько байт ответа сэкономили минификация и сжатие', 1),
+}
+
+
+def bucket_index(value):
+    shift = max(value.bit_length() - SUB_BUCKET_BITS, 0)
+    return (shift << (SUB_BUCKET_BITS - 1)) + (value >> shift)
+
+
+def bucket_upper_bound(index):
+    """Наибольшее значение, попадающее в корзину index."""
+    if index < 2 * HALF_SUB_BUCKETS:
+        return index
+    shift = (index >> (SUB_BUCKET_BITS - 1)) - 1
+    sub_bucket = index - (shift << (SUB_BUCKET_BITS - 1))
+    return ((sub_bucket + 1) << shift) - 1
+
+
+class Histogram:
+    """Гистограмма неотрицательных целых значений."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.lock = threading.Lock()
+
+    def record(self, value):
+        index = bucket_index(value)
+        with self.lock:
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+            self.count += 1
+            self.total += value
+
+    def cumulative(self):
+        """Пары (верхняя граница корзины, число значений не больше неё)."""
+        with self.lock:
+            buckets = sorted(self.buckets.items())
+        seen = 0
+        for index, count in buckets:
+            seen += count
+            yield bucket_upper_bound(index), seen
+
+    def percentile(self, percent):
+        """Верхняя граница корзины, в которую попал процентиль."""
+        rank = self.count * percent / 100
+        for bound, seen in self.cumulative():
+            if seen >= rank:
+                return bound
+        return 0
+
+
+class Registry:
+    """Гистограммы метрик по именам view."""
+
+    def __init__(self):
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def histogram(self, name, view):
+        key = (name, view)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(key, Histogram())
+        return histogram
+
+    def observe(self, view, duration, db_duration, render_duration, queries):
+        """Записывает замеры одного запроса, времена - в микросекундах."""
+        self.histogram('yatube_request_duration_seconds', view).record(
+            duration)
+        self.histogram('yatube_db_duration_seconds', view).record(
+            db_duration)
+        self.histogram('yatube_template_render_seconds', view).record(
+            render_duration)
+        self.histogram('yatube_db_queries', view).record(queries)
+
+    def clear(self):
+        with self.lock:
+            self.histograms.clear()
+
+    def exposition(self):
+        """Все метрики в текстовом формате Prometheus."""
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+        lines = []
+        for name, (help_text, scale) in METRICS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for (metric, view), histogram in histograms:
+                if metric != name:
+                    continue
+                label = f'view="{view}"'
+                for bound, seen in histogram.cumulative():
+                    lines.append(
+                        f'{name}_bucket{{{label},le="{bound * scale:g}"}} '
+                        f'{seen}')
+                lines.append(
+                    f'{name}_bucket{{{label},le="+Inf"}} {histogram.count}')
+                lines.append(
+                    f'{name}_sum{{{label}}} {histogram.total * scale:g}')
+                lines.append(f'{name}_count{{{label}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+class RequestTimings(threading.local):
+    """Время базы и шаблонов текущего запроса в потоке."""
+
+    active = False
+    queries = 0
+    db_duration = 0.0
+    render_duration = 0.0
+
+    def start(self):
+        self.active = True
+        self.queries = 0
+        self.db_duration = 0.0
+        self.render_duration = 0.0
+
+
+timings = RequestTimings()
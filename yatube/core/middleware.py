@@ -0,0 +1,140 @@
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from . import compression
+from .metrics import registry, timings
+from .routers import use_replicas
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def _timed_execute(execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.db_duration += time.perf_counter() - start
+
+
+class MetricsMiddleware:
+    """Записывает в core.metrics время, запросы к базе и отрисовку view.
+
+    Стоит первым в MIDDLEWARE, чтобы время включало остальные middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings.start()
+        # То же, что connection.execute_wrapper(), но без контекстных
+        # менеджеров на каждое подключение.
+        wrapped = connections.all()
+        for connection in wrapped:
+            connection.execute_wrappers.append(_timed_execute)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            for connection in wrapped:
+                connection.execute_wrappers.remove(_timed_execute)
+            timings.active = False
+        duration = time.perf_counter() - start
+        match = request.resolver_match
+        registry.observe(
+            match.view_name if match else 'unresolved',
+            int(duration * 1e6),
+            int(timings.db_duration * 1e6),
+            int(timings.render_duration * 1e6),
+            timings.queries,
+        )
+        return response
+
+
+class ReplicaMiddleware:
+    """Разрешает чтение с реплик в безопасных запросах.
+
+    После запроса с записью ставит cookie REPLICA_PIN_COOKIE на
+    REPLICA_PIN_SECONDS: пока она есть, пользователь читает default.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        safe = request.method in SAFE_METHODS
+        pinned = settings.REPLICA_PIN_COOKIE in request.COOKIES
+        with use_replicas(safe and not pinned):
+            response = self.get_response(request)
+        if not safe:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True,
+            )
+        return response
+
+
+class CompressionMiddleware:
+    """Минифицирует HTML и сжимает ответы по Accept-Encoding.
+
+    Ответы короче COMPRESS_MIN_SIZE и уже сжатые не трогает. Потоковый
+    ответ сжимается по кускам без минификации: тег может оказаться на
+    границе кусков. Сэкономленные байты и время пишет в core.metrics.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (response.has_header('Content-Encoding')
+                or not response.get('Content-Type', '').startswith(
+                    compression.COMPRESSIBLE_TYPES)):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = compression.choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        start = time.perf_counter()
+        if response.streaming:
+            if encoding is None:
+                return response
+            response.streaming_content = compression.compress_stream(
+                response.streaming_content, encoding)
+            del response['Content-Length']
+        elif not self.process_content(response, encoding, view):
+            return response
+        if encoding:
+            response['Content-Encoding'] = encoding
+        # Тело изменилось: сильный ETag больше не верен побайтно.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        registry.histogram('yatube_compression_seconds', view).record(
+            int((time.perf_counter() - start) * 1e6))
+        return response
+
+    def process_content(self, response, encoding, view):
+        """Минифицирует и сжимает тело; False, если ответ не изменён."""
+        content = response.content
+        if len(content) < settings.COMPRESS_MIN_SIZE:
+            return False
+        if (response['Content-Type'].startswith('text/html')
+                and response.charset.lower() == 'utf-8'):
+            content = compression.minify_html(content)
+        if encoding:
+            content = compression.compress(content, encoding)
+        saved = len(response.content) - len(content)
+        if saved <= 0:
+            return False
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        registry.histogram('yatube_response_bytes_saved', view).record(saved)
+        return True
@@ -0,0 +1,81 @@
+from django.db import models
+
+
+class Job(models.Model):
+    """Задача очереди core.tasks: вызов функции task с аргументами payload.
+
+    Выполненные задачи удаляются, неудачные после max_attempts попыток
+    остаются со статусом FAILED и текстом последней ошибки.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+
+    task = models.CharField('Задача', max_length=200)
+    payload = models.TextField('Аргументы в JSON')
+    status = models.CharField(
+        'Статус', max_length=10, choices=STATUSES, default=QUEUED)
+    attempts = models.PositiveIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveIntegerField('Всего попыток')
+    run_at = models.DateTimeField('Запустить не раньше')
+    locked_by = models.CharField('Обработчик', max_length=100, blank=True)
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создана', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+        indexes = [
+            # Выбор готовых задач по порядку запуска.
+            models.Index(fields=['status', 'run_at'], name='job_ready_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.task} ({self.status})'
+
+
+class OutboundEmail(models.Model):
+    """Письмо одному получателю в очереди core.mail."""
+    QUEUED = 'queued'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (SENDING, 'Отправляется'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Ошибка'),
+    )
+
+    to = models.EmailField('Получатель')
+    from_email = models.CharField('Отправитель', max_length=254)
+    subject = models.CharField('Тема', max_length=998)
+    body = models.TextField('Текст')
+    html_body = models.TextField('HTML', blank=True)
+    status = models.CharField(
+        'Статус', max_length=10, choices=STATUSES, default=QUEUED)
+    locked_by = models.CharField('Отправитель очереди', max_length=100,
+                                 blank=True)
+    locked_at = models.DateTimeField('Взято в отправку', null=True,
+                                     blank=True)
+    last_error = models.TextField('Ошибка', blank=True)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Письмо'
+        verbose_name_plural = 'Письма'
+        indexes = [
+            models.Index(fields=['status', 'id'], name='email_queue_idx'),
+            # Подсчёт писем получателю для ограничения частоты.
+            models.Index(fields=['to', 'created'], name='email_to_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
@@ -0,0 +1,54 @@
+"""Чтение постов, групп и пользователей с реплик базы.
+
+Реплики - алиасы из DATABASE_REPLICAS, копии default, которые обновляет
+команда sync_replicas. Роутер отправляет на них чтение только внутри
+безопасных запросов, которые пометил ReplicaMiddleware: сигналы,
+команды и запросы с записью читают default. Пользователь, который
+только что что-то записал, получает cookie REPLICA_PIN_COOKIE и до её
+истечения читает default, поэтому видит свои изменения до копирования.
+"""
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+READ_MODELS = frozenset({'posts.post', 'posts.group', 'auth.user'})
+
+
+class ReplicaState(threading.local):
+    enabled = False
+
+
+state = ReplicaState()
+
+
+@contextmanager
+def use_replicas(enabled=True):
+    """Разрешает или запрещает чтение с реплик в текущем потоке."""
+    previous = state.enabled
+    state.enabled = enabled
+    try:
+        yield
+    finally:
+        state.enabled = previous
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if (state.enabled and replicas
+                and model._meta.label_lower in READ_MODELS):
+            return random.choice(replicas)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же строки, что и default.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
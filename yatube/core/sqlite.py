@@ -0,0 +1,42 @@
+"""Настройка подключений SQLite через PRAGMA.
+
+Обработчик connection_created выполняет SQLITE_PRAGMAS на каждом новом
+подключении SQLite: WAL даёт читателям работать параллельно с записью,
+synchronous=NORMAL в режиме WAL не теряет целостность при сбое процесса,
+а busy_timeout заставляет писателя ждать блокировку вместо ошибки
+"database is locked". Подключение живёт CONN_MAX_AGE секунд, и PRAGMA
+выполняются один раз на подключение, а не на запрос.
+"""
+import sqlite3
+
+from django.conf import settings
+
+
+def apply_pragmas(cursor, pragmas):
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+    if pragmas:
+        with connection.cursor() as cursor:
+            apply_pragmas(cursor, pragmas)
+
+
+def copy_database(source, target):
+    """Копирует файл SQLite source в target через backup API.
+
+    Копия согласована: чтение source идёт в одной транзакции, а читатели
+    target в режиме WAL видят старые данные, пока копирование не
+    завершится.
+    """
+    source_connection = sqlite3.connect(source)
+    target_connection = sqlite3.connect(target)
+    try:
+        source_connection.backup(target_connection)
+    finally:
+        target_connection.close()
+        source_connection.close()
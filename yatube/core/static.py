@@ -0,0 +1,115 @@
+"""WSGI-обёртка, которая отдаёт собранную статику мимо Django.
+
+Файлы STATIC_ROOT читаются в словарь при запуске, поэтому отдаются
+только они и путь не нужно проверять на выход из каталога. Если клиент
+принимает br или gzip, отдаётся сжатая копия из collectstatic. Файлы с
+хэшем в имени из манифеста ManifestStaticFilesStorage кэшируются
+навсегда, остальные - на STATIC_MAX_AGE секунд.
+"""
+import json
+import mimetypes
+import os
+from email.utils import formatdate
+from wsgiref.util import FileWrapper
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+MANIFEST = 'staticfiles.json'
+# Сжатые копии в порядке предпочтения.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding, кроме запрещённых через q=0."""
+    accepted = set()
+    for part in header.split(','):
+        coding, *params = part.strip().split(';')
+        refused = any(
+            param.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00')
+            for param in params)
+        if coding and not refused:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticFile:
+
+    def __init__(self, path, cache_control):
+        stat = os.stat(path)
+        content_type, _ = mimetypes.guess_type(path)
+        # Слабый ETag: сжатые копии не совпадают с файлом побайтно.
+        self.etag = f'W/"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+        self.headers = [
+            ('Content-Type', content_type or 'application/octet-stream'),
+            ('Cache-Control', cache_control),
+            ('Last-Modified', formatdate(stat.st_mtime, usegmt=True)),
+            ('ETag', self.etag),
+        ]
+        self.variants = [(None, path, stat.st_size)]
+        for encoding, suffix in ENCODINGS:
+            if os.path.exists(path + suffix):
+                self.variants.insert(-1, (
+                    encoding, path + suffix,
+                    os.path.getsize(path + suffix)))
+        if len(self.variants) > 1:
+            self.headers.append(('Vary', 'Accept-Encoding'))
+
+    def matches(self, if_none_match):
+        return self.etag in (tag.strip() for tag in if_none_match.split(','))
+
+    def variant(self, accept_encoding):
+        accepted = accepted_encodings(accept_encoding)
+        for encoding, path, size in self.variants:
+            if encoding is None or encoding in accepted:
+                return encoding, path, size
+
+
+class StaticFilesApplication:
+    """Отдаёт файлы root по адресам prefix, остальное - в application."""
+
+    def __init__(self, application, root, prefix, max_age=60):
+        self.application = application
+        self.prefix = prefix
+        self.files = self.scan(root, f'public, max-age={max_age}')
+
+    def scan(self, root, cache_control):
+        files = {}
+        if not root or not os.path.isdir(root):
+            return files
+        immutable = set()
+        manifest = os.path.join(root, MANIFEST)
+        if os.path.exists(manifest):
+            with open(manifest, encoding='utf-8') as source:
+                immutable.update(json.load(source).get('paths', {}).values())
+        for directory, _, names in os.walk(root):
+            for name in names:
+                if name.endswith(('.gz', '.br')) or name == MANIFEST:
+                    continue
+                path = os.path.join(directory, name)
+                relative = os.path.relpath(path, root).replace(os.sep, '/')
+                files[self.prefix + relative] = StaticFile(
+                    path,
+                    IMMUTABLE if relative in immutable else cache_control)
+        return files
+
+    def __call__(self, environ, start_response):
+        static_file = self.files.get(environ.get('PATH_INFO', ''))
+        if static_file is None:
+            return self.application(environ, start_response)
+        method = environ['REQUEST_METHOD']
+        if method not in ('GET', 'HEAD'):
+            start_response('405 Method Not Allowed', [('Allow', 'GET, HEAD')])
+            return []
+        headers = list(static_file.headers)
+        if static_file.matches(environ.get('HTTP_IF_NONE_MATCH', '')):
+            start_response('304 Not Modified', headers)
+            return []
+        encoding, path, size = static_file.variant(
+            environ.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        headers.append(('Content-Length', str(size)))
+        start_response('200 OK', headers)
+        if method == 'HEAD':
+            return []
+        wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+        return wrapper(open(path, 'rb'), 64 * 1024)
@@ -0,0 +1,55 @@
+"""Хранилище статики для продакшена: хэши в именах и сжатые копии.
+
+ManifestStaticFilesStorage добавляет к имени файла хэш содержимого,
+поэтому файл можно кэшировать навсегда. После collectstatic рядом с
+каждым текстовым файлом появляются name.gz и, если установлен Brotli,
+name.br; их отдаёт core.static.StaticFilesApplication.
+"""
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = frozenset({
+    '.css', '.js', '.svg', '.txt', '.html', '.json', '.xml', '.ico',
+    '.map',
+})
+# Сжатая копия не пишется, если экономит меньше 5%.
+MIN_RATIO = 0.95
+
+
+def compressors():
+    yield '.gz', lambda data: gzip.compress(data, 9, mtime=0)
+    if brotli is not None:
+        yield '.br', lambda data: brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        names = set()
+        for name, hashed_name, processed in super().post_process(
+                paths, dry_run, **options):
+            if not isinstance(processed, Exception):
+                names.update(filter(None, (name, hashed_name)))
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name in sorted(names):
+            if os.path.splitext(name)[1] in COMPRESSIBLE:
+                self.compress(name)
+
+    def compress(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as source:
+            data = source.read()
+        for suffix, compress in compressors():
+            compressed = compress(data)
+            if len(compressed) < len(data) * MIN_RATIO:
+                with open(path + suffix, 'wb') as target:
+                    target.write(compressed)
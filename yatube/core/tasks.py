@@ -0,0 +1,164 @@
+"""Очередь фоновых задач в таблице core.Job.
+
+Функция с декоратором task получает метод delay(): он ставит вызов в
+очередь после фиксации текущей транзакции, поэтому запрос не ждёт
+задачу, а обработчик не увидит задачу раньше строк, которые она читает.
+Задачи выполняет manage.py run_workers. Аргументы хранятся в JSON.
+При TASKS_EAGER задача выполняется сразу, без очереди.
+
+Обработчик забирает задачи пачкой одним UPDATE с условием на статус,
+поэтому два обработчика не возьмут одну задачу. Упавшая задача
+повторяется через TASK_RETRY_DELAY * 2 ** (попытка - 1) секунд, задача
+обработчика, который умер, возвращается в работу через TASK_TIMEOUT.
+"""
+import datetime
+import json
+import os
+import random
+import socket
+import traceback
+import uuid
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+STALE_ERROR = 'Обработчик не завершил задачу за TASK_TIMEOUT секунд.'
+
+
+def task(function=None, *, max_attempts=None, atomic=True):
+    """Декоратор задачи: добавляет функции метод delay().
+
+    atomic=False выполняет задачу без общей транзакции: так работают
+    задачи, которые долго ждут внешний сервис и фиксируют шаги сами.
+    """
+    def decorate(function):
+        name = f'{function.__module__}.{function.__qualname__}'
+
+        def delay(*args, **kwargs):
+            enqueue(name, args, kwargs, max_attempts)
+
+        function.delay = delay
+        function.atomic = atomic
+        return function
+
+    if function is None:
+        return decorate
+    return decorate(function)
+
+
+def enqueue(name, args=(), kwargs=None, max_attempts=None):
+    """Ставит вызов name(*args, **kwargs) в очередь после фиксации."""
+    if settings.TASKS_EAGER:
+        import_string(name)(*args, **(kwargs or {}))
+        return
+    payload = json.dumps({'args': list(args), 'kwargs': kwargs or {}})
+    transaction.on_commit(lambda: Job.objects.create(
+        task=name,
+        payload=payload,
+        max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,
+        run_at=timezone.now(),
+    ))
+
+
+def retry_delay(attempts):
+    """Пауза перед повтором с разбросом, чтобы повторы не шли волной."""
+    delay = min(
+        settings.TASK_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.TASK_RETRY_MAX_DELAY)
+    return datetime.timedelta(seconds=delay * random.uniform(0.5, 1))
+
+
+def claim_rows(queryset, batch_size, owner, **updates):
+    """Берёт до batch_size строк queryset одним UPDATE и возвращает их.
+
+    Условие queryset повторяется в UPDATE, поэтому строки, которые уже
+    взял другой обработчик, не берутся второй раз. Модель должна иметь
+    поле locked_by.
+    """
+    token = f'{owner}:{uuid.uuid4().hex[:8]}'
+    claimed = queryset.filter(
+        pk__in=queryset.values('pk')[:batch_size]
+    ).update(locked_by=token, **updates)
+    if not claimed:
+        return []
+    return list(queryset.model.objects.filter(
+        locked_by=token).order_by(*queryset.query.order_by))
+
+
+class Worker:
+    """Забирает и выполняет задачи из очереди в текущем процессе."""
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or settings.TASK_BATCH_SIZE
+        self.name = f'{socket.gethostname()[:60]}:{os.getpid()}'
+
+    def claim(self):
+        """Помечает пачку готовых задач этим обработчиком и возвращает её."""
+        now = timezone.now()
+        stale = now - datetime.timedelta(seconds=settings.TASK_TIMEOUT)
+        Job.objects.filter(
+            status=Job.RUNNING, locked_at__lt=stale,
+            attempts__gte=F('max_attempts'),
+        ).update(status=Job.FAILED, last_error=STALE_ERROR)
+        ready = Job.objects.filter(
+            Q(status=Job.QUEUED, run_at__lte=now)
+            | Q(status=Job.RUNNING, locked_at__lt=stale)
+        ).order_by('run_at')
+        return claim_rows(
+            ready, self.batch_size, self.name,
+            status=Job.RUNNING, locked_at=now,
+            # Попытка считается при взятии: задача, которая роняет
+            # обработчик, тоже кончится после max_attempts.
+            attempts=F('attempts') + 1,
+        )
+
+    def execute(self, job):
+        """Выполняет задачу в транзакции, возвращает успех."""
+        try:
+            payload = json.loads(job.payload)
+            function = import_string(job.task)
+            with (transaction.atomic() if getattr(function, 'atomic', True)
+                  else nullcontext()):
+                function(*payload['args'], **payload['kwargs'])
+        except Exception:
+            self.fail(job, traceback.format_exc())
+            return False
+        return True
+
+    def fail(self, job, error):
+        if job.attempts >= job.max_attempts:
+            job.status = Job.FAILED
+        else:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + retry_delay(job.attempts)
+        job.last_error = error
+        job.locked_by = ''
+        job.locked_at = None
+        job.save(update_fields=[
+            'status', 'run_at', 'last_error',
+            'locked_by', 'locked_at',
+        ])
+
+    def run_batch(self):
+        """Выполняет одну пачку задач, возвращает их число."""
+        jobs = self.claim()
+        done = [job.pk for job in jobs if self.execute(job)]
+        # Задача, выполненная перед смертью обработчика, повторится:
+        # задачи должны переносить повторный запуск.
+        Job.objects.filter(pk__in=done).delete()
+        return len(jobs)
+
+    def run_pending(self):
+        """Выполняет задачи, пока в очереди есть готовые."""
+        total = 0
+        while True:
+            done = self.run_batch()
+            if not done:
+                return total
+            total += done
@@ -0,0 +1,28 @@
+import time
+
+from django.template.backends.django import DjangoTemplates, Template
+
+from .metrics import timings
+
+
+class MetricsTemplate(Template):
+
+    def render(self, context=None, request=None):
+        if not timings.active:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings.render_duration += time.perf_counter() - start
+
+
+class MetricsDjangoTemplates(DjangoTemplates):
+    """Движок DTL, который учитывает время отрисовки в core.metrics."""
+
+    def from_string(self, template_code):
+        return MetricsTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return MetricsTemplate(template.template, self)
@@ -0,0 +1,29 @@
+"""Прогрев кэширующего загрузчика шаблонов."""
+import os
+
+from django.template import engines
+
+
+def template_names():
+    """Имена всех шаблонов из каталогов TEMPLATES['DIRS']."""
+    for engine in engines.all():
+        for directory in engine.engine.dirs:
+            for root, _, files in os.walk(directory):
+                for filename in files:
+                    if filename.endswith('.html'):
+                        yield engine, os.path.relpath(
+                            os.path.join(root, filename), directory)
+
+
+def warm_templates():
+    """Загружает и разбирает все шаблоны проекта.
+
+    С cached.Loader разобранные шаблоны остаются в памяти процесса,
+    и первые запросы не тратят время на чтение файлов.
+    Возвращает число загруженных шаблонов.
+    """
+    loaded = 0
+    for engine, name in template_names():
+        engine.get_template(name)
+        loaded += 1
+    return loaded
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from .metrics import registry
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def metrics(request):
+    """Метрики запросов для Prometheus, только с токеном METRICS_TOKEN.
+
+    Адрес клиента за обратным прокси не проверить, поэтому доступ
+    даёт только токен, а без него страница выключена.
+    """
+    token = settings.METRICS_TOKEN
+    if not token or not constant_time_compare(
+            request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'):
+        raise Http404
+    return HttpResponse(
+        registry.exposition(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,7 +1,112 @@
+import datetime
+
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.functional import cached_property
 
+from . import counters, search
 from .models import Group, Post
 
+# Дальше этого числа строк отфильтрованный список не пересчитывается.
+ADMIN_COUNT_LIMIT = 10_000
+
+
+class IndexedDatesQuerySet(QuerySet):
+    """QuerySet, который выбирает даты для date_hierarchy по индексу.
+
+    Обычный dates() усекает дату каждой строки и делает DISTINCT по всей
+    таблице. Здесь каждый следующий год, месяц или день - первый пост не
+    раньше начала периода, то есть один шаг по индексу post_feed_idx.
+    Шаг - отдельный запрос: список лет или месяцев года стоит немного
+    запросов, а дни месяца - до 31 запроса, по одному на день.
+    """
+
+    def dates(self, field_name, kind, order='ASC'):
+        if kind not in ('year', 'month', 'day'):
+            return super().dates(field_name, kind, order)
+        dates = []
+        queryset = self.order_by(field_name).values_list(
+            field_name, flat=True)
+        first = queryset.first()
+        while first is not None:
+            period = truncate_date(timezone.localtime(first).date(), kind)
+            dates.append(period)
+            start = timezone.make_aware(datetime.datetime.combine(
+                next_period(period, kind), datetime.time.min))
+            first = queryset.filter(**{f'{field_name}__gte': start}).first()
+        if order == 'DESC':
+            dates.reverse()
+        return dates
+
+
+def truncate_date(date, kind):
+    if kind == 'year':
+        return date.replace(month=1, day=1)
+    if kind == 'month':
+        return date.replace(day=1)
+    return date
+
+
+def next_period(date, kind):
+    """Первый день периода, следующего за date."""
+    if kind == 'year':
+        return date.replace(year=date.year + 1)
+    if kind == 'month':
+        if date.month == 12:
+            return date.replace(year=date.year + 1, month=1)
+        return date.replace(month=date.month + 1)
+    return date + datetime.timedelta(days=1)
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator списка постов без COUNT(*) по всей таблице.
+
+    Без фильтров число постов берётся из posts.counters, с фильтрами
+    считается не дальше ADMIN_COUNT_LIMIT строк.
+    """
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            return counters.total_count()
+        return self.object_list[:ADMIN_COUNT_LIMIT].count()
+
+
+class RowGroupSelect(AutocompleteSelect):
+    """Автодополнение группы, которое не ищет уже загруженную группу.
+
+    AutocompleteSelect читает выбранную группу запросом на каждую строку
+    списка, а она уже есть у поста благодаря list_select_related.
+    """
+
+    group = None
+
+    def optgroups(self, name, value, attr=None):
+        if self.group is None or value != [str(self.group.pk)]:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        options.append(self.create_option(
+            name, self.group.pk,
+            self.choices.field.label_from_instance(self.group),
+            True, len(options)))
+        return [(None, options, 0)]
+
+
+class PostChangeListForm(forms.ModelForm):
+    """Форма строки списка, передающая группу поста виджету."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Виджет обёрнут в RelatedFieldWidgetWrapper.
+        widget = self.fields['group'].widget.widget
+        widget.group = self.instance.group if self.instance.group_id else None
+
 
 class PostAdmin(admin.ModelAdmin):
     list_display = (
@@ -12,11 +117,42 @@ class PostAdmin(admin.ModelAdmin):
         'group',
     )
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('group',)
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = '-пусто-'
 
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return IndexedDatesQuerySet(
+            model=queryset.model, query=queryset.query, using=queryset.db)
+
+    def get_changelist_form(self, request, **kwargs):
+        return super().get_changelist_form(
+            request, form=PostChangeListForm, **kwargs)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'group':
+            kwargs['widget'] = RowGroupSelect(
+                db_field.remote_field, self.admin_site,
+                using=kwargs.get('using'))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по тексту через индекс FTS5 вместо LIKE."""
+        if not search_term:
+            return queryset, False
+        return search.filter_posts(queryset, search_term), False
+
+
+class GroupAdmin(admin.ModelAdmin):
+    search_fields = ('title',)
+
 
 admin.site.register(Post, PostAdmin)
 
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
@@ -0,0 +1,61 @@
+"""Общие инструменты для команд замеров производительности bench_*."""
+import contextlib
+import itertools
+import statistics
+import time
+
+from django.db import connection
+
+from .models import Group, Post, User
+
+
+@contextlib.contextmanager
+def temporary_database():
+    """Временная тестовая БД, чтобы замеры не трогали рабочие данные."""
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def fill_posts(count, authors=10, groups=5, batch_size=5000):
+    """Добавляет в базу count постов, раскиданных по авторам и группам."""
+    users = list(User.objects.all()[:authors])
+    for i in range(len(users), authors):
+        users.append(User.objects.create_user(username=f'bench_{i}'))
+    group_list = list(Group.objects.all()[:groups])
+    for i in range(len(group_list), groups):
+        group_list.append(Group.objects.create(
+            title=f'Группа {i}', slug=f'bench-{i}', description=''))
+    for start in range(0, count, batch_size):
+        Post.objects.bulk_create(
+            Post(
+                text=f'Пост номер {start + i}',
+                author=users[(start + i) % len(users)],
+                group=group_list[(start + i) % len(group_list)],
+            )
+            for i in range(min(batch_size, count - start))
+        )
+
+
+def measure(func, repeat=5):
+    """Медиана времени выполнения func в миллисекундах."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def zipf_weights(count, exponent=1.0):
+    """Накопленные веса закона Ципфа для random.choices(cum_weights=...).
+
+    Первый элемент выбирается чаще всех, как самый активный автор
+    или самая популярная группа.
+    """
+    return list(itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)))
@@ -0,0 +1,117 @@
+"""Кэш отрисованных страниц лент с версиями по каждой ленте.
+
+Изменение поста или группы сдвигает версии только затронутых лент,
+старые фрагменты просто перестают читаться и вытесняются по таймауту.
+Версии хранятся в таблице FeedVersion, поэтому сдвиг видят все процессы,
+даже если у каждого свой кэш фрагментов, и виден он только после
+фиксации транзакции, которая изменила ленту.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Greatest
+
+from .models import FeedVersion
+
+INDEX_FEED = 'index'
+# Версия, общая для всех лент: её сдвигает изменение любой группы.
+GROUPS_FEED = 'groups'
+
+FRAGMENT_KEY = 'feed-fragment:{}'
+HITS_KEY = 'feed-cache:hits'
+MISSES_KEY = 'feed-cache:misses'
+
+
+def get_cache():
+    return caches[settings.FEED_CACHE_ALIAS]
+
+
+def group_feed(group_id):
+    return f'group:{group_id}'
+
+
+def profile_feed(author_id):
+    return f'profile:{author_id}'
+
+
+def post_feeds(author_id, group_id):
+    """Ленты, на которых выводится пост."""
+    feeds = [INDEX_FEED, profile_feed(author_id)]
+    if group_id is not None:
+        feeds.append(group_feed(group_id))
+    return feeds
+
+
+def feed_versions(*feeds):
+    """Версии лент; версия - время последнего изменения ленты."""
+    versions = dict(FeedVersion.objects.filter(
+        feed__in=feeds).values_list('feed', 'version'))
+    missing = [feed for feed in feeds if feed not in versions]
+    if missing:
+        _create(missing)
+        versions.update(FeedVersion.objects.filter(
+            feed__in=missing).values_list('feed', 'version'))
+    return [versions[feed] for feed in feeds]
+
+
+def request_versions(request, *feeds):
+    """feed_versions, прочитанные один раз за запрос.
+
+    Их читают и валидаторы условного GET, и {% feedcache %}.
+    """
+    known = request.__dict__.setdefault('_feed_versions', {})
+    missing = [feed for feed in feeds if feed not in known]
+    if missing:
+        known.update(zip(missing, feed_versions(*missing)))
+    return [known[feed] for feed in feeds]
+
+
+def _create(feeds):
+    # Версию могла одновременно создать другая транзакция.
+    FeedVersion.objects.bulk_create(
+        [FeedVersion(feed=feed, version=time.time()) for feed in feeds],
+        ignore_conflicts=True,
+    )
+
+
+def bump(*feeds):
+    """Сдвигает версии лент, после чего их фрагменты не читаются."""
+    now = Value(time.time(), output_field=FloatField())
+    updated = FeedVersion.objects.filter(feed__in=feeds).update(
+        version=Greatest(F('version') + 0.001, now))
+    if updated < len(set(feeds)):
+        _create(feeds)
+
+
+def fragment_key(request, feed, count, params):
+    """Ключ фрагмента страницы ленты.
+
+    В ключ входит число постов ленты: так ключ меняется, даже если посты
+    пропали без сигналов, например при откате транзакции.
+    """
+    version, groups_version = request_versions(request, feed, GROUPS_FEED)
+    raw = f'{feed}:{version}:{groups_version}:{count}:{params}'
+    return FRAGMENT_KEY.format(hashlib.md5(raw.encode()).hexdigest())
+
+
+def record(hit):
+    cache = get_cache()
+    key = HITS_KEY if hit else MISSES_KEY
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Ключ вытеснили между add и incr.
+        cache.set(key, 1, None)
+
+
+def stats():
+    """Попадания, промахи и доля попаданий кэша лент."""
+    values = get_cache().get_many((HITS_KEY, MISSES_KEY))
+    hits = values.get(HITS_KEY, 0)
+    misses = values.get(MISSES_KEY, 0)
+    total = hits + misses
+    return hits, misses, hits / total if total else 0.0
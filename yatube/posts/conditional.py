@@ -0,0 +1,106 @@
+"""Валидаторы условных GET-запросов (ETag, Last-Modified) страниц постов.
+
+Валидаторы считаются до вызова view по версиям лент и счётчикам постов,
+поэтому ответ 304 обходится без выборки постов и без шаблонов. Версии
+и счётчики хранятся в базе, так что изменение в любом процессе сразу
+меняет валидаторы остальных.
+"""
+import datetime
+import hashlib
+
+from django.views.decorators.http import condition
+
+from . import cache, counters, groups, post_cache
+from .models import PostCounter, User
+
+
+def _etag(request, *parts):
+    # Шапка страницы зависит от пользователя, а лента - от страницы.
+    raw = ':'.join(str(part) for part in (
+        *parts,
+        request.user.pk,
+        request.GET.get('page', ''),
+        request.GET.get('cursor', ''),
+    ))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _last_modified(request, timestamp):
+    # Last-Modified не отличает пользователей, их различает только ETag.
+    if request.user.is_authenticated:
+        return None
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc)
+
+
+def feed_condition(resolve_feed):
+    """Декоратор условного GET для ленты.
+
+    resolve_feed(request, **kwargs) возвращает ленту и число её постов
+    или None, если ленты нет.
+    """
+    def validators(request, **kwargs):
+        if not hasattr(request, '_feed_validators'):
+            request._feed_validators = None
+            resolved = resolve_feed(request, **kwargs)
+            if resolved is not None:
+                feed, count = resolved
+                version, groups_version = cache.request_versions(
+                    request, feed, cache.GROUPS_FEED)
+                request._feed_validators = (
+                    _etag(request, feed, version, groups_version, count),
+                    _last_modified(request, max(version, groups_version)),
+                )
+        return request._feed_validators or (None, None)
+
+    return condition(
+        etag_func=lambda request, **kwargs: validators(request, **kwargs)[0],
+        last_modified_func=(
+            lambda request, **kwargs: validators(request, **kwargs)[1]),
+    )
+
+
+def index_feed(request):
+    return cache.INDEX_FEED, counters.request_count(
+        request, PostCounter.TOTAL)
+
+
+def group_feed(request, slug):
+    group = groups.registry.by_slug(slug)
+    if group is None:
+        return None
+    return cache.group_feed(group.pk), counters.request_count(
+        request, PostCounter.GROUP, group.pk)
+
+
+def profile_feed(request, username):
+    author_id = User.objects.filter(
+        username=username).values_list('pk', flat=True).first()
+    if author_id is None:
+        return None
+    return cache.profile_feed(author_id), counters.request_count(
+        request, PostCounter.AUTHOR, author_id)
+
+
+def _post_validators(request, post_id):
+    if not hasattr(request, '_post_validators'):
+        request._post_validators = (None, None)
+        entry = post_cache.request_entry(request, post_id)
+        if entry is not None:
+            updated = entry['post'].updated
+            # Запись свежая, значит её версии - текущие. Версия ленты
+            # автора сдвигается и при смене его имени.
+            profile_version, groups_version = entry['versions']
+            request._post_validators = (
+                _etag(request, updated.timestamp(), profile_version,
+                      groups_version, entry['posts_count']),
+                _last_modified(request, max(
+                    updated.timestamp(), profile_version, groups_version)),
+            )
+    return request._post_validators
+
+
+post_condition = condition(
+    etag_func=lambda request, post_id: _post_validators(request, post_id)[0],
+    last_modified_func=(
+        lambda request, post_id: _post_validators(request, post_id)[1]),
+)
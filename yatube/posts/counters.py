@@ -0,0 +1,116 @@
+"""Хранилище числа постов, которое обновляют сигналы модели Post.
+
+Ленты и страницы постов читают число постов отсюда, а не через COUNT(*).
+Если счётчика ещё нет, он один раз считается по таблице постов.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from .models import Post, PostCounter, TimelineEntry
+
+
+def _post_list(scope, object_id):
+    if scope == PostCounter.AUTHOR:
+        return Post.objects.filter(author_id=object_id)
+    if scope == PostCounter.GROUP:
+        return Post.objects.filter(group_id=object_id)
+    if scope == PostCounter.TIMELINE:
+        return TimelineEntry.objects.filter(user_id=object_id)
+    return Post.objects.all()
+
+
+def get_count(scope, object_id=0):
+    """Число постов по счётчику, при его отсутствии - по таблице постов."""
+    count = PostCounter.objects.filter(
+        scope=scope, object_id=object_id
+    ).values_list('count', flat=True).first()
+    if count is None:
+        count = _post_list(scope, object_id).count()
+        try:
+            with transaction.atomic():
+                PostCounter.objects.create(
+                    scope=scope, object_id=object_id, count=count)
+        except IntegrityError:
+            # Счётчик параллельно создал другой запрос.
+            pass
+    return count
+
+
+def request_count(request, scope, object_id=0):
+    """get_count, прочитанный один раз за запрос.
+
+    Его читают и валидаторы условного GET, и view ленты.
+    """
+    known = request.__dict__.setdefault('_post_counts', {})
+    if (scope, object_id) not in known:
+        known[scope, object_id] = get_count(scope, object_id)
+    return known[scope, object_id]
+
+
+def total_count():
+    return get_count(PostCounter.TOTAL)
+
+
+def author_count(author_id):
+    return get_count(PostCounter.AUTHOR, author_id)
+
+
+def group_count(group_id):
+    return get_count(PostCounter.GROUP, group_id)
+
+
+def timeline_count(user_id):
+    return get_count(PostCounter.TIMELINE, user_id)
+
+
+def post_scopes(author_id, group_id):
+    """Счётчики, в которые входит пост."""
+    scopes = [(PostCounter.TOTAL, 0), (PostCounter.AUTHOR, author_id)]
+    if group_id is not None:
+        scopes.append((PostCounter.GROUP, group_id))
+    return scopes
+
+
+def change_count(scopes, delta):
+    """Сдвигает счётчики на delta.
+
+    Отсутствующие счётчики не создаются: при первом чтении их значение
+    будет посчитано уже с учётом изменения.
+    """
+    for scope, object_id in scopes:
+        counters = PostCounter.objects.filter(
+            scope=scope, object_id=object_id)
+        if delta < 0:
+            counters = counters.filter(count__gte=-delta)
+        counters.update(count=F('count') + delta)
+
+
+def reconcile():
+    """Пересчитывает все счётчики по таблице постов.
+
+    Возвращает число исправленных счётчиков.
+    """
+    actual = {(PostCounter.TOTAL, 0): Post.objects.count()}
+    for scope, field in ((PostCounter.AUTHOR, 'author'),
+                         (PostCounter.GROUP, 'group')):
+        rows = Post.objects.filter(**{f'{field}__isnull': False}).values(
+            field).annotate(posts=Count('pk')).order_by().values_list(
+            field, 'posts')
+        actual.update(((scope, pk), posts) for pk, posts in rows)
+    rows = TimelineEntry.objects.values('user').annotate(
+        posts=Count('pk')).order_by().values_list('user', 'posts')
+    actual.update(((PostCounter.TIMELINE, pk), posts) for pk, posts in rows)
+    fixed = 0
+    with transaction.atomic():
+        for counter in PostCounter.objects.select_for_update():
+            key = (counter.scope, counter.object_id)
+            count = actual.pop(key, 0)
+            if counter.count != count:
+                counter.count = count
+                counter.save(update_fields=('count',))
+                fixed += 1
+        PostCounter.objects.bulk_create(
+            PostCounter(scope=scope, object_id=object_id, count=count)
+            for (scope, object_id), count in actual.items()
+        )
+    return fixed + len(actual)
@@ -0,0 +1,131 @@
+"""Потоковая выгрузка постов в JSONL и CSV.
+
+Строки читаются из базы порциями через iterator(), форматируются
+и сжимаются по одной, так что память не зависит от числа постов.
+"""
+import csv
+import datetime
+import json
+import zlib
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Post
+
+FORMATS = ('jsonl', 'csv')
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+GZIP_CONTENT_TYPE = 'application/gzip'
+COLUMNS = ('id', 'text', 'pub_date', 'author', 'group')
+FIELDS = ('id', 'text', 'pub_date', 'author__username', 'group__slug')
+CHUNK_SIZE = 2000
+# Размер кусков потока ответа, чтобы не отдавать по строке за раз.
+BUFFER_SIZE = 64 * 1024
+
+
+def parse_moment(value, end_of_day=False):
+    """Дата или дата-время из строки фильтра, None если не разобрать."""
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is None:
+                return None
+            moment = datetime.datetime.combine(
+                day, datetime.time.max if end_of_day else datetime.time.min)
+    except ValueError:
+        return None
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def parse_filters(params):
+    """Фильтры выгрузки из словаря параметров запроса или команды.
+
+    Бросает ValueError для неразборчивой даты.
+    """
+    filters = {
+        'author': params.get('author') or None,
+        'group': params.get('group') or None,
+    }
+    for name in ('since', 'until'):
+        value = params.get(name)
+        if not value:
+            continue
+        filters[name] = parse_moment(value, end_of_day=name == 'until')
+        if filters[name] is None:
+            raise ValueError(f'Неверная дата в параметре {name}: {value}')
+    return filters
+
+
+def post_rows(author=None, group=None, since=None, until=None):
+    """Кортежи COLUMNS отфильтрованных постов в порядке id."""
+    posts = Post.objects.order_by('pk')
+    if author:
+        posts = posts.filter(author__username=author)
+    if group:
+        posts = posts.filter(group__slug=group)
+    if since:
+        posts = posts.filter(pub_date__gte=since)
+    if until:
+        posts = posts.filter(pub_date__lte=until)
+    return posts.values_list(*FIELDS).iterator(chunk_size=CHUNK_SIZE)
+
+
+def jsonl_lines(rows):
+    for row in rows:
+        record = dict(zip(COLUMNS, row))
+        record['pub_date'] = record['pub_date'].isoformat()
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+class _Line:
+    """Файл для csv.writer, который возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Line())
+    yield writer.writerow(COLUMNS)
+    for row in rows:
+        yield writer.writerow(
+            (*row[:2], row[2].isoformat(), row[3], row[4] or ''))
+
+
+def buffered(lines):
+    """Склеивает строки в куски примерно по BUFFER_SIZE байт."""
+    buffer = []
+    size = 0
+    for line in lines:
+        data = line.encode()
+        buffer.append(data)
+        size += len(data)
+        if size >= BUFFER_SIZE:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzipped(chunks):
+    """Сжимает поток кусков в gzip на лету."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_chunks(file_format, compress=False, **filters):
+    """Байтовые куски выгрузки постов в формате file_format."""
+    lines = jsonl_lines if file_format == 'jsonl' else csv_lines
+    chunks = buffered(lines(post_rows(**filters)))
+    return gzipped(chunks) if compress else chunks
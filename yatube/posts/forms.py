@@ -1,10 +1,49 @@
 from django import forms
+from django.urls import reverse_lazy
 
+from .groups import registry
 from .models import Post
 
 
+class GroupPicker(forms.Select):
+    """Выбор группы, в разметке которого только выбранная группа.
+
+    Остальные группы js/group_picker.js подгружает из posts:group_lookup
+    по началу названия, поэтому форма не читает все группы.
+    """
+
+    class Media:
+        js = ('js/group_picker.js',)
+
+    def __init__(self, attrs=None):
+        super().__init__({
+            'data-lookup-url': reverse_lazy('posts:group_lookup'),
+            **(attrs or {}),
+        })
+
+    def optgroups(self, name, value, attrs=None):
+        field = self.choices.field
+        selected = [item for item in value if item not in field.empty_values]
+        options = []
+        if field.empty_label is not None:
+            options.append(self.create_option(
+                name, '', field.empty_label, not selected, 0))
+        for value in selected:
+            # Виджет принимает только id группы.
+            group = None
+            if str(value).isdigit():
+                group = registry.by_id(int(value))
+            if group is None:
+                continue
+            options.append(self.create_option(
+                name, field.prepare_value(group),
+                field.label_from_instance(group), True, len(options)))
+        return [(None, options, 0)]
+
+
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         help_texts = {'group': 'Выберите группу', 'text': 'Введите ссообщение'}
         fields = ('text', 'group')
+        widgets = {'group': GroupPicker}
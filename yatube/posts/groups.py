@@ -0,0 +1,92 @@
+"""Реестр групп в памяти процесса.
+
+Таблица групп маленькая и меняется редко, поэтому она целиком читается
+при первом обращении и дальше группы ищутся по slug и id без запросов.
+Поколение реестра - версия GROUPS_FEED из таблицы FeedVersion: её
+сдвигают сигналы Group, import_posts, generate_data и sync_replicas,
+а читается она из базы, поэтому изменение группы в одном процессе
+видят и остальные. Версия проверяется не чаще раза
+в GROUP_REGISTRY_CHECK_INTERVAL секунд.
+
+Группы реестра общие для всех запросов, менять их нельзя.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.http import Http404
+
+from . import cache
+from .models import Group
+
+
+class Snapshot:
+    """Группы одного поколения.
+
+    Если групп больше GROUP_REGISTRY_MAX_SIZE, снимок неполный и поиск
+    идёт в базу: так таблица не перечитывается до смены поколения.
+    """
+
+    def __init__(self, version, groups, complete=True):
+        self.version = version
+        self.complete = complete
+        self.checked = time.monotonic()
+        self.by_id = {group.pk: group for group in groups}
+        self.by_slug = {group.slug: group for group in groups}
+
+
+class GroupRegistry:
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and (
+                now - snapshot.checked
+                < settings.GROUP_REGISTRY_CHECK_INTERVAL):
+            return snapshot
+        version, = cache.feed_versions(cache.GROUPS_FEED)
+        if snapshot is not None and snapshot.version == version:
+            snapshot.checked = now
+            return snapshot
+        with self._lock:
+            # Другой поток мог уже перечитать группы.
+            if self._snapshot is snapshot:
+                self._snapshot = self.load(version)
+            return self._snapshot
+
+    def load(self, version):
+        limit = settings.GROUP_REGISTRY_MAX_SIZE
+        groups = list(Group.objects.all()[:limit + 1])
+        if len(groups) > limit:
+            return Snapshot(version, [], complete=False)
+        return Snapshot(version, groups)
+
+    def invalidate(self):
+        """Сбрасывает реестр процесса, следующий поиск перечитает группы."""
+        self._snapshot = None
+
+    def by_slug(self, slug):
+        snapshot = self.snapshot()
+        if not snapshot.complete:
+            return Group.objects.filter(slug=slug).first()
+        return snapshot.by_slug.get(slug)
+
+    def by_id(self, pk):
+        snapshot = self.snapshot()
+        if not snapshot.complete:
+            return Group.objects.filter(pk=pk).first()
+        return snapshot.by_id.get(pk)
+
+
+registry = GroupRegistry()
+
+
+def get_group_or_404(slug):
+    group = registry.by_slug(slug)
+    if group is None:
+        raise Http404('Группа не найдена')
+    return group
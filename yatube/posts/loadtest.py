@@ -0,0 +1,247 @@
+"""Нагрузочный прогон страниц постов через WSGI-приложение.
+
+Клиенты - потоки, которые вызывают application(environ, start_response)
+из yatube/wsgi.py напрямую, без сети: в замер попадает весь стек Django
+с middleware, но не HTTP-сервер. Число запросов к базе берётся из
+core.metrics, который ведёт MetricsMiddleware.
+"""
+import io
+import random
+import threading
+import time
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+
+from django.test import Client
+from django.urls import reverse
+
+from core.metrics import Histogram, registry
+
+from .benchmark import zipf_weights
+from .models import Group, Post, User
+
+# Доли запросов к view по умолчанию.
+DEFAULT_MIX = {
+    'index': 40,
+    'group_posts': 20,
+    'profile': 20,
+    'post_detail': 15,
+    'post_create': 5,
+}
+VIEW_NAMES = {
+    'index': 'posts:index',
+    'group_posts': 'posts:group_list',
+    'profile': 'posts:profile',
+    'post_detail': 'posts:post_detail',
+    'post_create': 'posts:post_create',
+}
+LOAD_USERNAME = 'loadtest'
+# Сколько групп, авторов и постов участвует в выборе адресов.
+SAMPLE_SIZE = 1000
+
+
+def parse_mix(value):
+    """Доли view из строки вида "index=40,profile=20"."""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in VIEW_NAMES:
+            raise ValueError(f'Неизвестный view: {name}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class WsgiClient:
+    """Отправляет запросы в WSGI-приложение в текущем потоке."""
+
+    def __init__(self, application, cookies=''):
+        self.application = application
+        self.cookies = cookies
+
+    def request(self, method, path, query='', body=b'', headers=None):
+        """Выполняет запрос, возвращает код ответа и заголовки."""
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'HTTP_HOST': 'localhost',
+            'HTTP_COOKIE': self.cookies,
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': io.BytesIO(body),
+            **(headers or {}),
+        }
+        if body:
+            environ['CONTENT_TYPE'] = 'application/x-www-form-urlencoded'
+        setup_testing_defaults(environ)
+        response = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            response['status'] = int(status.split()[0])
+            response['headers'] = response_headers
+
+        result = self.application(environ, start_response)
+        try:
+            for _ in result:
+                pass
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return response['status'], response['headers']
+
+
+class Targets:
+    """Адреса для запросов: популярные группы, авторы и посты чаще."""
+
+    def __init__(self):
+        self.slugs = list(Group.objects.order_by('pk').values_list(
+            'slug', flat=True)[:SAMPLE_SIZE])
+        self.usernames = list(User.objects.filter(
+            posts__isnull=False).distinct().order_by('pk').values_list(
+            'username', flat=True)[:SAMPLE_SIZE])
+        self.post_ids = list(Post.objects.order_by('-pub_date').values_list(
+            'pk', flat=True)[:SAMPLE_SIZE])
+        if not (self.usernames and self.post_ids):
+            raise ValueError(
+                'В базе нет постов, заполните её командой generate_data.')
+        self.weights = zipf_weights(SAMPLE_SIZE)
+
+    def pick(self, rng, items):
+        return rng.choices(
+            items, cum_weights=self.weights[:len(items)])[0]
+
+    def path(self, rng, view):
+        if view == 'group_posts' and self.slugs:
+            return reverse(VIEW_NAMES[view], args=[self.pick(rng, self.slugs)])
+        if view == 'group_posts':
+            return reverse('posts:index')
+        if view == 'profile':
+            return reverse(
+                VIEW_NAMES[view], args=[self.pick(rng, self.usernames)])
+        if view == 'post_detail':
+            return reverse(
+                VIEW_NAMES[view], args=[self.pick(rng, self.post_ids)])
+        return reverse(VIEW_NAMES[view])
+
+
+def login_cookies(application):
+    """Cookie сессии и CSRF-токен пользователя для post_create."""
+    user, created = User.objects.get_or_create(username=LOAD_USERNAME)
+    if created:
+        user.set_unusable_password()
+        user.save()
+    client = Client()
+    client.force_login(user)
+    session = f'sessionid={client.cookies["sessionid"].value}'
+    _, headers = WsgiClient(application, session).request(
+        'GET', reverse('posts:post_create'))
+    cookie = SimpleCookie()
+    for name, value in headers:
+        if name.lower() == 'set-cookie':
+            cookie.load(value)
+    token = cookie['csrftoken'].value
+    return f'{session}; csrftoken={token}', token
+
+
+class LoadRun:
+    """Прогон clients потоков по requests запросов в каждом."""
+
+    def __init__(self, application, clients, requests, mix=None, seed=0):
+        self.application = application
+        self.clients = clients
+        self.requests = requests
+        self.mix = mix or DEFAULT_MIX
+        self.seed = seed
+        self.latency = {view: Histogram() for view in self.mix}
+        self.errors = {view: 0 for view in self.mix}
+        self.lock = threading.Lock()
+
+    def prepare(self):
+        self.targets = Targets()
+        self.cookies, self.csrf_token = login_cookies(self.application)
+
+    def send(self, client, rng, view):
+        path = self.targets.path(rng, view)
+        if view != 'post_create':
+            return client.request('GET', path)[0] < 500
+        body = urlencode({'text': f'Пост нагрузочного теста {rng.random()}'})
+        status, _ = client.request(
+            'POST', path, body=body.encode(),
+            headers={'HTTP_X_CSRFTOKEN': self.csrf_token})
+        return status == 302
+
+    def client_loop(self, number, requests):
+        rng = random.Random(self.seed + number)
+        client = WsgiClient(self.application, self.cookies)
+        views = list(self.mix)
+        weights = list(self.mix.values())
+        for _ in range(requests):
+            view = rng.choices(views, weights)[0]
+            start = time.perf_counter()
+            try:
+                ok = self.send(client, rng, view)
+            except Exception:
+                ok = False
+            self.latency[view].record(
+                int((time.perf_counter() - start) * 1e6))
+            if not ok:
+                with self.lock:
+                    self.errors[view] += 1
+
+    def run_threads(self, requests):
+        threads = [
+            threading.Thread(target=self.client_loop, args=(i, requests))
+            for i in range(self.clients)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def run(self, warmup=0):
+        """Выполняет прогон и возвращает отчёт для JSON."""
+        self.prepare()
+        if warmup:
+            self.run_threads(warmup)
+            self.latency = {view: Histogram() for view in self.mix}
+            self.errors = {view: 0 for view in self.mix}
+        registry.clear()
+        start = time.perf_counter()
+        self.run_threads(self.requests)
+        return self.report(time.perf_counter() - start)
+
+    def report(self, duration):
+        views = {}
+        for view, histogram in self.latency.items():
+            queries = registry.histograms.get(
+                ('yatube_db_queries', VIEW_NAMES[view]))
+            views[view] = {
+                'requests': histogram.count,
+                'errors': self.errors[view],
+                'throughput_rps': round(histogram.count / duration, 1),
+                'latency_ms': latency_summary(histogram),
+                'queries_mean': round(
+                    queries.total / queries.count, 2) if queries else None,
+            }
+        total = sum(view['requests'] for view in views.values())
+        return {
+            'clients': self.clients,
+            'requests': total,
+            'errors': sum(self.errors.values()),
+            'duration_s': round(duration, 3),
+            'throughput_rps': round(total / duration, 1),
+            'views': views,
+        }
+
+
+def latency_summary(histogram):
+    """p50/p95/p99 и среднее в миллисекундах по гистограмме в мкс."""
+    if not histogram.count:
+        return None
+    summary = {
+        f'p{percent}': round(histogram.percentile(percent) / 1000, 2)
+        for percent in (50, 95, 99)
+    }
+    summary['mean'] = round(histogram.total / histogram.count / 1000, 2)
+    return summary
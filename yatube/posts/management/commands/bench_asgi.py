@@ -0,0 +1,161 @@
+import asyncio
+import itertools
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.metrics import Histogram
+from posts.loadtest import Targets, latency_summary
+
+VIEWS = ('index', 'group_posts', 'profile', 'post_detail')
+
+
+class QuietHandler(WSGIRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+
+class PooledWSGIServer(WSGIServer):
+    """WSGI-сервер с постоянным пулом потоков, как gunicorn --threads.
+
+    Поток занят соединением целиком, включая чтение запроса от клиента.
+    """
+    request_queue_size = 2048
+
+    def __init__(self, address, threads):
+        super().__init__(address, QuietHandler)
+        self.pool = ThreadPoolExecutor(threads)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_in_pool, request, client_address)
+
+    def process_in_pool(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность ленты через WSGI-сервер '
+            'с пулом потоков и через yatube/asgi.py под uvicorn при '
+            'большом числе одновременных соединений. --slow-ms задаёт '
+            'паузу медленного клиента посреди запроса. Данные - из '
+            'generate_data, нужен установленный uvicorn.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=500)
+        parser.add_argument('--duration', type=float, default=10)
+        parser.add_argument(
+            '--threads', type=int, default=16,
+            help='Потоки WSGI-сервера и пула ASGI.')
+        parser.add_argument('--slow-ms', type=int, default=0)
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        try:
+            import uvicorn
+        except ImportError:
+            raise CommandError('Для замера нужен uvicorn из requirements.txt')
+        from core.asgi import WsgiToAsgi
+        from yatube.wsgi import application
+
+        try:
+            targets = Targets()
+        except ValueError as error:
+            raise CommandError(error)
+        rng = random.Random(options['seed'])
+        paths = [
+            targets.path(rng, rng.choice(VIEWS)) for _ in range(10_000)]
+        report = {
+            'connections': options['connections'],
+            'slow_ms': options['slow_ms'],
+            'threads': options['threads'],
+        }
+
+        server = PooledWSGIServer(
+            ('127.0.0.1', options['port']), options['threads'])
+        server.set_app(application)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            report['wsgi'] = self.load(paths, options)
+        finally:
+            server.shutdown()
+            server.server_close()
+            server.pool.shutdown()
+
+        config = uvicorn.Config(
+            WsgiToAsgi(application, options['threads']),
+            host='127.0.0.1', port=options['port'], log_level='error',
+            lifespan='on', backlog=2048,
+        )
+        asgi_server = uvicorn.Server(config)
+        thread = threading.Thread(target=asgi_server.run, daemon=True)
+        thread.start()
+        while not asgi_server.started:
+            time.sleep(0.05)
+        try:
+            report['asgi'] = self.load(paths, options)
+        finally:
+            asgi_server.should_exit = True
+            thread.join()
+        self.stdout.write(json.dumps(report, indent=2, sort_keys=True))
+
+    def load(self, paths, options):
+        histogram = Histogram()
+        errors = [0]
+        path_cycle = itertools.cycle(paths)
+        slow = options['slow_ms'] / 1000
+
+        async def client(deadline):
+            while time.perf_counter() < deadline:
+                path = next(path_cycle)
+                request = (
+                    f'GET {path} HTTP/1.1\r\nHost: localhost\r\n'
+                    f'Connection: close\r\n\r\n').encode()
+                start = time.perf_counter()
+                try:
+                    reader, writer = await asyncio.open_connection(
+                        '127.0.0.1', options['port'])
+                    if slow:
+                        writer.write(request[:16])
+                        await writer.drain()
+                        await asyncio.sleep(slow)
+                        request = request[16:]
+                    writer.write(request)
+                    await writer.drain()
+                    response = await reader.read()
+                    writer.close()
+                except OSError:
+                    errors[0] += 1
+                    await asyncio.sleep(0.01)
+                    continue
+                if response[9:12] != b'200':
+                    errors[0] += 1
+                    continue
+                histogram.record(int((time.perf_counter() - start) * 1e6))
+
+        async def run():
+            deadline = time.perf_counter() + options['duration']
+            await asyncio.gather(*(
+                client(deadline) for _ in range(options['connections'])))
+
+        start = time.perf_counter()
+        asyncio.run(run())
+        duration = time.perf_counter() - start
+        return {
+            'requests': histogram.count,
+            'errors': errors[0],
+            'throughput_rps': round(histogram.count / duration, 1),
+            'latency_ms': latency_summary(histogram),
+        }
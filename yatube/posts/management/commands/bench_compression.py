@@ -0,0 +1,78 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, modify_settings
+
+from core import compression
+from posts.loadtest import Targets
+
+VIEWS = ('index', 'group_posts', 'profile', 'post_detail')
+METHODS = (
+    ('minify', True, None),
+    ('gzip', False, 'gzip'),
+    ('minify+gzip', True, 'gzip'),
+    ('br', False, 'br'),
+    ('minify+br', True, 'br'),
+)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает процессорное время CompressionMiddleware на '
+            'запрос с экономией трафика на страницах лент: минификация, '
+            'gzip, brotli и их сочетания. Данные - из generate_data.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int, default=20,
+            help='Страниц каждого view в выборке.')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        try:
+            targets = Targets()
+        except ValueError as error:
+            raise CommandError(error)
+        rng = random.Random(options['seed'])
+        self.stdout.write(
+            f'{"view":<12} {"method":<12} {"bytes":>8} {"saved":>8} '
+            f'{"us/req":>8} {"us/KB":>7}')
+        for view in VIEWS:
+            pages = self.pages(targets, rng, view, options['pages'])
+            raw = sum(len(page) for page in pages) / len(pages)
+            self.stdout.write(f'{view:<12} {"-":<12} {raw:>8.0f}')
+            for name, minify, encoding in METHODS:
+                if encoding == 'br' and compression.brotli is None:
+                    continue
+                size, duration = self.measure(
+                    pages, minify, encoding, options['repeat'])
+                saved = raw - size
+                self.stdout.write(
+                    f'{"":<12} {name:<12} {size:>8.0f} {saved:>8.0f} '
+                    f'{duration:>8.0f} {duration / (saved / 1024):>7.1f}')
+
+    @modify_settings(MIDDLEWARE={
+        'remove': 'core.middleware.CompressionMiddleware'})
+    def pages(self, targets, rng, view, count):
+        """HTML страниц до минификации и сжатия."""
+        client = Client()
+        return [
+            client.get(targets.path(rng, view)).content
+            for _ in range(count)
+        ]
+
+    def measure(self, pages, minify, encoding, repeat):
+        """Средний размер результата и время в мкс на страницу."""
+        size = 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for page in pages:
+                content = page
+                if minify:
+                    content = compression.minify_html(content)
+                if encoding:
+                    content = compression.compress(content, encoding)
+                size += len(content)
+        runs = repeat * len(pages)
+        return size / runs, (time.perf_counter() - start) / runs * 1e6
@@ -0,0 +1,71 @@
+import json
+import platform
+import subprocess
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.loadtest import DEFAULT_MIX, LoadRun, parse_mix
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ('Нагружает index, group_posts, profile, post_detail и '
+            'post_create через WSGI-приложение параллельными клиентами '
+            'и выводит пропускную способность, p50/p95/p99 и число '
+            'запросов к базе в JSON. Данные - из generate_data.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=8)
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Запросов на одного клиента.')
+        parser.add_argument(
+            '--warmup', type=int, default=20,
+            help='Запросов на клиента до начала замера.')
+        parser.add_argument(
+            '--mix', default=','.join(
+                f'{view}={weight}' for view, weight in DEFAULT_MIX.items()),
+            help='Доли запросов к view, например "index=1,profile=1".')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output', default='-',
+            help='Файл для JSON-отчёта, "-" - вывод в stdout.')
+
+    def handle(self, *args, **options):
+        from yatube.wsgi import application
+
+        try:
+            mix = parse_mix(options['mix'])
+            report = LoadRun(
+                application, options['clients'], options['requests'],
+                mix=mix, seed=options['seed'],
+            ).run(warmup=options['warmup'])
+        except ValueError as error:
+            raise CommandError(error)
+        report = {
+            'commit': current_commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'debug': settings.DEBUG,
+            'seed': options['seed'],
+            **report,
+        }
+        text = json.dumps(report, ensure_ascii=False, indent=2, sort_keys=True)
+        if options['output'] == '-':
+            self.stdout.write(text)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(text + '\n')
+            self.stdout.write(self.style.SUCCESS(
+                f'Отчёт записан в {options["output"]}'))
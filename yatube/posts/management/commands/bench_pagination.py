@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.template import Context, Template, loader
+
+from posts.benchmark import measure
+from posts.models import Post
+from posts.utils import LIMIT_POSTS_ON_PAGE, CursorPaginator
+
+# Прежняя навигация: ссылка на каждую страницу ленты.
+FULL_RANGE = Template(
+    '{% for i in page_obj.paginator.page_range %}'
+    '{% if page_obj.number == i %}'
+    '<li class="page-item active"><span class="page-link">{{ i }}</span></li>'
+    '{% else %}'
+    '<li class="page-item"><a class="page-link" '
+    'href="?{{ extra_query }}page={{ i }}">{{ i }}</a></li>'
+    '{% endif %}{% endfor %}'
+)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время отрисовки и размер навигации по страницам '
+            'со всеми номерами и с сокращённым окном на средней странице.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', nargs='+', type=int,
+            default=[1_000, 10_000, 100_000, 1_000_000],
+            help='Число постов в ленте.',
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        template = loader.get_template('posts/includes/paginator.html')
+        self.stdout.write(
+            f'{"posts":>9} {"full, ms":>9} {"full, B":>9} '
+            f'{"window, ms":>11} {"window, B":>10}')
+        for size in sorted(options['sizes']):
+            # Число постов передаётся как в view, из posts.counters,
+            # поэтому база не нужна: отрисовка от постов не зависит.
+            page_obj = CursorPaginator(
+                Post.objects.none(), LIMIT_POSTS_ON_PAGE, count=size,
+            ).page(max(size // LIMIT_POSTS_ON_PAGE // 2, 1))
+            context = {'page_obj': page_obj, 'extra_query': ''}
+
+            def render_full():
+                return FULL_RANGE.render(Context(context))
+
+            def render_window():
+                return template.render(context)
+
+            self.stdout.write(
+                f'{size:>9} '
+                f'{measure(render_full, options["repeat"]):>9.2f} '
+                f'{len(render_full().encode()):>9} '
+                f'{measure(render_window, options["repeat"]):>11.2f} '
+                f'{len(render_window().encode()):>10}'
+            )
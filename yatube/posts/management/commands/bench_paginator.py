@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+
+from posts.benchmark import fill_posts, measure, temporary_database
+from posts.models import Post
+from posts.utils import LIMIT_POSTS_ON_PAGE, CursorPaginator
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает OFFSET-паджинацию с курсорной на первой, средней '
+            'и последней странице ленты.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', nargs='+', type=int,
+            default=[10_000, 100_000, 1_000_000],
+            help='Размеры таблицы постов для замеров.',
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"posts":>9} {"page":>8} {"offset, ms":>11} {"cursor, ms":>11}')
+        with temporary_database():
+            filled = 0
+            for size in sorted(options['sizes']):
+                fill_posts(size - filled)
+                filled = size
+                self.bench_size(size, options['repeat'])
+
+    def bench_size(self, size, repeat):
+        post_list = Post.objects.select_related('author', 'group')
+        num_pages = Paginator(post_list, LIMIT_POSTS_ON_PAGE).num_pages
+        cursor_paginator = CursorPaginator(post_list, LIMIT_POSTS_ON_PAGE)
+        for number in (1, num_pages // 2 or 1, num_pages):
+            # Позиция курсора - последний пост предыдущей страницы,
+            # её поиск в замер не входит.
+            offset = (number - 1) * LIMIT_POSTS_ON_PAGE
+            position = cursor_paginator.object_list.values_list(
+                'pub_date', 'pk')[max(offset - 1, 0)]
+
+            def offset_page():
+                # Новый Paginator на каждый запрос, как во view.
+                list(Paginator(
+                    post_list.order_by(*CursorPaginator.ordering),
+                    LIMIT_POSTS_ON_PAGE,
+                ).get_page(number))
+
+            def cursor_page():
+                list(cursor_paginator.page_after(position))
+
+            self.stdout.write(
+                f'{size:>9} {number:>8} '
+                f'{measure(offset_page, repeat):>11.2f} '
+                f'{measure(cursor_page, repeat):>11.2f}'
+            )
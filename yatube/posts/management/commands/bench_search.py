@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from posts import search
+from posts.benchmark import fill_posts, measure, temporary_database
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает поиск через FTS5 с поиском LIKE по тексту постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=200_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--query', nargs='+', default=['номер 12345', 'пост'],
+            help='Поисковые строки для замеров.')
+
+    def handle(self, *args, **options):
+        with temporary_database():
+            fill_posts(options['posts'])
+            search.index_new_posts()
+            self.stdout.write(
+                f'{"query":<16} {"found":>8} {"like, ms":>9} {"fts, ms":>9}')
+            for query in options['query']:
+                self.bench(query, options['repeat'])
+
+    def bench(self, query, repeat):
+        like = Post.objects.all()
+        for word in query.split():
+            like = like.filter(text__icontains=word)
+        results = search.SearchResults(query)
+
+        def like_page():
+            like.count()
+            list(like[:10])
+
+        def fts_page():
+            results.count()
+            results[:10]
+
+        self.stdout.write(
+            f'{query:<16} {results.count():>8} '
+            f'{measure(like_page, repeat):>9.2f} '
+            f'{measure(fts_page, repeat):>9.2f}')
@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from posts.benchmark import fill_posts, measure, temporary_database
+from posts.models import Group, Post
+from yatube import settings_production
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время ответа страниц постов с обычным '
+            'и кэширующим загрузчиком шаблонов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        with temporary_database():
+            fill_posts(options['posts'])
+            post = Post.objects.select_related('author', 'group').first()
+            urls = {
+                'index': reverse('posts:index'),
+                'group_list': reverse(
+                    'posts:group_list', args=[Group.objects.first().slug]),
+                'profile': reverse(
+                    'posts:profile', args=[post.author.username]),
+                'post_detail': reverse('posts:post_detail', args=[post.pk]),
+            }
+            before = self.bench(urls, options['repeat'])
+            with override_settings(TEMPLATES=settings_production.TEMPLATES):
+                after = self.bench(urls, options['repeat'])
+        self.stdout.write(
+            f'{"view":<12} {"before, ms":>11} {"after, ms":>10}')
+        for name in urls:
+            self.stdout.write(
+                f'{name:<12} {before[name]:>11.2f} {after[name]:>10.2f}')
+
+    def bench(self, urls, repeat):
+        client = Client()
+        result = {}
+        for name, url in urls.items():
+            def request():
+                # Кэш лент выключен, чтобы мерить отрисовку шаблонов.
+                cache.clear()
+                client.get(url)
+            request()
+            result[name] = measure(request, repeat)
+        return result
@@ -0,0 +1,89 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from posts import timeline, utils
+from posts.utils import LIMIT_POSTS_ON_PAGE, CursorPaginator
+from posts.benchmark import fill_posts, measure, temporary_database
+from posts.models import Follow, Post, User
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает ленту подписок, собранную при чтении (author__in), '
+            'с материализованной лентой: чтение страницы и запись поста.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--authors', type=int, default=1000)
+        parser.add_argument('--readers', type=int, default=200)
+        parser.add_argument(
+            '--follows', type=int, default=50,
+            help='На скольких авторов подписан каждый читатель.')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        with temporary_database():
+            fill_posts(options['posts'], authors=options['authors'])
+            authors = list(User.objects.values_list('pk', flat=True))
+            User.objects.bulk_create(
+                User(username=f'reader_{i}')
+                for i in range(options['readers'])
+            )
+            readers = list(User.objects.filter(
+                username__startswith='reader_').values_list('pk', flat=True))
+            Follow.objects.bulk_create(
+                Follow(user_id=reader, author_id=author)
+                for reader in readers
+                for author in rng.sample(
+                    authors, min(options['follows'], len(authors)))
+            )
+            timeline.rebuild()
+            self.bench(readers, options['repeat'])
+
+    def bench(self, readers, repeat):
+        reader = readers[0]
+        followed = list(Follow.objects.filter(
+            user_id=reader).values_list('author_id', flat=True))
+
+        def first_page(post_list):
+            list(CursorPaginator(post_list, LIMIT_POSTS_ON_PAGE).get_page(1))
+
+        def read_fan_out():
+            first_page(utils.feed(author__in=followed))
+
+        def read_timeline():
+            first_page(timeline.timeline_posts(reader))
+
+        # Автор, на которого подписаны все читатели, и автор без
+        # подписчиков: его пост пишется так же, как при сборке при чтении.
+        author = followed[0]
+        Follow.objects.bulk_create(
+            (Follow(user_id=user_id, author_id=author) for user_id in readers),
+            ignore_conflicts=True,
+        )
+        loner = User.objects.create_user(username='bench_loner')
+
+        # Раскладка поста - задача очереди: запись замеряется вместе
+        # с задачами, выполненными сразу, а не только с постановкой.
+        @override_settings(TASKS_EAGER=True)
+        def write_plain():
+            Post.objects.create(author=loner, text='Пост без подписчиков')
+
+        @override_settings(TASKS_EAGER=True)
+        def write_fan_out():
+            Post.objects.create(author_id=author, text='Пост подписчикам')
+
+        self.stdout.write(
+            f'{"strategy":<14} {"read page, ms":>14} '
+            f'{"write + tasks, ms":>18}')
+        self.stdout.write(
+            f'{"fan-out read":<14} {measure(read_fan_out, repeat):>14.2f} '
+            f'{measure(write_plain, repeat):>18.2f}')
+        self.stdout.write(
+            f'{"fan-out write":<14} {measure(read_timeline, repeat):>14.2f} '
+            f'{measure(write_fan_out, repeat):>18.2f}')
+        self.stdout.write(
+            f'Подписчиков у автора: {len(readers)}, '
+            f'подписок у читателя: {len(followed)}')
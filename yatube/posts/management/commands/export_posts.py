@@ -0,0 +1,39 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import export
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты потоком в JSONL или CSV, при --gzip - сжатыми.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=export.FORMATS, default='jsonl')
+        parser.add_argument('--author', help='Имя пользователя автора.')
+        parser.add_argument('--group', help='Slug группы.')
+        parser.add_argument('--since', help='Дата или дата-время, от.')
+        parser.add_argument('--until', help='Дата или дата-время, до.')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument(
+            '--output', '-o', default='-',
+            help='Файл для выгрузки, по умолчанию stdout.')
+
+    def handle(self, *args, **options):
+        try:
+            filters = export.parse_filters(options)
+        except ValueError as error:
+            raise CommandError(error)
+        chunks = export.export_chunks(
+            options['format'], options['gzip'], **filters)
+        if options['output'] == '-':
+            self.write(sys.stdout.buffer, chunks)
+        else:
+            with open(options['output'], 'wb') as file:
+                self.write(file, chunks)
+
+    def write(self, file, chunks):
+        for chunk in chunks:
+            file.write(chunk)
+        file.flush()
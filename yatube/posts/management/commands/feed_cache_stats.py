@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts import cache
+
+
+class Command(BaseCommand):
+    help = 'Показывает долю попаданий кэша страниц лент.'
+
+    def handle(self, *args, **options):
+        hits, misses, rate = cache.stats()
+        self.stdout.write(
+            f'Попаданий: {hits}, промахов: {misses}, '
+            f'доля попаданий: {rate:.1%}')
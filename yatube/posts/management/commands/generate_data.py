@@ -0,0 +1,140 @@
+import datetime
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from faker import Faker
+
+from posts import cache, counters, search, timeline
+from posts.benchmark import zipf_weights
+from posts.models import Follow, Group, Post, User
+from posts.utils import insert_posts
+
+# Сколько готовых предложений Faker собирается в тексты постов.
+SENTENCE_POOL = 2000
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу пользователями, группами, постами и подписками '
+            'с распределениями, похожими на настоящие: активность авторов '
+            'и популярность групп по закону Ципфа, длина текста - '
+            'логнормальная. На чистой базе при одинаковом --seed данные '
+            'совпадают.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Среднее число подписок у пользователя.')
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько последних дней раскидать даты постов.')
+        parser.add_argument(
+            '--grouped', type=float, default=0.7,
+            help='Доля постов, привязанных к группе.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options['users'] < 1:
+            raise CommandError('Нужен хотя бы один пользователь: --users 1.')
+        self.rng = random.Random(options['seed'])
+        self.faker = Faker('ru_RU')
+        self.faker.seed_instance(options['seed'])
+        start = time.perf_counter()
+        users = self.create_users(options['users'])
+        groups = self.create_groups(options['groups'])
+        self.create_posts(users, groups, options)
+        self.create_follows(users, options['follows'])
+        # Данные записаны пачками, без сигналов.
+        counters.reconcile()
+        cache.bump(cache.GROUPS_FEED)
+        search.index_new_posts()
+        entries = timeline.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пользователей: {len(users)}, групп: {len(groups)}, '
+            f'постов: {options["posts"]}, записей в лентах: {entries} '
+            f'за {time.perf_counter() - start:.1f} с'))
+
+    def create_users(self, count):
+        prefix = f'gen{self.rng.randrange(10 ** 6)}'
+        users = []
+        for i in range(count):
+            user = User(
+                username=f'{prefix}_{i}',
+                first_name=self.faker.first_name(),
+                last_name=self.faker.last_name(),
+            )
+            user.set_unusable_password()
+            users.append(user)
+        User.objects.bulk_create(users)
+        return list(User.objects.filter(
+            username__startswith=f'{prefix}_'
+        ).order_by('pk').values_list('pk', flat=True))
+
+    def create_groups(self, count):
+        prefix = f'gen-{self.rng.randrange(10 ** 6)}'
+        Group.objects.bulk_create(
+            Group(
+                title=self.faker.catch_phrase()[:200],
+                slug=f'{prefix}-{i}',
+                description=self.faker.paragraph(),
+            )
+            for i in range(count)
+        )
+        return list(Group.objects.filter(
+            slug__startswith=f'{prefix}-'
+        ).order_by('pk').values_list('pk', flat=True))
+
+    def create_posts(self, users, groups, options):
+        sentences = [
+            self.faker.sentence() for _ in range(SENTENCE_POOL)]
+        author_weights = zipf_weights(len(users))
+        group_weights = zipf_weights(len(groups)) if groups else None
+        now = timezone.now()
+        period = datetime.timedelta(days=options['days']).total_seconds()
+        total = options['posts']
+        for start in range(0, total, options['batch_size']):
+            size = min(options['batch_size'], total - start)
+            authors = self.rng.choices(
+                users, cum_weights=author_weights, k=size)
+            posts = []
+            for author_id in authors:
+                group_id = None
+                if groups and self.rng.random() < options['grouped']:
+                    group_id = self.rng.choices(
+                        groups, cum_weights=group_weights)[0]
+                length = max(1, round(self.rng.lognormvariate(1, 0.8)))
+                pub_date = now - datetime.timedelta(
+                    seconds=self.rng.random() * period)
+                posts.append(Post(
+                    text=' '.join(self.rng.choices(sentences, k=length)),
+                    author_id=author_id,
+                    group_id=group_id,
+                    pub_date=pub_date,
+                    updated=pub_date,
+                ))
+            insert_posts(posts)
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'Постов: {start + size}')
+
+    def create_follows(self, users, average):
+        """Подписки: популярные авторы набирают больше подписчиков."""
+        weights = zipf_weights(len(users))
+        follows = set()
+        for user_id in users:
+            count = min(
+                round(self.rng.expovariate(1 / average)) if average else 0,
+                len(users) - 1)
+            for author_id in self.rng.choices(
+                    users, cum_weights=weights, k=count):
+                if author_id != user_id:
+                    follows.add((user_id, author_id))
+        Follow.objects.bulk_create(
+            (Follow(user_id=user_id, author_id=author_id)
+             for user_id, author_id in follows),
+            ignore_conflicts=True,
+        )
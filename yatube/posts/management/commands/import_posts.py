@@ -0,0 +1,149 @@
+import csv
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts import cache, counters, search, timeline
+from posts.models import Follow, Group, Post, User
+from posts.utils import insert_posts
+
+FORMATS = ('jsonl', 'csv')
+
+
+class Command(BaseCommand):
+    help = ('Импортирует посты из JSONL или CSV (файл или stdin) '
+            'пачками. Поля: text, author, group, pub_date.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Путь к файлу или "-" для чтения из stdin.')
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Формат; по умолчанию определяется по расширению файла.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--create-authors', action='store_true',
+            help='Создавать неизвестных авторов вместо пропуска строк.')
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or options['path'].rsplit('.')[-1]
+        if file_format not in FORMATS:
+            raise CommandError(
+                'Не удалось определить формат, укажите --format.')
+        self.verbosity = options['verbosity']
+        self.create_authors = options['create_authors']
+        self.authors = {}
+        self.imported_authors = set()
+        self.groups = {}
+        self.skipped = 0
+        if options['path'] == '-':
+            self.run(sys.stdin, file_format, options['batch_size'])
+        else:
+            with open(options['path'], encoding='utf-8', newline='') as file:
+                self.run(file, file_format, options['batch_size'])
+
+    def run(self, file, file_format, batch_size):
+        rows = csv.DictReader(file) if file_format == 'csv' else (
+            self.read_jsonl(file))
+        start = time.perf_counter()
+        imported = 0
+        batch = []
+        for line, row in enumerate(rows, start=1):
+            post = self.build_post(line, row)
+            if post is None:
+                continue
+            batch.append(post)
+            if len(batch) >= batch_size:
+                imported += self.save(batch)
+                self.report(imported, start)
+        imported += self.save(batch)
+        # Вставка не шлёт сигналов: счётчики, кэш лент, поисковый
+        # индекс и ленты подписчиков авторов обновляются разом для всего
+        # импорта.
+        counters.reconcile()
+        cache.bump(cache.GROUPS_FEED)
+        search.index_new_posts()
+        timeline.rebuild(list(Follow.objects.filter(
+            author_id__in=self.imported_authors,
+        ).values_list('user_id', flat=True).distinct()))
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано постов: {imported}, пропущено строк: '
+            f'{self.skipped}, {imported / (elapsed or 1):.0f} строк/с'))
+
+    def read_jsonl(self, file):
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield row if isinstance(row, dict) else {}
+
+    def save(self, batch):
+        insert_posts(batch)
+        saved = len(batch)
+        batch.clear()
+        return saved
+
+    def report(self, imported, start):
+        if self.verbosity >= 1:
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'{imported} постов, {imported / (elapsed or 1):.0f} строк/с')
+
+    def build_post(self, line, row):
+        text = row.get('text')
+        author_id = self.author_id(row.get('author') or '')
+        group_id = self.group_id(row.get('group') or '')
+        pub_date = timezone.now()
+        if row.get('pub_date'):
+            try:
+                pub_date = parse_datetime(row['pub_date'])
+            except (ValueError, TypeError):
+                # Неверная дата или не строка, например число в JSONL.
+                pub_date = None
+        if not text or author_id is None or group_id is False or (
+                pub_date is None):
+            self.skip(line, row)
+            return None
+        if timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date)
+        self.imported_authors.add(author_id)
+        return Post(
+            text=text, author_id=author_id, group_id=group_id,
+            pub_date=pub_date, updated=pub_date,
+        )
+
+    def skip(self, line, row):
+        self.skipped += 1
+        if self.verbosity >= 2:
+            self.stderr.write(f'Строка {line} пропущена: {row}')
+
+    def author_id(self, username):
+        if not username:
+            return None
+        if username not in self.authors:
+            author_id = User.objects.filter(
+                username=username).values_list('pk', flat=True).first()
+            if author_id is None and self.create_authors:
+                author = User(username=username)
+                author.set_unusable_password()
+                author.save()
+                author_id = author.pk
+            self.authors[username] = author_id
+        return self.authors[username]
+
+    def group_id(self, slug):
+        """ID группы, None без группы и False для неизвестной группы."""
+        if not slug:
+            return None
+        if slug not in self.groups:
+            self.groups[slug] = Group.objects.filter(
+                slug=slug).values_list('pk', flat=True).first() or False
+        return self.groups[slug]
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--new-only', action='store_true',
+            help='Только дописать посты, которых ещё нет в индексе.')
+
+    def handle(self, *args, **options):
+        if options['new_only']:
+            indexed = search.index_new_posts()
+        else:
+            indexed = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано постов: {indexed}'))
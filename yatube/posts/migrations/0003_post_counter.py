@@ -0,0 +1,26 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0002_auto_20220602_2010'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostCounter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('total', 'Все посты'), ('author', 'Автор'), ('group', 'Группа')], max_length=10, verbose_name='Область')),
+                ('object_id', models.PositiveIntegerField(default=0, verbose_name='ID автора или группы')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Число постов')),
+            ],
+            options={
+                'verbose_name_plural': 'Счётчики постов',
+                'unique_together': {('scope', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:59
+
+from django.db import migrations, models
+
+
+def fill_title_key(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    groups = list(Group.objects.only('title'))
+    for group in groups:
+        group.title_key = group.title.casefold()
+    Group.objects.bulk_update(groups, ['title_key'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_feed_version'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='group',
+            name='group_title_idx',
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='title_key',
+            field=models.CharField(default='', editable=False, max_length=200, verbose_name='Название без регистра'),
+        ),
+        migrations.RunPython(fill_title_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='group',
+            index=models.Index(fields=['title_key', 'id'], name='group_title_key_idx'),
+        ),
+    ]
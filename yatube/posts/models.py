@@ -8,6 +8,7 @@ User = get_user_model()
 class Post(models.Model):
     text = models.TextField('Текст поста', help_text='Введите текст поста')
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    updated = models.DateTimeField('Дата изменения', auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -31,13 +32,151 @@ class Post(models.Model):
     class Meta:
         verbose_name_plural = 'Посты'
         ordering = ['-pub_date']
+        # Индексы под сортировку лент index, profile и group_posts.
+        indexes = [
+            models.Index(
+                fields=['pub_date', 'id'], name='post_feed_idx'),
+            models.Index(
+                fields=['author', 'pub_date', 'id'],
+                name='post_author_feed_idx'),
+            models.Index(
+                fields=['group', 'pub_date', 'id'],
+                name='post_group_feed_idx'),
+        ]
+
+
+def title_key(title):
+    """Название группы без регистра для поиска по началу названия."""
+    return title.casefold()
+
+
+class GroupQuerySet(models.QuerySet):
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create не вызывает save(), ключ заполняется здесь.
+        objs = list(objs)
+        for group in objs:
+            group.title_key = title_key(group.title)
+        return super().bulk_create(objs, *args, **kwargs)
 
 
 class Group(models.Model):
     title = models.CharField('Название группы', max_length=200)
+    title_key = models.CharField(
+        'Название без регистра', max_length=200, editable=False, default='')
     description = models.TextField()
     slug = models.SlugField(max_length=20, unique=True,)
     verbose_name_plural = 'Группы'
 
+    objects = GroupQuerySet.as_manager()
+
+    class Meta:
+        # Индекс под поиск группы по началу названия без регистра.
+        indexes = [
+            models.Index(
+                fields=['title_key', 'id'], name='group_title_key_idx'),
+        ]
+
     def __str__(self) -> str:
         return self.title
+
+    def save(self, *args, **kwargs):
+        self.title_key = title_key(self.title)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'title' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'title_key'}
+        super().save(*args, **kwargs)
+
+
+class PostCounter(models.Model):
+    """Денормализованное число постов: всего, у автора или в группе."""
+    TOTAL = 'total'
+    AUTHOR = 'author'
+    GROUP = 'group'
+    TIMELINE = 'timeline'
+    SCOPES = (
+        (TOTAL, 'Все посты'),
+        (AUTHOR, 'Автор'),
+        (GROUP, 'Группа'),
+        (TIMELINE, 'Лента подписок'),
+    )
+
+    scope = models.CharField('Область', max_length=10, choices=SCOPES)
+    object_id = models.PositiveIntegerField(
+        'ID автора, группы или читателя', default=0)
+    count = models.PositiveIntegerField('Число постов', default=0)
+
+    class Meta:
+        verbose_name_plural = 'Счётчики постов'
+        unique_together = ('scope', 'object_id')
+
+    def __str__(self):
+        return f'{self.scope}:{self.object_id}={self.count}'
+
+
+class FeedVersion(models.Model):
+    """Версия ленты - время её последнего изменения.
+
+    Версии хранятся в базе, а не в кэше: кэш по умолчанию у каждого
+    процесса свой, а сдвиг версии должны увидеть все процессы.
+    """
+    feed = models.CharField('Лента', max_length=50, unique=True)
+    version = models.FloatField('Версия')
+
+    class Meta:
+        verbose_name_plural = 'Версии лент'
+
+    def __str__(self):
+        return f'{self.feed}={self.version}'
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Подписчик',
+        related_name='follower'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Автор',
+        related_name='following'
+    )
+
+    class Meta:
+        verbose_name_plural = 'Подписки'
+        unique_together = ('user', 'author')
+
+    def __str__(self):
+        return f'{self.user_id} -> {self.author_id}'
+
+
+class TimelineEntry(models.Model):
+    """Пост в материализованной ленте подписок читателя."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Читатель',
+        related_name='timeline_entries'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Пост',
+        related_name='timeline_entries'
+    )
+    # Копия даты поста, чтобы обрезать ленту без JOIN с постами.
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        verbose_name_plural = 'Записи лент подписок'
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(
+                fields=['user', 'pub_date', 'post'],
+                name='timeline_user_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id}: {self.post_id}'
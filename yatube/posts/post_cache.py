@@ -0,0 +1,140 @@
+"""Сквозной кэш страницы поста: пост с автором, группа и число постов.
+
+Запись хранится по id поста и проверяется по версиям ленты автора и
+GROUPS_FEED из базы: их сдвигают сигналы при любом изменении постов
+автора, его имени или групп, так что запись, положенная в кэш любого
+процесса, не устаревает. Поэтому попадание в кэш стоит один запрос:
+версии читаются из базы при каждом чтении записи. В кэш попадают только
+поля, которые выводит страница, без пароля и почты автора.
+
+Промах загружает пост один раз даже при наплыве запросов: потоки
+процесса ждут друг друга на блокировке, а процессы с общим кэшем -
+на ключе-флаге, который ставит тот, кто загружает запись.
+"""
+import threading
+import time
+import zlib
+
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+from . import cache, counters
+from .models import Post
+
+POST_KEY = 'post:{}'
+LOCK_KEY = 'post-lock:{}'
+# Блокировки потоков по ключам: посты делят их по остатку от хэша.
+_locks = [threading.Lock() for _ in range(64)]
+
+
+def _lock(key):
+    return _locks[zlib.crc32(key.encode()) % len(_locks)]
+
+
+def _versions(author_id):
+    return cache.feed_versions(
+        cache.profile_feed(author_id), cache.GROUPS_FEED)
+
+
+def _fresh(entry):
+    if entry is None or entry['versions'] != _versions(entry['author_id']):
+        return None
+    return entry
+
+
+def _shared(store):
+    """Флаг загрузки нужен, только если кэш общий для процессов."""
+    return not isinstance(store, LocMemCache)
+
+
+def load(post_id):
+    """Запись кэша из базы или None, если поста нет."""
+    post = Post.objects.select_related('author', 'group').only(
+        'text', 'pub_date', 'updated', 'author_id', 'group_id',
+        'author__username', 'author__first_name', 'author__last_name',
+        'group__slug',
+    ).filter(pk=post_id).first()
+    if post is None:
+        return None
+    # Версии читаются раньше счётчика: изменение после этого сдвинет их,
+    # и запись со старым числом постов не будет прочитана.
+    versions = _versions(post.author_id)
+    return {
+        'post': post,
+        'author_id': post.author_id,
+        'group_slug': post.group.slug if post.group else None,
+        'posts_count': counters.author_count(post.author_id),
+        'versions': versions,
+    }
+
+
+def get_entry(post_id):
+    """Запись поста из кэша, при промахе - из базы одним загрузчиком."""
+    key = POST_KEY.format(post_id)
+    store = cache.get_cache()
+    entry = _fresh(store.get(key))
+    if entry is not None:
+        return entry
+    lock_key = LOCK_KEY.format(post_id)
+    with _lock(key):
+        # Пока поток ждал, запись мог положить другой поток.
+        entry = _fresh(store.get(key))
+        if entry is not None:
+            return entry
+        if not _shared(store):
+            return _load_and_store(post_id, key)
+        if store.add(lock_key, 1, settings.POST_CACHE_LOCK_TIMEOUT):
+            try:
+                return _load_and_store(post_id, key)
+            finally:
+                store.delete(lock_key)
+    # Запись загружает другой процесс: ждём без блокировки потоков,
+    # чтобы не задерживать посты с той же блокировкой.
+    entry = _wait(store, key, lock_key)
+    if entry is not None:
+        return entry
+    # Загрузчик не успел или упал: читаем сами.
+    return _load_and_store(post_id, key)
+
+
+def request_entry(request, post_id):
+    """get_entry, прочитанная один раз за запрос.
+
+    Её читают и валидаторы условного GET, и post_detail.
+    """
+    entries = request.__dict__.setdefault('_post_entries', {})
+    if post_id not in entries:
+        entries[post_id] = get_entry(post_id)
+    return entries[post_id]
+
+
+def _wait(store, key, lock_key):
+    """Ждёт запись от загрузчика другого процесса."""
+    deadline = time.monotonic() + settings.POST_CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(settings.POST_CACHE_POLL_INTERVAL)
+        entry = _fresh(store.get(key))
+        if entry is not None:
+            return entry
+        if store.get(lock_key) is None:
+            return None
+    return None
+
+
+def _load_and_store(post_id, key):
+    entry = load(post_id)
+    if entry is not None:
+        cache.get_cache().set(key, entry, settings.POST_CACHE_TIMEOUT)
+    return entry
+
+
+def invalidate(post_id):
+    """Удаляет пост из кэша сейчас и ещё раз после фиксации транзакции.
+
+    Второе удаление убирает запись, которую мог положить запрос,
+    прочитавший пост до фиксации.
+    """
+    key = POST_KEY.format(post_id)
+    cache.get_cache().delete(key)
+    transaction.on_commit(lambda: cache.get_cache().delete(key))
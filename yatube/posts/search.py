@@ -0,0 +1,138 @@
+"""Полнотекстовый поиск по постам на SQLite FTS5.
+
+Таблица posts_post_fts хранит текст постов с rowid = id поста. Сигналы
+Post обновляют её по одному посту, index_new_posts() дописывает посты,
+добавленные без сигналов (например, bulk_create), а rebuild()
+перестраивает индекс целиком. На других СУБД поиск идёт через icontains.
+"""
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from . import utils
+
+TABLE = 'posts_post_fts'
+MATCH_IDS_SQL = f'SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s'
+
+
+class MatchingIds(RawSQL):
+    """Подзапрос id найденных постов для фильтра pk__in.
+
+    RawSQL сам берёт SQL в скобки, и вместе со скобками IN (...)
+    SQLite видит скалярный подзапрос, возвращающий одну строку.
+    """
+
+    def __init__(self, expression):
+        super().__init__(MATCH_IDS_SQL, [expression])
+
+    def as_sql(self, compiler, connection):
+        return self.sql, self.params
+
+
+def available():
+    return connection.vendor == 'sqlite'
+
+
+def match_expression(query):
+    """Запрос FTS5 из пользовательской строки: все слова по префиксу.
+
+    Префикс находит разные окончания слова (борщ - борща), а кавычки
+    не дают словам пользователя сработать как операторы FTS5.
+    """
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', query))
+
+
+def index_post(post_id, text):
+    if not available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [post_id])
+        cursor.execute(
+            f'INSERT INTO {TABLE} (rowid, text) VALUES (%s, %s)',
+            [post_id, text])
+
+
+def unindex_post(post_id):
+    if not available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [post_id])
+
+
+def index_new_posts():
+    """Добавляет в индекс посты, которых в нём ещё нет.
+
+    Посты выбираются по отсутствию в индексе, а не по id больше
+    последнего: пост с сайта, проиндексированный сигналом во время
+    импорта, получает id больше импортированных.
+    """
+    if not available():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {TABLE} (rowid, text) '
+            f'SELECT id, text FROM posts_post '
+            f'WHERE id NOT IN (SELECT rowid FROM {TABLE})')
+        return cursor.rowcount
+
+
+def rebuild():
+    """Перестраивает индекс по всей таблице постов."""
+    if not available():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+        indexed = index_new_posts()
+        cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')")
+    return indexed
+
+
+def filter_posts(queryset, query):
+    """Посты queryset, подходящие под поисковую строку."""
+    expression = match_expression(query)
+    if not expression:
+        return queryset.none()
+    if not available():
+        return queryset.filter(text__icontains=query)
+    return queryset.filter(pk__in=MatchingIds(expression))
+
+
+class SearchResults:
+    """Найденные посты по релевантности, срезы читают одну страницу.
+
+    Подходит как object_list для Paginator.
+    """
+
+    def __init__(self, query):
+        self.expression = match_expression(query)
+        self.query = query
+
+    def count(self):
+        if not self.expression:
+            return 0
+        if not available():
+            return utils.feed(text__icontains=self.query).count()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM ({MATCH_IDS_SQL})', [self.expression])
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        if not self.expression:
+            return []
+        if not available():
+            return list(utils.feed(text__icontains=self.query)[index])
+        start = index.start or 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'{MATCH_IDS_SQL} ORDER BY rank LIMIT %s OFFSET %s',
+                [self.expression, index.stop - start, start])
+            ids = [row[0] for row in cursor.fetchall()]
+        posts = utils.feed(pk__in=ids).in_bulk()
+        return [posts[pk] for pk in ids if pk in posts]
@@ -0,0 +1,146 @@
+from django.db import transaction
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from . import cache, counters, groups, post_cache, tasks, timeline
+from .models import Follow, Group, Post, User
+
+
+AUTHOR_NAME_FIELDS = ('username', 'first_name', 'last_name')
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_scopes(sender, instance, raw, **kwargs):
+    """Запоминает автора и группу поста до изменения."""
+    if raw or instance._state.adding:
+        return
+    instance._previous_scopes = Post.objects.filter(
+        pk=instance.pk).values_list('author_id', 'group_id').first()
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    scopes = counters.post_scopes(instance.author_id, instance.group_id)
+    if created:
+        counters.change_count(scopes, 1)
+        return
+    previous = getattr(instance, '_previous_scopes', None)
+    if previous is None:
+        return
+    old_scopes = counters.post_scopes(*previous)
+    counters.change_count(set(old_scopes) - set(scopes), -1)
+    counters.change_count(set(scopes) - set(old_scopes), 1)
+
+
+@receiver(post_save, sender=Post)
+def bump_saved_post_feeds(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    feeds = set(cache.post_feeds(instance.author_id, instance.group_id))
+    previous = getattr(instance, '_previous_scopes', None)
+    if previous is not None:
+        feeds.update(cache.post_feeds(*previous))
+    cache.bump(*feeds)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_cached_post(sender, instance, **kwargs):
+    post_cache.invalidate(instance.pk)
+
+
+@receiver(pre_delete, sender=Post)
+def shrink_timelines(sender, instance, **kwargs):
+    # Записи лент удаляются каскадом, без своих сигналов.
+    timeline.remove_post(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    counters.change_count(
+        counters.post_scopes(instance.author_id, instance.group_id), -1)
+
+
+@receiver(post_delete, sender=Post)
+def bump_deleted_post_feeds(sender, instance, **kwargs):
+    cache.bump(*cache.post_feeds(instance.author_id, instance.group_id))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def bump_group_feeds(sender, instance, **kwargs):
+    """Название и slug группы выводятся во всех лентах."""
+    cache.bump(cache.GROUPS_FEED, cache.group_feed(instance.pk))
+    groups.registry.invalidate()
+    # Реестр мог перечитать группы до фиксации транзакции, поэтому
+    # поколение сдвигается ещё раз после неё.
+    transaction.on_commit(refresh_group_registry)
+
+
+def refresh_group_registry():
+    cache.bump(cache.GROUPS_FEED)
+    groups.registry.invalidate()
+
+
+@receiver(pre_save, sender=User)
+def remember_author_name(sender, instance, raw, update_fields, **kwargs):
+    """Запоминает имя автора до изменения, кроме сохранения last_login."""
+    instance._previous_name = None
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not (
+            set(update_fields) & set(AUTHOR_NAME_FIELDS)):
+        return
+    instance._previous_name = User.objects.filter(
+        pk=instance.pk).values_list(*AUTHOR_NAME_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def bump_author_feeds(sender, instance, **kwargs):
+    """Имя автора выводится в его ленте и у его постов в общих лентах."""
+    previous = getattr(instance, '_previous_name', None)
+    current = tuple(getattr(instance, field) for field in AUTHOR_NAME_FIELDS)
+    if previous is None or previous == current:
+        return
+    group_ids = Post.objects.filter(
+        author=instance, group__isnull=False,
+    ).values_list('group_id', flat=True).distinct()
+    cache.bump(
+        cache.INDEX_FEED,
+        cache.profile_feed(instance.pk),
+        *(cache.group_feed(group_id) for group_id in group_ids),
+    )
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, raw, **kwargs):
+    if not raw:
+        tasks.index_post.delay(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    tasks.unindex_post.delay(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_saved_post(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        tasks.fan_out.delay(instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+def fill_timeline(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        timeline.follow(instance.user_id, instance.author_id)
+        # Кнопка подписки выводится на странице автора.
+        cache.bump(cache.profile_feed(instance.author_id))
+
+
+@receiver(post_delete, sender=Follow)
+def clear_timeline(sender, instance, **kwargs):
+    timeline.unfollow(instance.user_id, instance.author_id)
+    cache.bump(cache.profile_feed(instance.author_id))
@@ -0,0 +1,27 @@
+from core.tasks import task
+
+from . import search, timeline
+from .models import Post
+
+
+@task
+def index_post(post_id):
+    """Обновляет пост в поисковом индексе по его текущему тексту."""
+    text = Post.objects.filter(pk=post_id).values_list(
+        'text', flat=True).first()
+    if text is None:
+        search.unindex_post(post_id)
+    else:
+        search.index_post(post_id, text)
+
+
+@task
+def unindex_post(post_id):
+    search.unindex_post(post_id)
+
+
+@task
+def fan_out(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None:
+        timeline.fan_out(post)
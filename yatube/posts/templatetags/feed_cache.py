@@ -0,0 +1,49 @@
+from django import template
+from django.conf import settings
+
+from posts import cache
+
+register = template.Library()
+
+
+class FeedCacheNode(template.Node):
+    def __init__(self, nodelist, feed, page_obj):
+        self.nodelist = nodelist
+        self.feed = feed
+        self.page_obj = page_obj
+
+    def render(self, context):
+        feed = self.feed.resolve(context)
+        page_obj = self.page_obj.resolve(context)
+        request = context['request']
+        params = '{}|{}'.format(
+            request.GET.get('page', ''), request.GET.get('cursor', ''))
+        key = cache.fragment_key(
+            request, feed, page_obj.paginator.count, params)
+        fragments = cache.get_cache()
+        content = fragments.get(key)
+        cache.record(hit=content is not None)
+        if content is None:
+            content = self.nodelist.render(context)
+            fragments.set(key, content, settings.FEED_CACHE_TIMEOUT)
+        return content
+
+
+@register.tag
+def feedcache(parser, token):
+    """Кэширует страницу ленты до изменения её постов.
+
+    {% feedcache feed page_obj %} ... {% endfeedcache %}
+    """
+    bits = token.split_contents()
+    if len(bits) != 3:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]} ожидает ленту и страницу: '
+            f'{{% {bits[0]} feed page_obj %}}')
+    nodelist = parser.parse(('endfeedcache',))
+    parser.delete_first_token()
+    return FeedCacheNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        parser.compile_filter(bits[2]),
+    )
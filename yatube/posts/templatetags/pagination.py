@@ -0,0 +1,13 @@
+from django import template
+
+register = template.Library()
+
+
+@register.inclusion_tag('posts/includes/page_window.html')
+def page_window(page_obj, extra_query=''):
+    """Номера страниц вокруг текущей с многоточием на месте пропусков."""
+    return {
+        'page_obj': page_obj,
+        'window': page_obj.page_window,
+        'extra_query': extra_query,
+    }
@@ -0,0 +1,116 @@
+import datetime
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from posts.admin import IndexedDatesQuerySet
+from posts.models import Group, Post
+from posts.utils import insert_posts
+
+User = get_user_model()
+
+CHANGELIST = '/admin/posts/post/'
+# Запросов на страницу списка при любом числе постов и групп.
+MAX_QUERIES = 12
+# На уровне месяца date_hierarchy ищет по индексу каждый день.
+DAY_SEEKS = 31
+# Грубая граница времени страницы с запасом для медленных машин CI:
+# полный просмотр таблицы на каждую строку её бы не выдержал.
+MAX_SECONDS = 10
+
+
+class PostAdminChangeListTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='secret')
+        cls.groups = Group.objects.bulk_create(
+            Group(title=f'Группа {number}', slug=f'group-{number}',
+                  description='')
+            for number in range(50))
+        cls.groups = list(Group.objects.all())
+        start = timezone.make_aware(datetime.datetime(2020, 11, 30))
+        insert_posts(
+            Post(
+                author=cls.admin,
+                group=cls.groups[number % len(cls.groups)],
+                text=f'Пост {number}',
+                pub_date=start + datetime.timedelta(hours=number),
+                updated=start,
+            )
+            for number in range(1000))
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def get(self, path=CHANGELIST, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        return response, queries
+
+    def test_queries_and_time_bounded(self):
+        for params in ({}, {'p': 5}, {'pub_date__year': 2020},
+                       {'pub_date__year': 2020, 'pub_date__month': 12}):
+            with self.subTest(params=params):
+                started = time.perf_counter()
+                response, queries = self.get(**params)
+                duration = time.perf_counter() - started
+                limit = MAX_QUERIES
+                if 'pub_date__month' in params:
+                    limit += DAY_SEEKS
+                self.assertLessEqual(len(queries), limit)
+                self.assertLess(duration, MAX_SECONDS)
+
+    def test_no_group_select_per_row(self):
+        response, _ = self.get()
+        content = response.content.decode()
+        # В строке только пустой вариант и выбранная группа, а не все 50.
+        self.assertLess(content.count('<option'), 100 * 3)
+        self.assertIn('admin-autocomplete', content)
+
+    def test_count_without_full_scan(self):
+        # Первый запрос один раз заполняет счётчик постов.
+        self.get()
+        response, queries = self.get()
+        self.assertEqual(response.context['cl'].result_count, 1000)
+        self.assertFalse(any(
+            'COUNT(*)' in query['sql'] and '"posts_post"' in query['sql']
+            for query in queries.captured_queries))
+
+    def test_filtered_count(self):
+        response, _ = self.get(
+            pub_date__year=2020, pub_date__month=12)
+        # Пост каждый час с 30 ноября: в декабре 31 * 24.
+        self.assertEqual(response.context['cl'].result_count, 744)
+
+    def test_date_hierarchy(self):
+        response, _ = self.get()
+        self.assertContains(response, '?pub_date__year=2020')
+        self.assertContains(response, '?pub_date__year=2021')
+
+
+class IndexedDatesTest(TestCase):
+
+    def test_same_dates_as_distinct(self):
+        author = User.objects.create_user(username='auth')
+        posts = []
+        for day in ('2019-12-31 23:00', '2020-01-01 00:00',
+                    '2020-01-01 12:00', '2020-03-15 08:00'):
+            moment = timezone.make_aware(datetime.datetime.fromisoformat(day))
+            posts.append(Post(
+                author=author, text=day, pub_date=moment, updated=moment))
+        insert_posts(posts)
+        queryset = IndexedDatesQuerySet(Post)
+        for kind in ('year', 'month', 'day'):
+            for order in ('ASC', 'DESC'):
+                with self.subTest(kind=kind, order=order):
+                    self.assertEqual(
+                        queryset.dates('pub_date', kind, order),
+                        list(Post.objects.dates('pub_date', kind, order)))
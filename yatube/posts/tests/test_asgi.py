@@ -0,0 +1,89 @@
+import asyncio
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from core.asgi import WsgiToAsgi, build_environ
+from yatube.wsgi import application
+
+
+def call(app, scope, body=b''):
+    """Выполняет ASGI-запрос и возвращает отправленные сообщения."""
+    messages = []
+    incoming = [{'type': 'http.request', 'body': body, 'more_body': False}]
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return messages
+
+
+def http_scope(path, method='GET', query=b'', headers=()):
+    return {
+        'type': 'http', 'method': method, 'path': path,
+        'query_string': query, 'headers': list(headers),
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 5000),
+    }
+
+
+def echo(environ, start_response):
+    start_response('201 Created', [('X-Path', environ['PATH_INFO'])])
+    return [
+        environ['wsgi.input'].read(), b'|', environ['QUERY_STRING'].encode()]
+
+
+def stream(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return (str(i).encode() for i in range(20))
+
+
+def broken(environ, start_response):
+    raise RuntimeError('сломалось')
+
+
+class WsgiToAsgiTest(SimpleTestCase):
+    def test_request_passed_to_wsgi(self):
+        """Тело, путь и параметры запроса доходят до WSGI-приложения."""
+        messages = call(
+            WsgiToAsgi(echo, 2),
+            http_scope('/путь/', 'POST', b'a=1'), body=b'text')
+        self.assertEqual(messages[0]['status'], 201)
+        self.assertIn((b'x-path', '/путь/'.encode()), messages[0]['headers'])
+        body = b''.join(message.get('body', b'') for message in messages[1:])
+        self.assertEqual(body, b'text|a=1')
+
+    def test_streaming_response(self):
+        """Потоковый ответ отправляется кусками."""
+        messages = call(WsgiToAsgi(stream, 2), http_scope('/'))
+        chunks = [message['body'] for message in messages[1:]]
+        self.assertEqual(b''.join(chunks), b''.join(
+            str(i).encode() for i in range(20)))
+        self.assertFalse(messages[-1].get('more_body'))
+
+    def test_error_becomes_500(self):
+        messages = call(WsgiToAsgi(broken, 2), http_scope('/'))
+        self.assertEqual(messages[0]['status'], 500)
+
+    def test_headers_to_environ(self):
+        environ = build_environ(http_scope('/', headers=[
+            (b'content-type', b'text/plain'),
+            (b'x-forwarded-for', b'1.1.1.1'),
+            (b'accept', b'a'), (b'accept', b'b'),
+        ]), b'')
+        self.assertEqual(environ['CONTENT_TYPE'], 'text/plain')
+        self.assertEqual(environ['HTTP_X_FORWARDED_FOR'], '1.1.1.1')
+        self.assertEqual(environ['HTTP_ACCEPT'], 'a,b')
+        self.assertEqual(environ['REMOTE_ADDR'], '127.0.0.1')
+
+    def test_django_page(self):
+        """Страница Django отдаётся через ASGI-обёртку."""
+        messages = call(
+            WsgiToAsgi(application, 2), http_scope(reverse('about:tech')))
+        self.assertEqual(messages[0]['status'], 200)
+        self.assertIn(
+            'Технологии'.encode(),
+            b''.join(message.get('body', b'') for message in messages[1:]))
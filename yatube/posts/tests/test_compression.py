@@ -0,0 +1,112 @@
+import gzip
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import (Client, RequestFactory, SimpleTestCase, TestCase,
+                         override_settings)
+from django.urls import reverse
+
+from core import compression
+from core.metrics import registry
+from core.middleware import CompressionMiddleware
+from posts.models import Post
+
+User = get_user_model()
+
+
+class MinifyTest(SimpleTestCase):
+
+    def test_whitespace_and_comments(self):
+        html = b'<ul>\n    <li> a  b </li>\n\n  <!-- x -->\n</ul>\n'
+        self.assertEqual(
+            compression.minify_html(html), b'<ul>\n<li> a  b </li>\n</ul>\n')
+
+    def test_preserved_blocks(self):
+        html = (
+            b'<div>\n  <pre>\n  code\n\n  </pre>  <textarea>a\n\n b'
+            b'</textarea>\n <script>\n  var a;\n</script>\n</div>')
+        self.assertEqual(
+            compression.minify_html(html),
+            b'<div>\n<pre>\n  code\n\n  </pre>\n<textarea>a\n\n b'
+            b'</textarea>\n<script>\n  var a;\n</script>\n</div>')
+
+    def test_non_breaking_space_kept(self):
+        html = '<p>\n  слово\xa0 \n</p>'.encode()
+        self.assertEqual(
+            compression.minify_html(html), '<p>\nслово\xa0\n</p>'.encode())
+
+
+class CompressionMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        for number in range(10):
+            Post.objects.create(
+                author=cls.user, text=f'Пост {number}\n  вторая строка')
+
+    def setUp(self):
+        self.client = Client()
+        self.factory = RequestFactory()
+
+    def test_gzip_feed_page(self):
+        url = reverse('posts:profile', args=[self.user.username])
+        plain = self.client.get(url)
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertTrue(response['ETag'].startswith('W/'))
+
+    def test_linebreaksbr_output_kept(self):
+        response = self.client.get(
+            reverse('posts:profile', args=[self.user.username]))
+        self.assertContains(response, 'Пост 0<br>  вторая строка')
+        self.assertNotContains(response, '\n\n')
+
+    @unittest.skipIf(compression.brotli is None, 'Brotli не установлен')
+    def test_brotli_preferred(self):
+        response = self.client.get(
+            reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertIn(
+            b'</body>', compression.brotli.decompress(response.content))
+
+    def test_bytes_saved_recorded(self):
+        registry.clear()
+        self.client.get(reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip')
+        saved = registry.histograms[
+            ('yatube_response_bytes_saved', 'posts:index')]
+        self.assertEqual(saved.count, 1)
+        self.assertGreater(saved.total, 0)
+        registry.clear()
+
+    def process(self, response, **headers):
+        request = self.factory.get('/', **headers)
+        request.resolver_match = None
+        return CompressionMiddleware(lambda request: response)(request)
+
+    @override_settings(COMPRESS_MIN_SIZE=100)
+    def test_small_and_encoded_responses_untouched(self):
+        small = self.process(
+            HttpResponse(b'x' * 99), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(small.has_header('Content-Encoding'))
+        encoded = HttpResponse(b'x' * 200)
+        encoded['Content-Encoding'] = 'identity'
+        self.assertEqual(
+            self.process(encoded, HTTP_ACCEPT_ENCODING='gzip').content,
+            b'x' * 200)
+        image = HttpResponse(b'x' * 200, content_type='image/png')
+        self.assertEqual(
+            self.process(image, HTTP_ACCEPT_ENCODING='gzip').content,
+            b'x' * 200)
+
+    def test_streaming_response(self):
+        chunks = [b'<p>\n  %d\n</p>\n' % number for number in range(100)]
+        response = self.process(
+            StreamingHttpResponse(iter(chunks)), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)),
+            b''.join(chunks))
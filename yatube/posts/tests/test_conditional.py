@@ -0,0 +1,112 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import cache, counters
+from posts.models import FeedVersion, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[cls.group.slug]),
+            reverse('posts:profile', args=[cls.user.username]),
+            reverse('posts:post_detail', args=[cls.post.id]),
+        )
+
+    def setUp(self):
+        counters.reconcile()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_not_modified_without_templates(self):
+        """Повторный запрос с валидаторами получает 304 без шаблонов."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertTrue(response.has_header('ETag'))
+                self.assertTrue(response.has_header('Last-Modified'))
+                cached = self.guest_client.get(
+                    url,
+                    HTTP_IF_NONE_MATCH=response['ETag'],
+                    HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+                )
+                self.assertEqual(
+                    cached.status_code, HTTPStatus.NOT_MODIFIED)
+                self.assertFalse(cached.templates)
+
+    def test_edit_changes_validators(self):
+        """После правки поста страницы снова отдаются целиком."""
+        etags = {url: self.guest_client.get(url)['ETag'] for url in self.urls}
+        self.post.text = 'Изменённый пост'
+        self.post.save()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_edit_in_other_process(self):
+        """Правку другого процесса видно по версиям в базе, без кэша."""
+        etags = {url: self.guest_client.get(url)['ETag'] for url in self.urls}
+        Post.objects.filter(pk=self.post.pk).update(
+            text='Правка другого процесса', updated=timezone.now())
+        FeedVersion.objects.filter(feed__in=cache.post_feeds(
+            self.user.pk, self.group.pk)).update(version=F('version') + 1)
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertContains(response, 'Правка другого процесса')
+
+    def test_author_rename_changes_post_validators(self):
+        """Имя автора выводится на странице поста."""
+        url = reverse('posts:post_detail', args=[self.post.pk])
+        response = self.guest_client.get(url)
+        self.user.first_name = 'Новое'
+        self.user.save()
+        response = self.guest_client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'],
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'Новое')
+
+    def test_validators_depend_on_user(self):
+        """ETag гостя не подходит пользователю, Last-Modified ему не шлётся."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                guest_etag = self.guest_client.get(url)['ETag']
+                response = self.authorized_client.get(
+                    url, HTTP_IF_NONE_MATCH=guest_etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_missing_feed_is_not_found(self):
+        """Для несуществующей группы валидаторов нет, ответ - 404."""
+        response = self.guest_client.get(
+            reverse('posts:group_list', args=['missing']),
+            HTTP_IF_NONE_MATCH='*',
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
@@ -0,0 +1,88 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import counters
+from posts.models import Group, Post, PostCounter
+
+User = get_user_model()
+
+
+class PostCounterTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def assertCounts(self, total, author, group, other_group):
+        self.assertEqual(counters.total_count(), total)
+        self.assertEqual(counters.author_count(self.user.id), author)
+        self.assertEqual(counters.group_count(self.group.id), group)
+        self.assertEqual(
+            counters.group_count(self.other_group.id), other_group)
+
+    def test_signals_keep_counts(self):
+        """Счётчики следят за созданием, правкой и удалением постов."""
+        self.assertCounts(1, 1, 1, 0)
+        post = Post.objects.create(
+            author=self.user, text='Второй пост', group=self.group)
+        self.assertCounts(2, 2, 2, 0)
+        post.group = self.other_group
+        post.save()
+        self.assertCounts(2, 2, 1, 1)
+        post.delete()
+        self.assertCounts(1, 1, 1, 0)
+
+    def test_views_do_not_count_posts(self):
+        """Ленты и страница поста не считают посты через COUNT(*)."""
+        counters.reconcile()
+        pages = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.user.username]),
+            reverse('posts:post_detail', args=[self.post.id]),
+        )
+        for page in pages:
+            with self.subTest(page=page):
+                with CaptureQueriesContext(connection) as queries:
+                    self.guest_client.get(page)
+                self.assertFalse([
+                    query for query in queries.captured_queries
+                    if 'COUNT(' in query['sql']
+                ])
+
+    def test_reconcile_command_fixes_drift(self):
+        """Команда reconcile_post_counts исправляет расхождения."""
+        counters.reconcile()
+        PostCounter.objects.filter(scope=PostCounter.TOTAL).update(count=42)
+        PostCounter.objects.filter(scope=PostCounter.GROUP).delete()
+        call_command('reconcile_post_counts', stdout=StringIO())
+        self.assertCounts(1, 1, 1, 0)
+        self.assertEqual(
+            PostCounter.objects.get(
+                scope=PostCounter.GROUP, object_id=self.group.id).count,
+            1
+        )
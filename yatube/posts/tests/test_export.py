@@ -0,0 +1,99 @@
+import csv
+import gzip
+import json
+import tempfile
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+NUM_OF_POSTS = 30
+
+
+class ExportPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other_user = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        for i in range(NUM_OF_POSTS):
+            Post.objects.create(
+                author=cls.user if i % 3 else cls.other_user,
+                text=f'Пост, номер "{i}"\nвторая строка',
+                group=cls.group if i % 2 else None,
+            )
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def export(self, **params):
+        response = self.authorized_client.get(reverse('posts:export'), params)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_export_jsonl(self):
+        """JSONL содержит все посты в порядке id."""
+        rows = [
+            json.loads(line)
+            for line in self.export().decode().splitlines()
+        ]
+        self.assertEqual(
+            [row['id'] for row in rows],
+            list(Post.objects.order_by('pk').values_list('pk', flat=True))
+        )
+        self.assertEqual(rows[1]['author'], 'auth')
+        self.assertEqual(rows[1]['group'], 'test_slug')
+
+    def test_export_csv_with_filters(self):
+        """CSV учитывает фильтры по автору и группе."""
+        content = self.export(format='csv', author='auth', group='test_slug')
+        rows = list(csv.DictReader(StringIO(content.decode())))
+        self.assertEqual(len(rows), Post.objects.filter(
+            author=self.user, group=self.group).count())
+        self.assertEqual(rows[0]['text'], Post.objects.get(
+            pk=rows[0]['id']).text)
+
+    def test_export_gzip(self):
+        """При gzip=1 выгрузка сжимается на лету."""
+        content = self.export(gzip='1')
+        lines = gzip.decompress(content).decode().splitlines()
+        self.assertEqual(len(lines), NUM_OF_POSTS)
+
+    def test_bad_params(self):
+        """Неизвестный формат и битая дата дают 400."""
+        for params in ({'format': 'xml'}, {'since': 'вчера'}):
+            with self.subTest(params=params):
+                response = self.authorized_client.get(
+                    reverse('posts:export'), params)
+                self.assertEqual(
+                    response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_export_requires_login(self):
+        """Гость перенаправляется на страницу входа."""
+        response = self.guest_client.get(reverse('posts:export'))
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_export_command(self):
+        """Команда export_posts пишет сжатую выгрузку в файл."""
+        with tempfile.NamedTemporaryFile(suffix='.csv.gz') as file:
+            call_command(
+                'export_posts', '--format', 'csv', '--gzip',
+                '--since', '2000-01-01', '--output', file.name)
+            with gzip.open(file.name, 'rt', encoding='utf-8') as archive:
+                rows = list(csv.DictReader(archive))
+        self.assertEqual(len(rows), NUM_OF_POSTS)
@@ -0,0 +1,132 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import cache as feed_cache
+from posts import counters
+from posts.models import FeedVersion, Group, Post
+from posts.utils import encode_cursor
+
+User = get_user_model()
+
+
+class FeedCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+        cls.other_post = Post.objects.create(
+            author=cls.user,
+            text='Пост другой группы',
+            group=cls.other_group,
+        )
+
+    def setUp(self):
+        counters.reconcile()
+        cache.clear()
+        self.guest_client = Client()
+
+    def get_post_queries(self, url):
+        """Число запросов к таблице постов при открытии url."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.guest_client.get(url)
+        return response, len([
+            query for query in context.captured_queries
+            if 'FROM "posts_post"' in query['sql']
+        ])
+
+    def test_second_request_served_from_cache(self):
+        """Повторная страница ленты не читает посты из базы."""
+        url = reverse('posts:index')
+        first, queries = self.get_post_queries(url)
+        self.assertEqual(queries, 1)
+        second, queries = self.get_post_queries(url)
+        self.assertEqual(queries, 0)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(feed_cache.stats(), (1, 1, 0.5))
+
+    def test_edit_bumps_only_affected_feeds(self):
+        """Правка поста сбрасывает только ленты, где он выводится."""
+        urls = {
+            'index': reverse('posts:index'),
+            'group': reverse('posts:group_list', args=[self.group.slug]),
+            'other_group': reverse(
+                'posts:group_list', args=[self.other_group.slug]),
+        }
+        for url in urls.values():
+            self.guest_client.get(url)
+        self.post.text = 'Изменённый пост'
+        self.post.save()
+        expected = {'index': 1, 'group': 1, 'other_group': 0}
+        for name, url in urls.items():
+            with self.subTest(feed=name):
+                response, queries = self.get_post_queries(url)
+                self.assertEqual(queries, expected[name])
+        response = self.guest_client.get(urls['group'])
+        self.assertContains(response, 'Изменённый пост')
+
+    def test_group_change_bumps_all_feeds(self):
+        """Slug группы выводится во всех лентах, поэтому сбрасывает их."""
+        url = reverse('posts:profile', args=[self.user.username])
+        self.guest_client.get(url)
+        self.other_group.slug = 'new_slug'
+        self.other_group.save()
+        response, queries = self.get_post_queries(url)
+        self.assertEqual(queries, 1)
+        self.assertContains(response, 'new_slug')
+
+    def test_version_from_other_process(self):
+        """Сдвиг версии другим процессом виден без общего кэша."""
+        url = reverse('posts:index')
+        self.guest_client.get(url)
+        Post.objects.filter(pk=self.post.pk).update(text='Правка без сигнала')
+        FeedVersion.objects.filter(feed=feed_cache.INDEX_FEED).update(
+            version=F('version') + 1)
+        response, queries = self.get_post_queries(url)
+        self.assertEqual(queries, 1)
+        self.assertContains(response, 'Правка без сигнала')
+
+    def test_cursor_page_from_cache(self):
+        url = reverse('posts:index')
+        cursor = encode_cursor('next', self.other_post)
+        self.guest_client.get(url, {'cursor': cursor})
+        with CaptureQueriesContext(connection) as context:
+            self.guest_client.get(url, {'cursor': cursor})
+        self.assertFalse(any(
+            'FROM "posts_post"' in query['sql']
+            for query in context.captured_queries))
+
+    def test_author_name_change_bumps_feeds(self):
+        url = reverse('posts:group_list', args=[self.group.slug])
+        self.guest_client.get(url)
+        self.user.first_name = 'Новое'
+        self.user.last_name = 'Имя'
+        self.user.save()
+        response, queries = self.get_post_queries(url)
+        self.assertEqual(queries, 1)
+        self.assertContains(response, 'Новое Имя')
+
+    def test_last_login_does_not_bump_feeds(self):
+        url = reverse('posts:profile', args=[self.user.username])
+        self.guest_client.get(url)
+        self.user.save(update_fields=['last_login'])
+        self.assertEqual(self.get_post_queries(url)[1], 0)
@@ -0,0 +1,126 @@
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.tests.test_query_plans import explain
+from posts.utils import (GROUP_LOOKUP_PAGE_SIZE, groups_after,
+                         groups_by_prefix)
+
+User = get_user_model()
+
+
+class GroupPickerTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Group.objects.bulk_create(
+            Group(title=f'Группа {number:03}', slug=f'group-{number}',
+                  description='')
+            for number in range(300))
+        cls.group = Group.objects.create(
+            title='Коты', slug='cats', description='')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_create_page_does_not_list_groups(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('posts:post_create'))
+        self.assertEqual(response.content.decode().count('<option'), 1)
+        self.assertFalse(any(
+            'FROM "posts_group"' in query['sql']
+            for query in queries.captured_queries))
+        self.assertContains(response, 'js/group_picker.js')
+
+    def test_edit_page_shows_selected_group(self):
+        post = Post.objects.create(
+            author=self.user, text='Пост', group=self.group)
+        response = self.client.get(
+            reverse('posts:post_edit', args=[post.pk]))
+        self.assertContains(
+            response, f'<option value="{self.group.pk}" selected>Коты<')
+        self.assertEqual(response.content.decode().count('<option'), 2)
+
+    def test_post_by_id(self):
+        self.client.post(
+            reverse('posts:post_create'),
+            {'text': 'Пост', 'group': self.group.pk})
+        self.assertTrue(
+            Post.objects.filter(text='Пост', group=self.group).exists())
+
+    def test_slug_not_accepted(self):
+        """Slug из одних цифр не спутать с id: принимается только id."""
+        group = Group.objects.create(
+            title='Год', slug=str(self.group.pk + 1000), description='')
+        response = self.client.post(
+            reverse('posts:post_create'), {'text': 'Пост', 'group': 'cats'})
+        self.assertTrue(response.context['form'].errors['group'])
+        self.client.post(
+            reverse('posts:post_create'), {'text': 'Пост', 'group': group.pk})
+        self.assertEqual(Post.objects.get().group, group)
+
+    def test_unknown_group_rejected(self):
+        for value in ('missing', '999999'):
+            with self.subTest(value=value):
+                response = self.client.post(
+                    reverse('posts:post_create'),
+                    {'text': 'Пост', 'group': value})
+                self.assertTrue(response.context['form'].errors['group'])
+        self.assertFalse(Post.objects.exists())
+
+    def lookup(self, **params):
+        return self.client.get(reverse('posts:group_lookup'), params).json()
+
+    def test_lookup_by_prefix(self):
+        for prefix in ('кот', 'Кот', 'КОТ', 'кОт'):
+            with self.subTest(prefix=prefix):
+                data = self.lookup(q=prefix)
+                self.assertEqual(
+                    data['results'], [{'id': self.group.pk, 'text': 'Коты'}])
+                self.assertFalse(data['pagination']['more'])
+                self.assertIsNone(data['pagination']['cursor'])
+
+    def test_lookup_lowercase_title(self):
+        group = Group.objects.create(
+            title='коты и кошки', slug='cats-lower', description='')
+        data = self.lookup(q='Кот')
+        self.assertEqual(
+            [item['id'] for item in data['results']],
+            [self.group.pk, group.pk])
+
+    def test_lookup_pages(self):
+        first = self.lookup(q='Группа')
+        second = self.lookup(q='Группа', cursor=first['pagination']['cursor'])
+        self.assertEqual(len(first['results']), GROUP_LOOKUP_PAGE_SIZE)
+        self.assertTrue(first['pagination']['more'])
+        self.assertEqual(second['results'][0]['text'], 'Группа 020')
+
+    def test_lookup_page_without_offset(self):
+        cursor = self.lookup(q='Группа')['pagination']['cursor']
+        with CaptureQueriesContext(connection) as queries:
+            self.lookup(q='Группа', cursor=cursor)
+        self.assertFalse(any(
+            'OFFSET' in query['sql'] for query in queries.captured_queries))
+
+    def test_broken_cursor_starts_over(self):
+        data = self.lookup(q='Группа', cursor='broken')
+        self.assertEqual(data['results'][0]['text'], 'Группа 000')
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN для SQLite')
+    def test_lookup_uses_index(self):
+        first = Group.objects.order_by('title_key', 'pk').first()
+        for groups in (groups_by_prefix(''), groups_by_prefix('гр'),
+                       groups_after(groups_by_prefix('гр'),
+                                    (first.title_key, first.pk))):
+            with self.subTest(groups=groups):
+                plan = explain(groups[:21])
+                self.assertTrue(
+                    any('group_title_key_idx' in step for step in plan),
+                    plan)
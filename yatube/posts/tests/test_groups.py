@@ -0,0 +1,73 @@
+from django.core.cache import cache as default_cache
+from django.db import connection
+from django.db.models import F
+from django.http import Http404
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import cache, groups
+from posts.models import FeedVersion, Group
+
+
+@override_settings(GROUP_REGISTRY_CHECK_INTERVAL=0)
+class GroupRegistryTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test_slug', description='')
+
+    def setUp(self):
+        default_cache.clear()
+        self.registry = groups.GroupRegistry()
+
+    @override_settings(GROUP_REGISTRY_CHECK_INTERVAL=60)
+    def test_lookups_without_queries(self):
+        self.registry.by_slug('test_slug')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.registry.by_slug('test_slug'), self.group)
+            self.assertEqual(self.registry.by_id(self.group.pk), self.group)
+            self.assertIsNone(self.registry.by_slug('missing'))
+
+    def test_group_page_steady_state(self):
+        client = Client()
+        url = reverse('posts:group_list', args=['test_slug'])
+        client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        self.assertFalse(any(
+            'FROM "posts_group"' in query['sql']
+            for query in queries.captured_queries))
+
+    def test_other_process_change(self):
+        """Другой процесс меняет группу и версию в базе, минуя кэш."""
+        self.registry.by_slug('test_slug')
+        Group.objects.filter(pk=self.group.pk).update(title='Новое название')
+        self.assertEqual(
+            self.registry.by_slug('test_slug').title, 'Тестовая группа')
+        FeedVersion.objects.filter(feed=cache.GROUPS_FEED).update(
+            version=F('version') + 1)
+        self.assertEqual(
+            self.registry.by_slug('test_slug').title, 'Новое название')
+
+    def test_saved_group_visible(self):
+        groups.registry.by_slug('test_slug')
+        Group.objects.create(title='Новая', slug='new', description='')
+        self.assertEqual(groups.get_group_or_404('new').title, 'Новая')
+        with self.assertRaises(Http404):
+            groups.get_group_or_404('missing')
+
+    @override_settings(GROUP_REGISTRY_CHECK_INTERVAL=60)
+    def test_check_interval(self):
+        self.registry.by_slug('test_slug')
+        cache.bump(cache.GROUPS_FEED)
+        with self.assertNumQueries(0):
+            self.registry.by_slug('test_slug')
+
+    @override_settings(
+        GROUP_REGISTRY_MAX_SIZE=0, GROUP_REGISTRY_CHECK_INTERVAL=60)
+    def test_too_many_groups_read_from_database(self):
+        self.registry.by_slug('test_slug')
+        with self.assertNumQueries(1):
+            self.assertEqual(self.registry.by_slug('test_slug'), self.group)
@@ -0,0 +1,91 @@
+import datetime
+import json
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from posts import counters, timeline, utils
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+
+class ImportPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+
+    def import_file(self, suffix, content, *args):
+        with tempfile.NamedTemporaryFile(
+                'w', suffix=suffix, encoding='utf-8') as file:
+            file.write(content)
+            file.flush()
+            call_command(
+                'import_posts', file.name, *args, stdout=StringIO())
+
+    def test_import_jsonl(self):
+        """Посты из JSONL сохраняются пачками с исходной датой."""
+        rows = [
+            {'text': f'Пост {i}', 'author': 'auth', 'group': 'test_slug',
+             'pub_date': f'2020-01-{i + 1:02d}T10:00:00+00:00'}
+            for i in range(5)
+        ]
+        rows.append({'text': 'Без автора', 'author': 'nobody'})
+        rows.append({'text': 'Чужая группа', 'author': 'auth',
+                     'group': 'missing'})
+        rows.append({'text': 'Дата числом', 'author': 'auth', 'pub_date': 5})
+        content = '\n'.join(json.dumps(row) for row in rows) + '\nbroken\n'
+        self.import_file('.jsonl', content, '--batch-size', '2')
+        self.assertEqual(Post.objects.count(), 5)
+        post = Post.objects.order_by('pub_date').first()
+        self.assertEqual(
+            (post.pub_date.year, post.pub_date.month, post.pub_date.day),
+            (2020, 1, 1)
+        )
+        self.assertEqual(post.updated, post.pub_date)
+        self.assertEqual(counters.group_count(self.group.id), 5)
+        self.assertEqual(counters.author_count(self.user.id), 5)
+
+    def test_import_fills_follower_timelines(self):
+        reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=reader, author=self.user)
+        self.import_file('.jsonl', json.dumps(
+            {'text': 'Импорт', 'author': 'auth'}) + '\n')
+        self.assertEqual(
+            [post.text for post in timeline.timeline_posts(reader.pk)],
+            ['Импорт'])
+
+    def test_import_csv_creates_authors(self):
+        """CSV с --create-authors заводит неизвестных авторов."""
+        content = 'text,author,group\nПервый,new_author,\nВторой,auth,\n'
+        self.import_file('.csv', content, '--create-authors')
+        author = User.objects.get(username='new_author')
+        self.assertFalse(author.has_usable_password())
+        self.assertEqual(Post.objects.filter(group=None).count(), 2)
+        self.assertEqual(counters.total_count(), 2)
+
+    def test_dates_kept_only_for_imported_posts(self):
+        """Импорт не выключает auto_now_add для остальных постов."""
+        old = timezone.make_aware(datetime.datetime(2020, 1, 1))
+        fields = [Post._meta.get_field(name) for name in (
+            'pub_date', 'updated')]
+        flags = [(field.auto_now, field.auto_now_add) for field in fields]
+        utils.insert_posts([Post(
+            author=self.user, text='Импорт', pub_date=old, updated=old)])
+        self.assertEqual(
+            [(field.auto_now, field.auto_now_add) for field in fields],
+            flags)
+        self.assertEqual(Post.objects.get(text='Импорт').pub_date, old)
+        post = Post.objects.create(
+            author=self.user, text='Новый пост', pub_date=old)
+        self.assertGreater(post.pub_date, old)
@@ -0,0 +1,55 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.core.wsgi import get_wsgi_application
+from django.test import TestCase
+
+from posts import counters
+from posts.loadtest import LoadRun, parse_mix
+from posts.models import Follow, Group, Post
+
+
+class LoadTestTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command(
+            'generate_data', users=20, groups=3, posts=300, follows=3,
+            stdout=StringIO())
+
+    def setUp(self):
+        cache.clear()
+
+    def test_generated_data(self):
+        """generate_data создаёт связанные данные и обновляет счётчики."""
+        self.assertEqual(Post.objects.count(), 300)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertTrue(Follow.objects.exists())
+        self.assertTrue(Post.objects.filter(group__isnull=False).exists())
+        self.assertEqual(counters.total_count(), 300)
+        self.assertEqual(counters.reconcile(), 0)
+
+    def test_generate_without_users(self):
+        with self.assertRaises(CommandError):
+            call_command('generate_data', users=0, stdout=StringIO())
+
+    def test_load_run_report(self):
+        """Прогон клиента через WSGI собирает задержки и запросы к базе."""
+        run = LoadRun(get_wsgi_application(), clients=1, requests=30)
+        run.prepare()
+        run.client_loop(0, 30)
+        report = run.report(duration=1.0)
+        self.assertEqual(report['requests'], 30)
+        self.assertEqual(report['errors'], 0)
+        index = report['views']['index']
+        self.assertGreater(index['requests'], 0)
+        self.assertGreater(index['queries_mean'], 0)
+        self.assertLessEqual(
+            index['latency_ms']['p50'], index['latency_ms']['p99'])
+
+    def test_parse_mix(self):
+        self.assertEqual(
+            parse_mix('index=3, profile=1'), {'index': 3.0, 'profile': 1.0})
+        with self.assertRaises(ValueError):
+            parse_mix('unknown=1')
@@ -0,0 +1,174 @@
+import datetime
+import socketserver
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
+from django.urls import reverse
+from django.utils import timezone
+
+from core.mail import queue_mail, send_queued
+from core.models import Job, OutboundEmail
+
+User = get_user_model()
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP: принимает всё и запоминает получателей."""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 localhost')
+        for raw in self.rfile:
+            command = raw.decode().strip().upper()
+            if command.startswith('EHLO'):
+                self.reply('250 localhost')
+            elif command.startswith('RCPT TO:'):
+                recipient = raw.decode().strip()[9:-1]
+                if recipient in self.server.refused:
+                    self.reply('550 no such user')
+                    continue
+                self.server.recipients.append(recipient)
+                self.reply('250 OK')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                for line in self.rfile:
+                    if line == b'.\r\n':
+                        break
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+        self.connections = 0
+        self.recipients = []
+        self.refused = set()
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+    MAIL_BATCH_SIZE=3, MAIL_RECIPIENT_LIMIT=2, TASKS_EAGER=False,
+)
+class MailQueueTest(TestCase):
+
+    def setUp(self):
+        self.server = SMTPServer()
+        threading.Thread(target=self.server.serve_forever).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        override = override_settings(EMAIL_PORT=self.server.server_address[1])
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_batches_share_one_connection(self):
+        """Несколько пачек писем уходят через одно SMTP-подключение."""
+        recipients = [f'user{i}@example.com' for i in range(7)]
+        self.assertEqual(
+            queue_mail('Тема', 'Текст', None, recipients), 7)
+        self.assertEqual(self.server.recipients, [])
+        send_queued()
+        self.assertEqual(self.server.recipients, recipients)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(
+            OutboundEmail.objects.filter(status=OutboundEmail.SENT).count(),
+            7)
+
+    def test_refused_recipient_does_not_stop_batch(self):
+        self.server.refused.add('bad@example.com')
+        queue_mail(
+            'Тема', 'Текст', None, ['bad@example.com', 'good@example.com'])
+        send_queued()
+        self.assertEqual(self.server.recipients, ['good@example.com'])
+        failed = OutboundEmail.objects.get(status=OutboundEmail.FAILED)
+        self.assertEqual(failed.to, 'bad@example.com')
+        self.assertIn('550', failed.last_error)
+
+    @override_settings(EMAIL_PORT=1)
+    def test_server_down_keeps_mail_queued(self):
+        queue_mail('Тема', 'Текст', None, ['user@example.com'])
+        with self.assertRaises(OSError):
+            send_queued()
+        self.assertEqual(
+            OutboundEmail.objects.get().status, OutboundEmail.QUEUED)
+
+    def test_old_finished_mail_purged(self):
+        queue_mail('Тема', 'Текст', None, ['old@example.com'])
+        send_queued()
+        queue_mail('Тема', 'Текст', None, ['new@example.com'])
+        OutboundEmail.objects.filter(to='old@example.com').update(
+            created=timezone.now() - datetime.timedelta(hours=2))
+        send_queued()
+        self.assertQuerysetEqual(
+            OutboundEmail.objects.all(), ['new@example.com'],
+            transform=lambda email: email.to)
+
+    def test_rate_limit_per_recipient(self):
+        for _ in range(3):
+            queue_mail('Тема', 'Текст', None, ['user@example.com'])
+        queue_mail('Тема', 'Текст', None, ['other@example.com'])
+        self.assertEqual(
+            OutboundEmail.objects.filter(to='user@example.com').count(), 2)
+        self.assertEqual(
+            OutboundEmail.objects.filter(to='other@example.com').count(), 1)
+
+
+def reset(client, email):
+    return client.post(reverse('users:password_reset_form'), {'email': email})
+
+
+@override_settings(TASKS_EAGER=False)
+class PasswordResetQueueTest(TransactionTestCase):
+    """Без общей транзакции теста задача ставится в очередь сразу."""
+
+    def setUp(self):
+        User.objects.create_user(
+            username='auth', email='auth@example.com', password='secret')
+        self.client = Client()
+
+    def test_reset_only_queues_task(self):
+        """Ответ одинаков для известного и неизвестного адреса."""
+        # Единственный запрос - вставка задачи.
+        with self.assertNumQueries(1):
+            response = reset(self.client, 'auth@example.com')
+        self.assertRedirects(response, reverse('password_reset_done'))
+        job = Job.objects.get()
+        self.assertEqual(job.task, 'users.tasks.send_password_reset')
+        with self.assertNumQueries(1):
+            reset(self.client, 'nobody@example.com')
+        self.assertEqual(
+            Job.objects.filter(
+                task='users.tasks.send_password_reset').count(), 2)
+        self.assertEqual(mail.outbox, [])
+
+
+class PasswordResetTest(TestCase):
+
+    def setUp(self):
+        User.objects.create_user(
+            username='auth', email='auth@example.com', password='secret')
+        self.client = Client()
+
+    @override_settings(
+        TASKS_EAGER=True,
+        EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    )
+    def test_reset_email_delivered_by_queue(self):
+        reset(self.client, 'auth@example.com')
+        reset(self.client, 'nobody@example.com')
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['auth@example.com'])
+        self.assertIn('testserver', mail.outbox[0].body)
@@ -0,0 +1,86 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.metrics import Histogram, bucket_index, registry
+from posts.models import Post
+
+User = get_user_model()
+
+
+class HistogramTest(TestCase):
+    def test_buckets_keep_relative_precision(self):
+        """Граница корзины отличается от значения не больше чем на 1/16."""
+        histogram = Histogram()
+        for value in (0, 1, 31, 32, 1000, 123_456, 10 ** 9):
+            histogram.record(value)
+            bound = list(histogram.cumulative())[-1][0]
+            self.assertGreaterEqual(bound, value)
+            self.assertLessEqual(bound - value, value / 16)
+        self.assertEqual(histogram.count, 7)
+
+    def test_bucket_indexes_are_monotonic(self):
+        indexes = [bucket_index(value) for value in range(5000)]
+        self.assertEqual(indexes, sorted(indexes))
+
+    def test_percentile(self):
+        histogram = Histogram()
+        for value in range(1, 101):
+            histogram.record(value)
+        for percent in (50, 99):
+            with self.subTest(percent=percent):
+                self.assertGreaterEqual(histogram.percentile(percent), percent)
+                self.assertLessEqual(
+                    histogram.percentile(percent), percent * 17 / 16)
+
+
+class MetricsMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+        self.guest_client = Client()
+
+    def test_view_metrics_recorded(self):
+        """Middleware записывает запросы к базе и время по имени view."""
+        self.guest_client.get(reverse('posts:index'))
+        queries = registry.histogram('yatube_db_queries', 'posts:index')
+        self.assertEqual(queries.count, 1)
+        self.assertGreater(queries.total, 0)
+        render = registry.histogram(
+            'yatube_template_render_seconds', 'posts:index')
+        self.assertGreater(render.total, 0)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_endpoint(self):
+        """/metrics отдаёт гистограммы в формате Prometheus."""
+        self.guest_client.get(reverse('posts:index'))
+        response = self.guest_client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('# TYPE yatube_request_duration_seconds histogram', body)
+        self.assertIn(
+            'yatube_db_queries_count{view="posts:index"} 1', body)
+        self.assertIn(
+            'yatube_request_duration_seconds_bucket'
+            '{view="posts:index",le="+Inf"} 1', body)
+
+    def test_metrics_endpoint_off_without_token(self):
+        response = self.guest_client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer ')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_endpoint_needs_token(self):
+        for header in ('', 'Bearer wrong', 'secret'):
+            with self.subTest(header=header):
+                response = self.guest_client.get(
+                    reverse('metrics'), HTTP_AUTHORIZATION=header)
+                self.assertEqual(response.status_code, 404)
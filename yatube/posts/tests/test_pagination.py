@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.template import Context, Template
+from django.test import Client, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from posts.models import Post
+from posts.utils import CursorPaginator, encode_cursor
+
+User = get_user_model()
+
+
+def window(count, number):
+    return CursorPaginator(
+        Post.objects.none(), 10, count=count).page(number).page_window
+
+
+class PageWindowTest(SimpleTestCase):
+
+    def test_short_feed_lists_all_pages(self):
+        self.assertEqual(window(70, 4), (1, 2, 3, 4, 5, 6, 7))
+
+    def test_middle_page(self):
+        self.assertEqual(
+            window(10_000, 500), (1, None, 498, 499, 500, 501, 502, None,
+                                  1000))
+
+    def test_edges(self):
+        self.assertEqual(window(10_000, 1), (1, 2, 3, None, 1000))
+        self.assertEqual(window(10_000, 5), (1, 2, 3, 4, 5, 6, 7, None, 1000))
+        self.assertEqual(
+            window(10_000, 1000), (1, None, 998, 999, 1000))
+
+    def test_length_does_not_grow(self):
+        for count in (1_000, 100_000, 10_000_000):
+            with self.subTest(count=count):
+                self.assertLessEqual(len(window(count, count // 20)), 9)
+
+    def test_tag_renders_ellipsis(self):
+        page_obj = CursorPaginator(
+            Post.objects.none(), 10, count=10_000).page(500)
+        html = Template(
+            '{% load pagination %}{% page_window page_obj "group=1&" %}'
+        ).render(Context({'page_obj': page_obj}))
+        self.assertEqual(html.count('&hellip;'), 2)
+        self.assertIn('href="?group=1&page=1000"', html)
+        self.assertIn('<span class="page-link">500</span>', html)
+        self.assertNotIn('page=2"', html)
+
+
+class PaginatorTemplateTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {number}')
+            for number in range(100))
+
+    def test_cursor_page_without_numbers(self):
+        first = Post.objects.order_by(*CursorPaginator.ordering)[0]
+        response = Client().get(
+            reverse('posts:index'),
+            {'cursor': encode_cursor('next', first)})
+        self.assertTrue(response.context['page_obj'].is_cursor)
+        self.assertNotContains(response, 'page=2"')
+        self.assertNotContains(response, '&hellip;')
+
+    def test_numbered_page_window(self):
+        response = Client().get(reverse('posts:index'), {'page': 6})
+        self.assertEqual(
+            response.context['page_obj'].page_window,
+            (1, None, 4, 5, 6, 7, 8, 9, 10))
+        self.assertContains(response, '&hellip;', count=1)
@@ -0,0 +1,153 @@
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache as default_cache
+from django.test import Client, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from posts import post_cache
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostCacheViewTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth', first_name='Имя', last_name='Фамилия')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test_slug', description='')
+        cls.post = Post.objects.create(
+            author=cls.user, text='Тестовый пост', group=cls.group)
+
+    def setUp(self):
+        default_cache.clear()
+        self.client = Client()
+        self.url = reverse('posts:post_detail', args=[self.post.pk])
+
+    def test_hit_reads_only_versions(self):
+        self.client.get(self.url)
+        # Остаётся один запрос: версии лент автора и групп.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.context['post'], self.post)
+        self.assertContains(response, 'Имя Фамилия')
+        self.assertEqual(response.context['group_slug'], 'test_slug')
+        self.assertEqual(response.context['posts_count'], 1)
+
+    def test_entry_without_private_fields(self):
+        author = post_cache.load(self.post.pk)['post'].author
+        self.assertTrue(
+            {'password', 'email'} <= author.get_deferred_fields())
+
+    def test_author_name_change(self):
+        self.client.get(self.url)
+        self.user.first_name = 'Другое'
+        self.user.save()
+        self.assertContains(self.client.get(self.url), 'Другое Фамилия')
+
+    def test_empty_full_name(self):
+        User.objects.filter(pk=self.user.pk).update(
+            first_name='', last_name='')
+        response = self.client.get(self.url)
+        self.assertNotContains(response, 'Автор: auth')
+
+    def test_edit_invalidates(self):
+        self.client.get(self.url)
+        self.client.force_login(self.user)
+        self.client.post(
+            reverse('posts:post_edit', args=[self.post.pk]),
+            {'text': 'Новый текст'})
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Новый текст')
+        self.assertEqual(response.context['group_slug'], None)
+
+    def test_author_count_and_group_changes(self):
+        self.client.get(self.url)
+        Post.objects.create(author=self.user, text='Ещё пост')
+        Group.objects.filter(pk=self.group.pk).update(slug='renamed')
+        Group.objects.get(pk=self.group.pk).save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['posts_count'], 2)
+        self.assertEqual(response.context['group_slug'], 'renamed')
+
+    def test_deleted_post(self):
+        self.client.get(self.url)
+        Post.objects.filter(pk=self.post.pk).delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class SingleFlightTest(SimpleTestCase):
+
+    def setUp(self):
+        default_cache.clear()
+        self.loads = 0
+        patcher = mock.patch.object(
+            post_cache, '_versions', lambda author_id: [1.0, 1.0])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def slow_load(self, post_id):
+        self.loads += 1
+        time.sleep(0.05)
+        return {
+            'post': post_id,
+            'author_id': 1,
+            'versions': [1.0, 1.0],
+        }
+
+    def test_concurrent_misses_load_once(self):
+        results = []
+        with mock.patch.object(post_cache, 'load', self.slow_load):
+            threads = [
+                threading.Thread(
+                    target=lambda: results.append(post_cache.get_entry(7)))
+                for _ in range(20)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(self.loads, 1)
+        self.assertEqual([entry['post'] for entry in results], [7] * 20)
+
+    def test_waits_for_other_process(self):
+        """Флаг загрузки ставит другой процесс и затем кладёт запись."""
+        post_cache.cache.get_cache().add(post_cache.LOCK_KEY.format(7), 1)
+        shared = mock.patch.object(post_cache, '_shared', lambda store: True)
+        shared.start()
+        self.addCleanup(shared.stop)
+
+        def other_process():
+            time.sleep(0.05)
+            post_cache.cache.get_cache().set(
+                post_cache.POST_KEY.format(7), self.slow_load(7))
+            post_cache.cache.get_cache().delete(post_cache.LOCK_KEY.format(7))
+
+        loader = threading.Thread(target=other_process)
+        loader.start()
+        with mock.patch.object(post_cache, 'load', self.slow_load):
+            entry = post_cache.get_entry(7)
+        loader.join()
+        self.assertEqual(entry['post'], 7)
+        self.assertEqual(self.loads, 1)
+
+    def test_wait_releases_thread_lock(self):
+        """Пока процесс ждёт чужую загрузку, блокировка потоков свободна."""
+        post_cache.cache.get_cache().add(post_cache.LOCK_KEY.format(7), 1)
+        shared = mock.patch.object(post_cache, '_shared', lambda store: True)
+        shared.start()
+        self.addCleanup(shared.stop)
+        locked = []
+
+        def wait(store, key, lock_key):
+            locked.append(post_cache._lock(key).locked())
+            return self.slow_load(7)
+
+        with mock.patch.object(post_cache, '_wait', wait):
+            post_cache.get_entry(7)
+        self.assertEqual(locked, [False])
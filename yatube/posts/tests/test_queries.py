@@ -0,0 +1,109 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import counters, groups, utils
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+NUM_OF_POSTS = 25
+
+
+@override_settings(GROUP_REGISTRY_CHECK_INTERVAL=60)
+class PostQueriesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.user = User.objects.create_user(
+            username='auth', first_name='Имя', last_name='Фамилия')
+        # Посты разных авторов, чтобы N+1 по авторам был заметен.
+        for i in range(NUM_OF_POSTS):
+            author = User.objects.create_user(username=f'author_{i}')
+            Post.objects.create(
+                author=author if i % 2 else cls.user,
+                text=f'Тестовый пост {i}',
+                group=cls.group,
+            )
+        cls.post = Post.objects.filter(author=cls.user).first()
+        # Бюджет запросов анонимного посетителя, включая запросы
+        # валидаторов условного GET.
+        cls.budgets = (
+            (reverse('posts:index'), 3),
+            (reverse('posts:index') + '?page=2', 3),
+            (reverse('posts:group_list', args=[cls.group.slug]), 3),
+            (reverse('posts:profile', args=[cls.user.username]), 5),
+            (reverse('posts:post_detail', args=[cls.post.id]), 3),
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        counters.reconcile()
+        # Бюджеты считаются для страниц, которых ещё нет в кэше лент,
+        # при уже прочитанном реестре групп.
+        cache.clear()
+        groups.registry.by_slug(self.group.slug)
+
+    def test_views_query_budget(self):
+        """Число запросов страниц не зависит от числа постов на них."""
+        for url, budget in self.budgets:
+            with self.subTest(url=url):
+                with self.assertNumQueries(budget):
+                    self.guest_client.get(url)
+
+    def test_cursor_page_query_budget(self):
+        """Страница по курсору укладывается в тот же бюджет."""
+        response = self.guest_client.get(reverse('posts:index'))
+        next_cursor = response.context['page_obj'].next_cursor
+        with self.assertNumQueries(3):
+            self.guest_client.get(
+                reverse('posts:index'), {'cursor': next_cursor})
+
+    def test_warm_feed_query_budget(self):
+        """Из кэша лента читает только счётчик и версии лент."""
+        for url in (reverse('posts:index'),
+                    reverse('posts:group_list', args=[self.group.slug])):
+            with self.subTest(url=url):
+                self.guest_client.get(url)
+                with self.assertNumQueries(2):
+                    self.guest_client.get(url)
+
+    def test_warm_post_detail_query_budget(self):
+        """Пост из кэша читает только версии лент автора и групп."""
+        url = reverse('posts:post_detail', args=[self.post.id])
+        self.guest_client.get(url)
+        with self.assertNumQueries(1):
+            self.guest_client.get(url)
+
+    def test_follow_index_query_budget(self):
+        """Лента подписок - одна выборка записей ленты с постами.
+
+        Сессия и пользователь, версия набора знаменитостей, счётчик
+        ленты и страница записей.
+        """
+        reader = User.objects.create_user(username='reader')
+        for author in User.objects.exclude(pk=reader.pk):
+            Follow.objects.create(user=reader, author=author)
+        client = Client()
+        client.force_login(reader)
+        url = reverse('posts:follow_index')
+        response = client.get(url)
+        self.assertEqual(
+            len(response.context['page_obj']), utils.LIMIT_POSTS_ON_PAGE)
+        for params in ({}, {'cursor': response.context[
+                'page_obj'].next_cursor}):
+            with self.subTest(params=params):
+                with CaptureQueriesContext(connection) as queries:
+                    client.get(url, params)
+                self.assertEqual(len(queries), 5, queries.captured_queries)
+                self.assertFalse(any(
+                    'COUNT(' in query['sql']
+                    for query in queries.captured_queries))
@@ -0,0 +1,110 @@
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from posts import timeline
+from posts.models import Follow, Group, Post
+from posts.utils import (LIMIT_POSTS_ON_PAGE, CursorPaginator,
+                         TimelinePaginator, feed)
+
+User = get_user_model()
+
+
+def explain(queryset):
+    """Строки EXPLAIN QUERY PLAN для запроса queryset."""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def post_step(plan):
+    """Шаг плана, читающий таблицу постов.
+
+    Автор или группа ленты могут идти раньше: это поиск одной строки
+    по первичному ключу.
+    """
+    return next(step for step in plan if 'posts_post ' in step)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN для SQLite')
+class FeedQueryPlanTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+        cls.feeds = {
+            'index': (feed(), 'post_feed_idx'),
+            'group_posts': (feed(group=cls.group), 'post_group_feed_idx'),
+            'profile': (feed(author=cls.user), 'post_author_feed_idx'),
+        }
+
+    def feed_queries(self, post_list):
+        """Запросы страниц ленты: номерная, глубокая и по курсорам."""
+        paginator = CursorPaginator(post_list, LIMIT_POSTS_ON_PAGE)
+        position = (self.post.pub_date, self.post.pk)
+        object_list = paginator.object_list
+        return {
+            'first page': object_list[:LIMIT_POSTS_ON_PAGE],
+            'deep page': object_list[
+                LIMIT_POSTS_ON_PAGE * 1000:LIMIT_POSTS_ON_PAGE * 1001],
+            'next cursor': paginator.posts_after(
+                position)[:LIMIT_POSTS_ON_PAGE + 1],
+            'previous cursor': paginator.posts_before(
+                position)[:LIMIT_POSTS_ON_PAGE + 1],
+        }
+
+    def test_feeds_use_index_without_sort(self):
+        """Ленты читаются по индексу, без сортировки во временном B-tree."""
+        for feed_name, (post_list, index) in self.feeds.items():
+            for name, queryset in self.feed_queries(post_list).items():
+                with self.subTest(feed=feed_name, query=name):
+                    plan = explain(queryset)
+                    self.assertIn(f'USING INDEX {index}', post_step(plan))
+                    self.assertFalse(
+                        [step for step in plan if 'TEMP B-TREE' in step])
+
+    def test_cursor_pages_search_range(self):
+        """Страницы по курсору ищут диапазон, а не сканируют индекс."""
+        for feed_name, (post_list, index) in self.feeds.items():
+            queries = self.feed_queries(post_list)
+            for name in ('next cursor', 'previous cursor'):
+                with self.subTest(feed=feed_name, query=name):
+                    step = post_step(explain(queries[name]))
+                    self.assertTrue(step.startswith('SEARCH'))
+                    self.assertIn('pub_date', step)
+
+    def test_timeline_reads_user_index(self):
+        """Лента подписок читается по индексу записей одного читателя."""
+        reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=reader, author=self.user)
+        paginator = TimelinePaginator(
+            timeline.timeline_entries(reader.pk), LIMIT_POSTS_ON_PAGE)
+        position = (self.post.pub_date, self.post.pk)
+        queries = {
+            'first page': paginator.object_list[:LIMIT_POSTS_ON_PAGE],
+            'next cursor': paginator.posts_after(
+                position)[:LIMIT_POSTS_ON_PAGE + 1],
+            'previous cursor': paginator.posts_before(
+                position)[:LIMIT_POSTS_ON_PAGE + 1],
+        }
+        for name, queryset in queries.items():
+            with self.subTest(query=name):
+                plan = explain(queryset)
+                step = next(
+                    step for step in plan if 'posts_timelineentry' in step)
+                self.assertIn('INDEX timeline_user_idx', step)
+                self.assertFalse(
+                    [step for step in plan if 'TEMP B-TREE' in step])
@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import tempfile
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.middleware import ReplicaMiddleware
+from core.routers import ReplicaRouter, state, use_replicas
+from core.sqlite import copy_database
+from posts.models import Follow, Group, Post, User
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+class ReplicaRouterTest(SimpleTestCase):
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_outside_requests_go_to_default(self):
+        """Команды и сигналы вне запроса читают default."""
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_feed_models_read_from_replicas(self):
+        with use_replicas():
+            for model in (Post, Group, User):
+                with self.subTest(model=model):
+                    self.assertIn(
+                        self.router.db_for_read(model),
+                        ('replica1', 'replica2'))
+            self.assertEqual(self.router.db_for_read(Follow), 'default')
+            self.assertEqual(self.router.db_for_write(Post), 'default')
+        self.assertFalse(state.enabled)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        with use_replicas():
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_migrations_only_on_default(self):
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+        self.assertFalse(self.router.allow_migrate('replica1', 'posts'))
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaMiddlewareTest(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.seen = []
+
+        def view(request):
+            self.seen.append(state.enabled)
+            return HttpResponse(content_type='text/plain')
+
+        self.middleware = ReplicaMiddleware(view)
+
+    def test_safe_request_uses_replicas(self):
+        response = self.middleware(self.factory.get('/'))
+        self.assertEqual(self.seen, [True])
+        self.assertNotIn('replica_pin', response.cookies)
+        self.assertFalse(state.enabled)
+
+    def test_write_pins_user_to_default(self):
+        """После записи пользователь читает default, пока есть cookie."""
+        response = self.middleware(self.factory.post('/'))
+        self.assertEqual(self.seen, [False])
+        self.assertEqual(response.cookies['replica_pin']['max-age'], 30)
+        request = self.factory.get('/')
+        request.COOKIES['replica_pin'] = '1'
+        self.middleware(request)
+        self.assertEqual(self.seen, [False, False])
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_cookie_without_replicas(self):
+        response = self.middleware(self.factory.post('/'))
+        self.assertNotIn('replica_pin', response.cookies)
+
+
+class CopyDatabaseTest(SimpleTestCase):
+
+    def test_replica_receives_copy(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'default.sqlite3')
+            target = os.path.join(directory, 'replica.sqlite3')
+            database = sqlite3.connect(source)
+            database.execute('PRAGMA journal_mode = wal')
+            database.execute('CREATE TABLE post (text TEXT)')
+            database.execute("INSERT INTO post VALUES ('первый')")
+            database.commit()
+            copy_database(source, target)
+            replica = sqlite3.connect(target)
+            reader = replica.execute('SELECT text FROM post')
+            database.execute("INSERT INTO post VALUES ('второй')")
+            database.commit()
+            # Копирование не ломает открытое чтение с реплики.
+            copy_database(source, target)
+            self.assertEqual(reader.fetchall(), [('первый',)])
+            rows = replica.execute(
+                'SELECT text FROM post ORDER BY rowid').fetchall()
+            replica.close()
+            database.close()
+        self.assertEqual(rows, [('первый',), ('второй',)])
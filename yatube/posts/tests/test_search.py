@@ -0,0 +1,106 @@
+import unittest
+
+from django.contrib.admin.sites import site
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from posts import search
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'FTS5 есть в SQLite')
+@override_settings(TASKS_EAGER=True)
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Рецепт борща со сметаной',
+            group=cls.group,
+        )
+        cls.other_post = Post.objects.create(
+            author=cls.user,
+            text='Борщ, борщ и ещё раз борщ',
+        )
+        for i in range(15):
+            Post.objects.create(author=cls.user, text=f'Заметка про щи {i}')
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def search(self, query, **params):
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': query, **params})
+        return response.context['page_obj']
+
+    def test_ranked_results(self):
+        """Найденные посты упорядочены по релевантности."""
+        self.assertEqual(
+            list(self.search('БОРЩ')), [self.other_post, self.post])
+
+    def test_index_follows_edits(self):
+        """Сигналы обновляют индекс при правке и удалении поста."""
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Рецепт окрошки'
+        post.save()
+        self.assertEqual(list(self.search('борщ')), [self.other_post])
+        self.assertEqual(list(self.search('окрошки')), [post])
+        Post.objects.get(pk=self.other_post.pk).delete()
+        self.assertEqual(list(self.search('борщ')), [])
+
+    def test_paginated_results_keep_query(self):
+        """Результаты делятся на страницы, ссылки сохраняют запрос."""
+        page = self.search('щи')
+        self.assertEqual(page.paginator.count, 15)
+        self.assertEqual(len(page), 10)
+        self.assertEqual(len(self.search('щи', page=2)), 5)
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': 'щи'})
+        self.assertContains(response, '?q=%D1%89%D0%B8&amp;page=2')
+
+    def test_operators_are_escaped(self):
+        """Операторы FTS5 в запросе не ломают поиск."""
+        for query in ('борщ OR', '"борщ', 'NEAR(', '*', ''):
+            with self.subTest(query=query):
+                self.guest_client.get(reverse('posts:search'), {'q': query})
+
+    def test_rebuild_and_new_posts(self):
+        """Посты без сигналов попадают в индекс командами индексации."""
+        Post.objects.bulk_create([
+            Post(author=self.user, text='Пельмени домашние')])
+        self.assertEqual(list(self.search('пельмени')), [])
+        self.assertEqual(search.index_new_posts(), 1)
+        self.assertEqual(len(self.search('пельмени')), 1)
+        self.assertEqual(search.rebuild(), Post.objects.count())
+        self.assertEqual(len(self.search('пельмени')), 1)
+
+    def test_new_posts_below_indexed_id(self):
+        """Посты импорта с id меньше проиндексированного не теряются."""
+        top = Post.objects.order_by('-pk').values_list('pk', flat=True)[0]
+        search.index_post(top + 100, 'Пост с сайта')
+        Post.objects.bulk_create([
+            Post(pk=top + i, author=self.user, text=f'Вареники {i}')
+            for i in range(1, 4)])
+        self.assertEqual(search.index_new_posts(), 3)
+        self.assertEqual(len(self.search('вареники')), 3)
+
+    def test_admin_uses_index(self):
+        """Поиск в админке идёт через индекс FTS5."""
+        admin_model = site._registry[Post]
+        request = RequestFactory().get('/admin/posts/post/')
+        queryset, distinct = admin_model.get_search_results(
+            request, Post.objects.all(), 'борщ')
+        self.assertIn(search.TABLE, str(queryset.query))
+        self.assertEqual(
+            set(queryset), {self.post, self.other_post})
@@ -0,0 +1,41 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+
+from core.sqlite import apply_pragmas, configure_connection
+
+
+class SqlitePragmasTest(SimpleTestCase):
+    databases = {'default'}
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'PRAGMA SQLite')
+    def test_connection_configured(self):
+        """Подключение получает PRAGMA из SQLITE_PRAGMAS."""
+        connection.ensure_connection()
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+
+    def test_wal_on_file_database(self):
+        with tempfile.TemporaryDirectory() as directory:
+            database = sqlite3.connect(os.path.join(directory, 'test.db'))
+            apply_pragmas(database, {'journal_mode': 'wal'})
+            mode = database.execute('PRAGMA journal_mode').fetchone()[0]
+            database.close()
+        self.assertEqual(mode, 'wal')
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_pragmas_can_be_disabled(self):
+        class Connection:
+            vendor = 'sqlite'
+
+            def cursor(self):
+                raise AssertionError('PRAGMA не должны выполняться')
+
+        configure_connection(sender=None, connection=Connection())
@@ -0,0 +1,117 @@
+import json
+import os
+import shutil
+import tempfile
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core import storage
+from core.static import StaticFilesApplication, accepted_encodings
+
+
+class StaticIncludesTest(TestCase):
+
+    def test_stylesheet_linked_once(self):
+        response = Client().get(reverse('posts:index'))
+        self.assertEqual(
+            response.content.decode().count('css/bootstrap.min'), 1)
+
+
+class StaticPipelineTest(SimpleTestCase):
+    """collectstatic со сжатием и отдача через StaticFilesApplication."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.root = tempfile.mkdtemp()
+        with override_settings(
+            STATIC_ROOT=cls.root,
+            STATICFILES_STORAGE=(
+                'core.storage.CompressedManifestStaticFilesStorage'),
+            STATICFILES_FINDERS=[
+                'django.contrib.staticfiles.finders.FileSystemFinder'],
+        ):
+            call_command('collectstatic', interactive=False, verbosity=0)
+        with open(os.path.join(cls.root, 'staticfiles.json')) as manifest:
+            cls.paths = json.load(manifest)['paths']
+        cls.css = settings.STATIC_URL + cls.paths['css/bootstrap.min.css']
+        cls.application = StaticFilesApplication(
+            cls.django_application, cls.root, settings.STATIC_URL)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.root)
+        super().tearDownClass()
+
+    @staticmethod
+    def django_application(environ, start_response):
+        start_response('404 Not Found', [])
+        return [b'django']
+
+    def get(self, path, method='GET', **headers):
+        environ = {'PATH_INFO': path, 'REQUEST_METHOD': method, **headers}
+        setup_testing_defaults(environ)
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split()[0])
+            response['headers'] = dict(headers)
+
+        body = b''.join(self.application(environ, start_response))
+        return response['status'], response['headers'], body
+
+    def test_compressed_copies(self):
+        hashed = os.path.join(self.root, self.paths['css/bootstrap.min.css'])
+        self.assertTrue(os.path.exists(hashed + '.gz'))
+        if storage.brotli is not None:
+            self.assertTrue(os.path.exists(hashed + '.br'))
+        # PNG уже сжат, копии не нужны.
+        logo = os.path.join(self.root, self.paths['img/logo.png'])
+        self.assertFalse(os.path.exists(logo + '.gz'))
+
+    def test_hashed_file_is_immutable(self):
+        status, headers, body = self.get(
+            self.css, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(status, 200)
+        self.assertIn('immutable', headers['Cache-Control'])
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(int(headers['Content-Length']), len(body))
+
+    def test_encoding_negotiation(self):
+        if storage.brotli is not None:
+            _, headers, _ = self.get(
+                self.css, HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+            self.assertEqual(headers['Content-Encoding'], 'br')
+        _, headers, body = self.get(
+            self.css, HTTP_ACCEPT_ENCODING='gzip;q=0, br;q=0')
+        self.assertNotIn('Content-Encoding', headers)
+        self.assertTrue(body.startswith(b'@charset'))
+
+    def test_unhashed_name_short_cache(self):
+        _, headers, _ = self.get(settings.STATIC_URL + 'css/bootstrap.min.css')
+        self.assertEqual(headers['Cache-Control'], 'public, max-age=60')
+
+    def test_conditional_and_methods(self):
+        _, headers, _ = self.get(self.css)
+        status, _, body = self.get(
+            self.css, HTTP_IF_NONE_MATCH=headers['ETag'])
+        self.assertEqual((status, body), (304, b''))
+        status, _, body = self.get(self.css, method='HEAD')
+        self.assertEqual((status, body), (200, b''))
+        self.assertEqual(self.get(self.css, method='POST')[0], 405)
+
+    def test_other_paths_go_to_django(self):
+        for path in ('/', settings.STATIC_URL + 'missing.css',
+                     settings.STATIC_URL + '../manage.py'):
+            with self.subTest(path=path):
+                self.assertEqual(self.get(path)[2], b'django')
+
+    def test_accept_encoding_parsing(self):
+        self.assertEqual(
+            accepted_encodings('gzip;q=1.0, br; q=0, identity'),
+            {'gzip', 'identity'})
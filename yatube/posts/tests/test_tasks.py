@@ -0,0 +1,145 @@
+import datetime
+import json
+
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from core.models import Job
+from core.tasks import Worker, enqueue, task
+from posts.models import Post, User
+
+CALLS = []
+
+
+@task
+def record(value):
+    CALLS.append(value)
+
+
+@task(max_attempts=2)
+def broken():
+    raise ValueError('сломано')
+
+
+def noop():
+    pass
+
+
+@task(atomic=False)
+def noop_without_transaction():
+    pass
+
+
+def make_jobs(name, count, **fields):
+    Job.objects.bulk_create(
+        Job(task=name, payload=json.dumps({'args': [], 'kwargs': {}}),
+            max_attempts=5, run_at=timezone.now(), **fields)
+        for _ in range(count)
+    )
+
+
+@override_settings(TASKS_EAGER=False, TASK_RETRY_DELAY=10)
+class TaskQueueTest(TransactionTestCase):
+
+    def setUp(self):
+        CALLS.clear()
+
+    def test_delay_waits_for_commit(self):
+        """Задача попадает в очередь только после фиксации транзакции."""
+        with transaction.atomic():
+            record.delay(1)
+            self.assertFalse(Job.objects.exists())
+        job = Job.objects.get()
+        self.assertEqual(job.task, f'{__name__}.record')
+        self.assertEqual(json.loads(job.payload), {'args': [1], 'kwargs': {}})
+
+    def test_rollback_drops_job(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                record.delay(1)
+                raise RuntimeError
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_runs_inline(self):
+        record.delay(2)
+        self.assertEqual(CALLS, [2])
+        self.assertFalse(Job.objects.exists())
+
+    def test_worker_runs_and_deletes_jobs(self):
+        for value in range(3):
+            enqueue(f'{__name__}.record', [value])
+        self.assertEqual(Worker().run_pending(), 3)
+        self.assertEqual(CALLS, [0, 1, 2])
+        self.assertFalse(Job.objects.exists())
+
+    def test_retry_with_backoff(self):
+        broken.delay()
+        Worker().run_pending()
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn('ValueError', job.last_error)
+        delay = (job.run_at - timezone.now()).total_seconds()
+        self.assertTrue(4 < delay <= 10)
+        # До срока повтора задача не берётся.
+        self.assertEqual(Worker().run_pending(), 0)
+        Job.objects.update(run_at=timezone.now())
+        Worker().run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    @override_settings(TASK_TIMEOUT=60)
+    def test_stale_jobs_return_to_queue(self):
+        """Задачи умершего обработчика выполняются снова или падают."""
+        long_ago = timezone.now() - datetime.timedelta(minutes=5)
+        make_jobs(
+            f'{__name__}.noop', 1, status=Job.RUNNING, locked_at=long_ago,
+            attempts=1)
+        make_jobs(
+            f'{__name__}.noop', 1, status=Job.RUNNING, locked_at=long_ago,
+            attempts=5)
+        self.assertEqual(Worker().run_pending(), 1)
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.FAILED)
+
+    def test_workers_claim_disjoint_batches(self):
+        make_jobs(f'{__name__}.noop', 30)
+        first = Worker(batch_size=20).claim()
+        second = Worker(batch_size=20).claim()
+        self.assertEqual(len(first), 20)
+        self.assertEqual(len(second), 10)
+        self.assertFalse(
+            {job.pk for job in first} & {job.pk for job in second})
+        self.assertEqual(Worker().claim(), [])
+
+    def test_batch_queries_do_not_depend_on_size(self):
+        """Пачка задач стоит одинаковое число запросов при любом размере.
+
+        Скорость в задачах в секунду измеряет bench_workers.
+        """
+        name = f'{__name__}.noop_without_transaction'
+        # Пачка: сброс зависших, взятие, выборка, BEGIN и удаление;
+        # последнее взятие ничего не находит.
+        for batch_size, batches in ((100, 3), (300, 1)):
+            with self.subTest(batch_size=batch_size):
+                make_jobs(name, 300)
+                with self.assertNumQueries(batches * 5 + 3):
+                    done = Worker(batch_size=batch_size).run_pending()
+                self.assertEqual(done, 300)
+                self.assertFalse(Job.objects.exists())
+
+    def test_post_create_defers_side_effects(self):
+        """Индекс и ленты подписок обновляются задачами, а не в запросе."""
+        author = User.objects.create_user(username='author')
+        post = Post.objects.create(author=author, text='Текст')
+        self.assertEqual(
+            set(Job.objects.values_list('task', flat=True)),
+            {'posts.tasks.index_post', 'posts.tasks.fan_out'})
+        self.assertEqual(Worker().run_pending(), 2)
+        post.delete()
+        self.assertEqual(
+            list(Job.objects.values_list('task', flat=True)),
+            ['posts.tasks.unindex_post'])
@@ -0,0 +1,152 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import F
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import counters, timeline
+from posts.models import FeedVersion, Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+@override_settings(
+    TIMELINE_LENGTH=10, TIMELINE_CELEBRITY_FOLLOWERS=3, TASKS_EAGER=True)
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.author, text='Старый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def timeline(self):
+        return list(timeline.timeline_posts(self.reader.id))
+
+    def test_follow_backfills_and_unfollow_clears(self):
+        """Подписка добавляет посты автора в ленту, отписка убирает."""
+        self.client.get(
+            reverse('posts:profile_follow', args=[self.author.username]))
+        self.assertEqual(self.timeline(), [self.post])
+        self.client.get(
+            reverse('posts:profile_unfollow', args=[self.author.username]))
+        self.assertEqual(self.timeline(), [])
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    def test_new_post_fans_out(self):
+        """Новый пост автора раскладывается по лентам подписчиков."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(self.timeline(), [post, self.post])
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(list(response.context['page_obj']), [post, self.post])
+
+    def test_deleted_post_shrinks_timeline(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Удалить')
+        self.assertEqual(counters.timeline_count(self.reader.id), 2)
+        post.delete()
+        self.assertEqual(counters.timeline_count(self.reader.id), 1)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 1)
+
+    def test_follow_index_cursor_pages(self):
+        """Страницы ленты подписок идут по курсорам записей ленты."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        posts = [self.post] + [
+            Post.objects.create(author=self.author, text=f'Пост {i}')
+            for i in range(9)]
+        url = reverse('posts:follow_index')
+        first = self.client.get(url).context['page_obj']
+        self.assertEqual(first.paginator.count, 10)
+        self.assertEqual(list(first), posts[:-11:-1][:10])
+        # TIMELINE_LENGTH=10, LIMIT_POSTS_ON_PAGE=10: страница одна.
+        self.assertFalse(first.has_next())
+        with self.settings(TIMELINE_LENGTH=20):
+            more = Post.objects.create(author=self.author, text='Ещё')
+            first = self.client.get(url).context['page_obj']
+            second = self.client.get(
+                url, {'cursor': first.next_cursor}).context['page_obj']
+        self.assertEqual(first[0], more)
+        self.assertEqual(list(second), [self.post])
+
+    def test_cannot_follow_self(self):
+        self.client.get(
+            reverse('posts:profile_follow', args=[self.reader.username]))
+        self.assertFalse(Follow.objects.exists())
+
+    def test_timeline_is_capped(self):
+        """Лента обрезается до TIMELINE_LENGTH последних постов."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        posts = [
+            Post.objects.create(author=self.author, text=f'Пост {i}')
+            for i in range(15)
+        ]
+        self.assertLessEqual(TimelineEntry.objects.count(), 11)
+        self.assertEqual(self.timeline()[:10], posts[::-1][:10])
+        self.assertEqual(
+            counters.timeline_count(self.reader.id),
+            TimelineEntry.objects.count())
+
+    def test_celebrity_is_read_on_demand(self):
+        """Посты знаменитости не раскладываются, но видны в ленте."""
+        for i in range(2):
+            Follow.objects.create(
+                user=User.objects.create_user(username=f'fan_{i}'),
+                author=self.author)
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertIn(self.author.id, timeline.celebrities())
+        post = Post.objects.create(author=self.author, text='Для всех')
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertEqual(self.timeline(), [post, self.post])
+
+    def test_demoted_celebrity_backfilled(self):
+        """Подписчики бывшей знаменитости получают её посты в ленту."""
+        fans = [User.objects.create_user(username=f'fan_{i}')
+                for i in range(2)]
+        for fan in fans:
+            Follow.objects.create(user=fan, author=self.author)
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Для всех')
+        Follow.objects.filter(user=fans[0]).delete()
+        self.assertNotIn(self.author.id, timeline.celebrities())
+        self.assertEqual(
+            set(TimelineEntry.objects.filter(post=post).values_list(
+                'user_id', flat=True)),
+            {fans[1].id, self.reader.id})
+
+    def test_celebrities_changed_by_other_process(self):
+        """Набор знаменитостей перечитывается по версии в базе."""
+        self.assertEqual(timeline.celebrities(), set())
+        for i in range(3):
+            Follow.objects.bulk_create([Follow(
+                user=User.objects.create_user(username=f'fan_{i}'),
+                author=self.author)])
+        self.assertEqual(timeline.celebrities(), set())
+        FeedVersion.objects.filter(feed=timeline.CELEBRITIES_FEED).update(
+            version=F('version') + 1)
+        self.assertEqual(timeline.celebrities(), {self.author.id})
+
+    def test_rebuild_command(self):
+        """rebuild_timelines восстанавливает ленты из подписок."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        TimelineEntry.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_timelines', stdout=out)
+        self.assertIn('1', out.getvalue())
+        self.assertEqual(self.timeline(), [self.post])
+
+    def test_profile_shows_follow_state(self):
+        """Кнопка на странице автора меняется после подписки."""
+        url = reverse('posts:profile', args=[self.author.username])
+        self.assertFalse(self.client.get(url).context['following'])
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertTrue(self.client.get(url).context['following'])
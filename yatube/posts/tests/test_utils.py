@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Post
+from posts.utils import (LIMIT_POSTS_ON_PAGE, CursorPaginator, decode_cursor,
+                         encode_cursor)
+
+User = get_user_model()
+
+NUM_OF_POSTS = 25
+
+
+class CursorPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {i}')
+            for i in range(NUM_OF_POSTS)
+        )
+        cls.feed = list(Post.objects.order_by(*CursorPaginator.ordering))
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_cursor_round_trip(self):
+        """Токен курсора раскодируется в исходную позицию."""
+        post = self.feed[0]
+        self.assertEqual(
+            decode_cursor(encode_cursor('next', post)),
+            ('next', (post.pub_date, post.pk))
+        )
+
+    def test_broken_cursor(self):
+        """Битый курсор не ломает ленту, а открывает первую страницу."""
+        broken = encode_cursor('next', self.feed[0])[:5]
+        for token in ('', 'abc', '!!!', broken):
+            with self.subTest(token=token):
+                self.assertIsNone(decode_cursor(token))
+        response = self.guest_client.get(
+            reverse('posts:index'), {'cursor': 'abc'})
+        self.assertEqual(response.context['page_obj'].number, 1)
+
+    def test_walk_feed_by_cursor(self):
+        """По курсорам лента проходится целиком и без повторов."""
+        response = self.guest_client.get(reverse('posts:index'))
+        page = response.context['page_obj']
+        seen = list(page)
+        while page.has_next():
+            response = self.guest_client.get(
+                reverse('posts:index'), {'cursor': page.next_cursor})
+            page = response.context['page_obj']
+            seen.extend(page)
+        self.assertEqual(seen, self.feed)
+
+    def test_previous_cursor(self):
+        """Курсор назад возвращает предыдущую страницу."""
+        paginator = CursorPaginator(Post.objects.all(), LIMIT_POSTS_ON_PAGE)
+        second = paginator.page(2)
+        back = decode_cursor(second.previous_cursor)
+        self.assertEqual(back[0], 'prev')
+        previous = paginator.page_before(back[1])
+        self.assertEqual(
+            list(previous), self.feed[:LIMIT_POSTS_ON_PAGE])
+        self.assertFalse(previous.has_previous())
+        self.assertTrue(previous.has_next())
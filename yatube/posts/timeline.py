@@ -0,0 +1,247 @@
+"""Материализованные ленты подписок (fan-out on write).
+
+Новый пост сразу раскладывается записями TimelineEntry по лентам
+подписчиков автора, и чтение ленты - выборка по индексу одной ленты.
+Лента хранит не больше TIMELINE_LENGTH последних постов, её размер
+ведётся счётчиком в PostCounter. Авторы, у которых подписчиков не меньше
+TIMELINE_CELEBRITY_FOLLOWERS, не раскладываются: их посты добавляются
+к ленте при чтении (fan-out on read). Набор знаменитостей кэшируется
+по версии CELEBRITIES_FEED из таблицы FeedVersion, так что его смену
+видят все процессы.
+"""
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, F, Q
+
+from . import cache, counters, utils
+from .models import Follow, Post, PostCounter, TimelineEntry
+
+CELEBRITIES_FEED = 'celebrities'
+CELEBRITIES_KEY = 'timeline:celebrities:{}'
+TRIM_SQL = (
+    'DELETE FROM {table} WHERE id IN ('
+    'SELECT id FROM (SELECT id, ROW_NUMBER() OVER ('
+    'PARTITION BY user_id ORDER BY pub_date DESC, post_id DESC) AS position '
+    'FROM {table} WHERE user_id IN ({users})) ranked '
+    'WHERE position > %s)'
+)
+
+
+def _length():
+    return settings.TIMELINE_LENGTH
+
+
+def _trim_limit():
+    # Ленты обрезаются с запасом в 10%, а не после каждого поста.
+    return _length() + max(_length() // 10, 1)
+
+
+def celebrities():
+    """ID авторов, посты которых читаются при чтении ленты."""
+    version, = cache.feed_versions(CELEBRITIES_FEED)
+    key = CELEBRITIES_KEY.format(version)
+    stored = cache.get_cache().get(key)
+    if stored is None:
+        stored = set(
+            Follow.objects.values('author').annotate(
+                followers=Count('pk')
+            ).filter(
+                followers__gte=settings.TIMELINE_CELEBRITY_FOLLOWERS
+            ).order_by().values_list('author', flat=True)
+        )
+        cache.get_cache().set(key, stored, settings.FEED_CACHE_TIMEOUT)
+    return stored
+
+
+def follower_count(author_id, limit):
+    """Число подписчиков автора, но не больше limit."""
+    return Follow.objects.filter(author_id=author_id)[:limit].count()
+
+
+def check_celebrity(author_id, followed):
+    """Сбрасывает набор знаменитостей, если автор пересёк порог.
+
+    Ленты подписчиков автора, который перестал быть знаменитостью,
+    пересобираются: его посты больше не добавляются при чтении.
+    """
+    threshold = settings.TIMELINE_CELEBRITY_FOLLOWERS
+    crossed = threshold if followed else threshold - 1
+    if follower_count(author_id, threshold + 1) != crossed:
+        return
+    cache.bump(CELEBRITIES_FEED)
+    if not followed:
+        rebuild(list(Follow.objects.filter(
+            author_id=author_id).values_list('user_id', flat=True)))
+
+
+def trim(user_ids):
+    """Обрезает ленты читателей до TIMELINE_LENGTH последних постов."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    sql = TRIM_SQL.format(
+        table=TimelineEntry._meta.db_table,
+        users=', '.join(['%s'] * len(user_ids)),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*user_ids, _length()])
+    PostCounter.objects.filter(
+        scope=PostCounter.TIMELINE, object_id__in=user_ids,
+        count__gt=_length(),
+    ).update(count=_length())
+
+
+def _grow(user_ids):
+    """Увеличивает размеры лент на добавленный пост.
+
+    Возвращает читателей, ленты которых пора обрезать.
+    """
+    sizes = PostCounter.objects.filter(
+        scope=PostCounter.TIMELINE, object_id__in=user_ids)
+    sizes.update(count=F('count') + 1)
+    sizes = dict(sizes.values_list('object_id', 'count'))
+    for user_id in set(user_ids) - set(sizes):
+        # Счётчик считается по таблице уже с новой записью.
+        sizes[user_id] = counters.timeline_count(user_id)
+    return [
+        user_id for user_id, size in sizes.items() if size > _trim_limit()
+    ]
+
+
+def fan_out(post):
+    """Раскладывает пост по лентам подписчиков автора.
+
+    Возвращает число лент, в которые попал пост.
+    """
+    if post.author_id in celebrities():
+        return 0
+    followers = list(Follow.objects.filter(
+        author_id=post.author_id).values_list('user_id', flat=True))
+    if not followers:
+        return 0
+    TimelineEntry.objects.bulk_create((
+        TimelineEntry(
+            user_id=user_id, post_id=post.pk, pub_date=post.pub_date)
+        for user_id in followers
+    ), ignore_conflicts=True)
+    trim(_grow(followers))
+    return len(followers)
+
+
+def _set_size(user_id):
+    size = TimelineEntry.objects.filter(user_id=user_id).count()
+    PostCounter.objects.update_or_create(
+        scope=PostCounter.TIMELINE, object_id=user_id,
+        defaults={'count': size},
+    )
+    return size
+
+
+def follow(user_id, author_id):
+    """Добавляет в ленту читателя последние посты нового автора."""
+    check_celebrity(author_id, followed=True)
+    if author_id in celebrities():
+        return
+    posts = Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date', '-pk').values_list('pk', 'pub_date')[:_length()]
+    TimelineEntry.objects.bulk_create((
+        TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+        for pk, pub_date in posts
+    ), ignore_conflicts=True)
+    if _set_size(user_id) > _length():
+        trim([user_id])
+
+
+def unfollow(user_id, author_id):
+    """Убирает из ленты читателя посты автора."""
+    check_celebrity(author_id, followed=False)
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id).delete()
+    _set_size(user_id)
+
+
+def remove_post(post_id):
+    """Уменьшает размеры лент, из которых каскадом уйдёт пост."""
+    PostCounter.objects.filter(
+        scope=PostCounter.TIMELINE, count__gt=0,
+        object_id__in=TimelineEntry.objects.filter(
+            post_id=post_id).values('user_id'),
+    ).update(count=F('count') - 1)
+
+
+def rebuild(user_ids=None):
+    """Пересобирает ленты по подпискам, по умолчанию - все.
+
+    Возвращает число записей в пересобранных лентах.
+    """
+    cache.bump(CELEBRITIES_FEED)
+    stars = celebrities()
+    follows = Follow.objects.exclude(author_id__in=stars)
+    entries = TimelineEntry.objects.all()
+    if user_ids is not None:
+        follows = follows.filter(user_id__in=user_ids)
+        entries = entries.filter(user_id__in=user_ids)
+    else:
+        user_ids = Follow.objects.values_list(
+            'user_id', flat=True).distinct()
+        PostCounter.objects.filter(scope=PostCounter.TIMELINE).delete()
+    entries.delete()
+    authors = {}
+    for user_id, author_id in follows.values_list('user_id', 'author_id'):
+        authors.setdefault(user_id, []).append(author_id)
+    total = 0
+    for user_id in user_ids:
+        posts = Post.objects.filter(
+            author_id__in=authors.get(user_id, ())
+        ).order_by('-pub_date', '-pk').values_list(
+            'pk', 'pub_date')[:_length()]
+        TimelineEntry.objects.bulk_create(
+            TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+            for pk, pub_date in posts
+        )
+        total += _set_size(user_id)
+    return total
+
+
+def followed_celebrities(user_id):
+    """Знаменитости, на которых подписан читатель."""
+    stars = celebrities()
+    if not stars:
+        return set()
+    return stars.intersection(Follow.objects.filter(
+        user_id=user_id).values_list('author_id', flat=True))
+
+
+def timeline_posts(user_id, stars=None):
+    """Посты ленты подписок читателя для utils.paginator."""
+    condition = Q(pk__in=TimelineEntry.objects.filter(
+        user_id=user_id).values('post_id'))
+    if stars is None:
+        stars = followed_celebrities(user_id)
+    if stars:
+        condition |= Q(author_id__in=stars)
+    return utils.feed().filter(condition)
+
+
+def timeline_entries(user_id):
+    """Записи ленты читателя вместе с постами для TimelinePaginator."""
+    return TimelineEntry.objects.filter(user_id=user_id).select_related(
+        'post__author', 'post__group',
+    ).only('pub_date', 'post', *(
+        f'post__{field}' for field in utils.FEED_FIELDS))
+
+
+def timeline_page(request, user_id):
+    """Страница ленты подписок читателя.
+
+    Без знаменитостей страница читается из записей ленты, а число
+    постов берётся из счётчика ленты. Посты знаменитостей в записи не
+    раскладываются, поэтому с ними страница собирается из постов, и их
+    число считается запросом.
+    """
+    stars = followed_celebrities(user_id)
+    if stars:
+        return utils.paginator(request, timeline_posts(user_id, stars))
+    return utils.paginator(
+        request, timeline_entries(user_id), counters.timeline_count(user_id),
+        paginator_class=utils.TimelinePaginator)
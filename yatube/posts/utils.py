@@ -1,10 +1,328 @@
-from django.core.paginator import Paginator
+import base64
+import binascii
+import json
+
+from django.core.paginator import Page, Paginator
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .models import Group, Post, title_key
 
 
 LIMIT_POSTS_ON_PAGE: int = 10
+# Номера страниц в навигации: соседи текущей и края ленты.
+PAGE_WINDOW_ON_EACH_SIDE: int = 2
+PAGE_WINDOW_ON_ENDS: int = 1
+GROUP_LOOKUP_PAGE_SIZE: int = 20
+# Больше любого символа: верхняя граница диапазона строк с префиксом.
+MAX_CHAR = '\U0010ffff'
+
+# Поля, которые выводят шаблоны лент.
+FEED_FIELDS = (
+    'text',
+    'pub_date',
+    'author',
+    'author__username',
+    'author__first_name',
+    'author__last_name',
+    'group',
+    'group__slug',
+)
+
+
+def insert_posts(posts):
+    """Вставляет новые посты пачками с их pub_date и updated.
+
+    Вставка идёт как у loaddata (raw): auto_now и auto_now_add не
+    затирают даты только этих постов, а поля модели не меняются, так
+    что другие потоки сохраняют посты как обычно. Сигналы, как и у
+    bulk_create, не отправляются.
+    """
+    posts = list(posts)
+    fields = [
+        field for field in Post._meta.concrete_fields
+        if not field.primary_key
+    ]
+    using = router.db_for_write(Post)
+    size = max(connections[using].ops.bulk_batch_size(fields, posts), 1)
+    with transaction.atomic(using=using, savepoint=False):
+        for start in range(0, len(posts), size):
+            Post.objects._insert(
+                posts[start:start + size], fields=fields, raw=True,
+                using=using)
+
+
+def feed(**filters):
+    """Посты для лент вместе с автором и группой одним запросом."""
+    return Post.objects.filter(**filters).select_related(
+        'author', 'group').only(*FEED_FIELDS)
+
+
+def prefix_filter(field, prefix):
+    """Условие "field начинается с prefix" в виде диапазона.
+
+    LIKE в SQLite не различает регистр и поэтому не идёт по обычному
+    индексу, а сравнение строк идёт.
+    """
+    return Q(**{f'{field}__gte': prefix, f'{field}__lt': prefix + MAX_CHAR})
+
+
+def groups_by_prefix(prefix):
+    """Группы, название которых начинается с prefix без учёта регистра.
+
+    Порядок - по ключу названия и id, как в индексе group_title_key_idx.
+    """
+    groups = Group.objects.order_by('title_key', 'pk')
+    if not prefix:
+        return groups
+    return groups.filter(prefix_filter('title_key', title_key(prefix)))
+
+
+def groups_after(groups, position):
+    """Группы groups_by_prefix после position = (title_key, pk)."""
+    key, pk = position
+    return groups.filter(title_key__gte=key).exclude(
+        title_key=key, pk__lte=pk)
+
+
+def encode_group_cursor(group):
+    """Непрозрачный токен позиции группы в подсказках."""
+    payload = json.dumps([group.title_key, group.pk])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_group_cursor(token):
+    """Разбирает токен encode_group_cursor, для битого возвращает None."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        key, pk = json.loads(
+            base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeError, ValueError, TypeError):
+        return None
+    if not isinstance(key, str) or not isinstance(pk, int):
+        return None
+    return key, pk
+
+
+class NumberedPage(Page):
+    """Страница с коротким окном номеров для навигации."""
+
+    @cached_property
+    def page_window(self):
+        """Номера страниц для навигации, None - пропуск между ними."""
+        return tuple(self.paginator.get_elided_page_range(self.number))
+
+
+class FeedPage(NumberedPage):
+    """Страница ленты с курсорами на соседние страницы."""
+
+    is_cursor = False
+
+    @cached_property
+    def next_cursor(self):
+        if not self.has_next() or not len(self):
+            return None
+        return encode_cursor('next', self[-1])
+
+    @cached_property
+    def previous_cursor(self):
+        if not self.has_previous() or not len(self):
+            return None
+        return encode_cursor('prev', self[0])
+
+
+class CursorPage(FeedPage):
+    """Страница ключевой (keyset) паджинации.
+
+    Номер страницы неизвестен, поэтому переходы идут только по курсорам.
+    Посты читаются при первом обращении к странице, поэтому страница из
+    кэша лент запроса не делает. Если за курсором постов нет, например
+    их удалили, выводится начало ленты.
+    """
+
+    is_cursor = True
+    page_window = ()
+
+    def __init__(self, rows, paginator, forward):
+        """rows - ещё не выполненный запрос постов от курсора."""
+        self.number = None
+        self.paginator = paginator
+        self._rows = rows
+        self._forward = forward
+
+    def __repr__(self):
+        return '<Cursor page %s>' % (self.next_cursor or self.previous_cursor)
+
+    @cached_property
+    def _page(self):
+        """Посты страницы и признаки соседних страниц."""
+        per_page = self.paginator.per_page
+        rows = self.paginator.page_posts(self._rows[:per_page + 1])
+        more = len(rows) > per_page
+        rows = rows[:per_page]
+        if not rows:
+            rows = self.paginator.page_posts(
+                self.paginator.object_list[:per_page + 1])
+            return rows[:per_page], len(rows) > per_page, False
+        if self._forward:
+            return rows, more, True
+        return rows[::-1], True, more
+
+    @property
+    def object_list(self):
+        return self._page[0]
+
+    def has_next(self):
+        return self._page[1]
+
+    def has_previous(self):
+        return self._page[2]
+
+    def start_index(self):
+        return None
+
+    def end_index(self):
+        return None
+
+
+class NumberedPaginator(Paginator):
+    """Paginator, страницы которого знают окно номеров вокруг себя."""
+
+    def get_elided_page_range(self, number,
+                              on_each_side=PAGE_WINDOW_ON_EACH_SIDE,
+                              on_ends=PAGE_WINDOW_ON_ENDS):
+        """Первые, последние и соседние с number номера страниц.
+
+        Вместо остальных номеров - None, поэтому длина не зависит от
+        числа страниц.
+        """
+        num_pages = self.num_pages
+        if num_pages <= (on_each_side + on_ends) * 2 + 1:
+            yield from self.page_range
+            return
+        if number > on_each_side + on_ends + 2:
+            yield from range(1, on_ends + 1)
+            yield None
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < num_pages - on_each_side - on_ends - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield None
+            yield from range(num_pages - on_ends + 1, num_pages + 1)
+        else:
+            yield from range(number + 1, num_pages + 1)
+
+    def _get_page(self, *args, **kwargs):
+        return NumberedPage(*args, **kwargs)
+
+
+class CursorPaginator(NumberedPaginator):
+    """Paginator с курсорами по (pub_date, id) вместо OFFSET.
+
+    Номерные страницы по-прежнему доступны через page()/get_page(),
+    а page_after()/page_before() выбирают соседнюю страницу одним
+    запросом WHERE ... LIMIT без подсчёта строк и без OFFSET.
+    Условие записано как диапазон по pub_date, чтобы SQLite искал
+    по индексу ленты, а не просматривал его с начала.
+    """
+
+    ordering = ('-pub_date', '-pk')
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list.order_by(*self.ordering), per_page,
+                         **kwargs)
+        if count is not None:
+            # Число постов из posts.counters вместо COUNT(*).
+            self.count = count
+
+    def posts_after(self, position):
+        """Посты, идущие в ленте после position = (pub_date, pk)."""
+        pub_date, pk = position
+        return self.object_list.filter(pub_date__lte=pub_date).exclude(
+            pub_date=pub_date, pk__gte=pk)
+
+    def posts_before(self, position):
+        """Посты, идущие в ленте перед position, от ближайшего к нему."""
+        pub_date, pk = position
+        return self.object_list.filter(pub_date__gte=pub_date).exclude(
+            pub_date=pub_date, pk__lte=pk).reverse()
+
+    def page_after(self, position):
+        """Страница постов, идущих в ленте после position."""
+        return CursorPage(self.posts_after(position), self, forward=True)
+
+    def page_before(self, position):
+        """Страница постов, идущих в ленте перед position."""
+        return CursorPage(self.posts_before(position), self, forward=False)
+
+    def page_posts(self, rows):
+        """Посты страницы из выбранных строк."""
+        return list(rows)
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
+
+
+class TimelinePaginator(CursorPaginator):
+    """CursorPaginator по записям ленты подписок, страницы - их посты.
+
+    Записи одного читателя идут по индексу timeline_user_idx, а пост
+    с автором и группой приходит тем же запросом. Дата записи - копия
+    даты поста, поэтому курсоры те же, что у лент постов.
+    """
+
+    ordering = ('-pub_date', '-post_id')
+
+    def posts_after(self, position):
+        pub_date, pk = position
+        return self.object_list.filter(pub_date__lte=pub_date).exclude(
+            pub_date=pub_date, post_id__gte=pk)
+
+    def posts_before(self, position):
+        pub_date, pk = position
+        return self.object_list.filter(pub_date__gte=pub_date).exclude(
+            pub_date=pub_date, post_id__lte=pk).reverse()
+
+    def page_posts(self, rows):
+        return [entry.post for entry in rows]
+
+    def _get_page(self, object_list, *args, **kwargs):
+        return super()._get_page(
+            self.page_posts(object_list), *args, **kwargs)
+
+
+def encode_cursor(direction, post):
+    """Непрозрачный токен позиции поста в ленте."""
+    payload = json.dumps([direction, post.pub_date.isoformat(), post.pk])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Разбирает токен курсора, для битого токена возвращает None."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        direction, pub_date, pk = json.loads(
+            base64.urlsafe_b64decode(padded.encode()).decode())
+        pub_date = parse_datetime(pub_date)
+    except (binascii.Error, UnicodeError, ValueError, TypeError):
+        return None
+    if direction not in ('next', 'prev') or pub_date is None:
+        return None
+    if not isinstance(pk, int):
+        return None
+    return direction, (pub_date, pk)
 
 
-def paginator(request, post_list):
-    page_number = request.GET.get('page')
-    paginator = Paginator(post_list, LIMIT_POSTS_ON_PAGE).get_page(page_number)
-    return paginator
+def paginator(request, post_list, count=None,
+              paginator_class=CursorPaginator):
+    paginator = paginator_class(post_list, LIMIT_POSTS_ON_PAGE, count=count)
+    cursor = decode_cursor(request.GET.get('cursor', ''))
+    if cursor is None:
+        return paginator.get_page(request.GET.get('page'))
+    direction, position = cursor
+    if direction == 'next':
+        return paginator.page_after(position)
+    return paginator.page_before(position)
@@ -1,62 +1,121 @@
+from urllib.parse import urlencode
+
 from django.contrib.auth.decorators import login_required
+from django.http import (Http404, HttpResponseBadRequest, JsonResponse,
+                         StreamingHttpResponse)
 from django.shortcuts import get_object_or_404, redirect, render
 
-from . import utils
+from . import (cache, conditional, counters, export, groups, post_cache,
+               search, timeline, utils)
 from .forms import PostForm
-from .models import Group, Post, User
+from .models import Follow, Post, PostCounter, User
 
 
 LIMIT_POSTS_ON_PAGE: int = 10
 
 
+@conditional.feed_condition(conditional.index_feed)
 def index(request):
     """Все посты, разбивает по LIMIT_POSTS_ON_PAGE штук на странице"""
-    post_list = Post.objects.select_related('author', 'group')
+    post_list = utils.feed()
     return render(
         request, 'posts/index.html', {
-            'page_obj': utils.paginator(request, post_list),
+            'page_obj': utils.paginator(
+                request, post_list,
+                counters.request_count(request, PostCounter.TOTAL)),
+            'feed': cache.INDEX_FEED,
         }
     )
 
 
+@conditional.feed_condition(conditional.group_feed)
 def group_posts(request, slug):
     """Посты группы, разбивает по LIMIT_POSTS_ON_PAGE штук на странице."""
-    group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
+    group = groups.get_group_or_404(slug)
+    post_list = utils.feed(group=group)
     context = {
         'group': group,
-        'page_obj': utils.paginator(request, post_list),
+        'page_obj': utils.paginator(
+            request, post_list,
+            counters.request_count(request, PostCounter.GROUP, group.id)),
+        'feed': cache.group_feed(group.id),
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@conditional.feed_condition(conditional.profile_feed)
 def profile(request, username):
     """Посты автора, разбивает по LIMIT_POSTS_ON_PAGE штук на странице."""
     author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
-    post_count = post_list.count()
+    post_list = utils.feed(author=author)
+    post_count = counters.request_count(
+        request, PostCounter.AUTHOR, author.id)
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user, author=author).exists()
     context = {
         'author': author,
-        'page_obj': utils.paginator(request, post_list),
+        'page_obj': utils.paginator(request, post_list, post_count),
         'posts_count': post_count,
+        'following': following,
+        'feed': cache.profile_feed(author.id),
     }
     return render(request, 'posts/profile.html', context)
 
 
+@conditional.post_condition
 def post_detail(request, post_id):
     """Выводит определенный пост и инф о нем."""
-    post = get_object_or_404(Post.objects.select_related(
-        'author',
-        'group',
-    ), id=post_id)
-    posts_count = Post.objects.filter(author=post.author).count()
+    entry = post_cache.request_entry(request, post_id)
+    if entry is None:
+        raise Http404('Пост не найден')
     context = {
-        'post': post,
-        'posts_count': posts_count,
+        'post': entry['post'],
+        'posts_count': entry['posts_count'],
+        'group_slug': entry['group_slug'],
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@login_required
+def follow_index(request):
+    """Посты авторов, на которых подписан пользователь."""
+    context = {
+        'page_obj': timeline.timeline_page(request, request.user.id),
+    }
+    return render(request, 'posts/follow.html', context)
+
+
+@login_required
+def profile_follow(request, username):
+    """Подписка на автора."""
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        Follow.objects.get_or_create(user=request.user, author=author)
+    return redirect('posts:profile', username)
+
+
+@login_required
+def profile_unfollow(request, username):
+    """Отписка от автора."""
+    Follow.objects.filter(
+        user=request.user, author__username=username).delete()
+    return redirect('posts:profile', username)
+
+
+def search_posts(request):
+    """Поиск постов по тексту, лучшие совпадения первыми."""
+    query = request.GET.get('q', '').strip()
+    page_obj = utils.NumberedPaginator(
+        search.SearchResults(query), utils.LIMIT_POSTS_ON_PAGE
+    ).get_page(request.GET.get('page'))
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'extra_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
 def post_create(request, is_edit=False):
     """Создание нового поста."""
@@ -86,3 +145,54 @@ def post_edit(request, post_id):
         post.save()
         return redirect('posts:post_detail', post_id)
     return render(request, "posts/create_post.html", context)
+
+
+@login_required
+def group_lookup(request):
+    """Группы по началу названия для GroupPicker, постранично.
+
+    Ответ в формате select2: results и pagination.more, следующую
+    страницу отдаёт pagination.cursor.
+    """
+    prefix = request.GET.get('q', '').strip()
+    groups = utils.groups_by_prefix(prefix)
+    position = utils.decode_group_cursor(request.GET.get('cursor', ''))
+    if position is not None:
+        groups = utils.groups_after(groups, position)
+    size = utils.GROUP_LOOKUP_PAGE_SIZE
+    # Лишняя строка показывает, есть ли следующая страница, без COUNT(*).
+    rows = list(groups.only('title', 'title_key')[:size + 1])
+    more = len(rows) > size
+    return JsonResponse({
+        'results': [
+            {'id': group.pk, 'text': group.title} for group in rows[:size]],
+        'pagination': {
+            'more': more,
+            'cursor': utils.encode_group_cursor(rows[size - 1])
+            if more else None,
+        },
+    })
+
+
+@login_required
+def export_posts(request):
+    """Выгрузка постов потоком в JSONL или CSV, при gzip=1 - в архиве."""
+    file_format = request.GET.get('format', 'jsonl')
+    if file_format not in export.FORMATS:
+        return HttpResponseBadRequest('Неизвестный формат выгрузки')
+    try:
+        filters = export.parse_filters(request.GET)
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    compress = request.GET.get('gzip') == '1'
+    filename = f'posts.{file_format}'
+    content_type = export.CONTENT_TYPES[file_format]
+    if compress:
+        filename += '.gz'
+        content_type = export.GZIP_CONTENT_TYPE
+    response = StreamingHttpResponse(
+        export.export_chunks(file_format, compress, **filters),
+        content_type=content_type,
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
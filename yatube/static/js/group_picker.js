@@ -0,0 +1,64 @@
+// Подсказки групп для GroupPicker: список <select> заполняется
+// страницами ответа posts:group_lookup по началу названия.
+(function () {
+  'use strict';
+
+  function setup(select) {
+    var url = select.dataset.lookupUrl;
+    var search = document.createElement('input');
+    var more = document.createElement('button');
+    var state = {query: '', cursor: null, timer: null};
+    search.type = 'search';
+    search.className = 'form-control mb-2';
+    search.placeholder = 'Начало названия группы';
+    more.type = 'button';
+    more.className = 'btn btn-link px-0';
+    more.textContent = 'Показать ещё';
+    more.hidden = true;
+    select.parentNode.insertBefore(search, select);
+    select.parentNode.insertBefore(more, select.nextSibling);
+
+    function load(append) {
+      var params = new URLSearchParams({q: state.query});
+      if (append && state.cursor) {
+        params.set('cursor', state.cursor);
+      }
+      fetch(url + '?' + params, {credentials: 'same-origin'})
+        .then(function (response) { return response.json(); })
+        .then(function (data) {
+          if (!append) {
+            // Пустой вариант и выбранная группа остаются в списке.
+            Array.prototype.slice.call(select.options).forEach(
+              function (option) {
+                if (option.value && !option.selected) {
+                  option.remove();
+                }
+              });
+          }
+          data.results.forEach(function (group) {
+            if (!select.querySelector('option[value="' + group.id + '"]')) {
+              select.add(new Option(group.text, group.id));
+            }
+          });
+          state.cursor = data.pagination.cursor;
+          more.hidden = !data.pagination.more;
+        });
+    }
+
+    search.addEventListener('input', function () {
+      clearTimeout(state.timer);
+      state.timer = setTimeout(function () {
+        state.query = search.value.trim();
+        load(false);
+      }, 250);
+    });
+    more.addEventListener('click', function () {
+      load(true);
+    });
+    load(false);
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('select[data-lookup-url]').forEach(setup);
+  });
+}());
@@ -0,0 +1,11 @@
+from core.tasks import task
+
+from .forms import QueuedPasswordResetForm
+
+
+@task
+def send_password_reset(email, domain, use_https):
+    """Ищет пользователей с адресом email и ставит им письма сброса."""
+    form = QueuedPasswordResetForm({'email': email})
+    if form.is_valid():
+        form.save(domain_override=domain, use_https=use_https)
@@ -1,6 +1,6 @@
 from django.contrib.auth.views import LogoutView, LoginView
 from django.contrib.auth.views import PasswordResetCompleteView
-from django.contrib.auth.views import PasswordResetView, PasswordChangeView
+from django.contrib.auth.views import PasswordChangeView
 from django.contrib.auth.views import PasswordChangeDoneView
 from django.contrib.auth.views import PasswordResetConfirmView
 
@@ -39,11 +39,17 @@ urlpatterns = [
     ),
     path(
         'password_reset_form/',
-        PasswordResetView.as_view(
+        views.QueuedPasswordResetView.as_view(
             template_name='users/password_reset_form.html'
         ),
         name='password_reset_form'
     ),
+    # Заменяет синхронный сброс из django.contrib.auth.urls.
+    path(
+        'password_reset/',
+        views.QueuedPasswordResetView.as_view(),
+        name='password_reset'
+    ),
     path(
         'password_reset_done/',
         PasswordChangeDoneView.as_view(
@@ -1,9 +1,28 @@
+from django.contrib.auth.views import PasswordResetView
+from django.http import HttpResponseRedirect
 from django.views.generic import CreateView
 from django.urls import reverse_lazy
 from .forms import CreationForm
+from .tasks import send_password_reset
 
 
 class SignUp(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy('posts:index')
     template_name = 'users/signup.html'
+
+
+class QueuedPasswordResetView(PasswordResetView):
+    """Сброс пароля, который не ищет пользователя и не ждёт почту.
+
+    Ответ не зависит от того, есть ли такой адрес и как быстро работает
+    почтовый сервер: всё это делает задача send_password_reset.
+    """
+
+    def form_valid(self, form):
+        send_password_reset.delay(
+            form.cleaned_data['email'],
+            self.request.get_host(),
+            self.request.is_secure(),
+        )
+        return HttpResponseRedirect(self.get_success_url())
@@ -0,0 +1,19 @@
+"""
+ASGI config for yatube project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Django 2.2 has no ASGI support, so the WSGI application from yatube/wsgi.py
+runs in a bounded thread pool (ASGI_THREADS) behind core.asgi.WsgiToAsgi.
+
+Usage: uvicorn yatube.asgi:application
+
+uvicorn is an optional dependency pinned in requirements.txt; the WSGI
+deployment and the test suite do not need it.
+"""
+
+from django.conf import settings
+
+from core.asgi import WsgiToAsgi
+from yatube.wsgi import application as wsgi_application
+
+application = WsgiToAsgi(wsgi_application, settings.ASGI_THREADS)
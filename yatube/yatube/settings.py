@@ -23,7 +23,7 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SECRET_KEY = '!0^2_npo87vs8q+9ywj7r3q79$^zpk@604tiksf3#$8358_a-8'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv('DEBUG', '1') == '1'
 
 ALLOWED_HOSTS = [
     'localhost',
@@ -49,6 +49,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -64,7 +67,7 @@ LOGIN_REDIRECT_URL = 'posts:index'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backend.MetricsDjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -81,6 +84,13 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+# Потоки, в которых yatube/asgi.py выполняет view и запросы к базе.
+ASGI_THREADS = 16
+
+# Токен страницы /metrics: Prometheus передаёт его в заголовке
+# Authorization: Bearer. Без токена страница выключена.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
 
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
@@ -89,10 +99,89 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Подключение переживает запрос, см. core/sqlite.py.
+        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', 60)),
+    }
+}
+
+# Реплики для чтения лент, см. core/routers.py. Для проверки на одной
+# машине: SQLITE_REPLICAS=/tmp/replica.sqlite3 и периодический запуск
+# manage.py sync_replicas, который копирует default в файлы реплик.
+DATABASE_REPLICAS = []
+for number, path in enumerate(
+        filter(None, os.getenv('SQLITE_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
     }
+    DATABASE_REPLICAS.append(f'replica{number}')
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+# Сколько после записи пользователь читает default: дольше, чем
+# интервал sync_replicas плюс время копирования.
+REPLICA_PIN_COOKIE = 'replica_pin'
+REPLICA_PIN_SECONDS = 30
+
+# PRAGMA для каждого нового подключения SQLite, см. core/sqlite.py.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    # Отрицательный cache_size - размер в КиБ: 64 МиБ страниц в памяти.
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory',
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+# Бэкенд меняется переменными окружения, например
+# CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+# CACHE_LOCATION=/var/tmp/yatube_cache
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+FEED_CACHE_ALIAS = 'default'
+FEED_CACHE_TIMEOUT = 300
+
+# Реестр групп в памяти процесса: как часто сверять поколение с кэшем
+# лент и до какого числа групп держать их в памяти.
+GROUP_REGISTRY_CHECK_INTERVAL = 1.0
+GROUP_REGISTRY_MAX_SIZE = 10_000
+
+# Кэш страниц постов: время жизни записи и ожидание загрузчика при
+# промахе.
+POST_CACHE_TIMEOUT = 300
+POST_CACHE_LOCK_TIMEOUT = 5
+POST_CACHE_POLL_INTERVAL = 0.01
+
+# Ленты подписок: сколько постов хранится у читателя и со скольких
+# подписчиков автор читается при чтении ленты, а не раскладывается по ним.
+TIMELINE_LENGTH = 1000
+TIMELINE_CELEBRITY_FOLLOWERS = 1000
+
+# Ответы короче этого размера в байтах не сжимаются, см. core/compression.py.
+COMPRESS_MIN_SIZE = 1024
+
+# Фоновые задачи, см. core/tasks.py. Без TASKS_EAGER задачи выполняет
+# manage.py run_workers; задержки - в секундах.
+TASKS_EAGER = os.getenv('TASKS_EAGER') == '1'
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_DELAY = 10
+TASK_RETRY_MAX_DELAY = 3600
+TASK_TIMEOUT = 300
+TASK_BATCH_SIZE = 50
+TASK_WORKERS = 2
+
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -133,5 +222,24 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Без DEBUG статика собирается collectstatic в STATIC_ROOT с хэшами в
+# именах и сжатыми копиями и отдаётся из yatube/wsgi.py, см. core/static.py.
+STATIC_ROOT = os.path.join(BASE_DIR, 'static_collected')
+SERVE_STATIC = not DEBUG
+STATIC_MAX_AGE = 60
+if not DEBUG:
+    STATICFILES_STORAGE = (
+        'core.storage.CompressedManifestStaticFilesStorage')
+
+EMAIL_BACKEND = os.getenv(
+    'EMAIL_BACKEND', 'django.core.mail.backends.filebased.EmailBackend')
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', 25))
+EMAIL_TIMEOUT = 10
+
+# Очередь почты, см. core/mail.py: письма уходят пачками, а одному
+# получателю - не больше MAIL_RECIPIENT_LIMIT писем за период в секундах.
+MAIL_BATCH_SIZE = 100
+MAIL_RECIPIENT_LIMIT = 5
+MAIL_RECIPIENT_PERIOD = 3600
@@ -0,0 +1,42 @@
+"""
+Production settings for yatube project.
+
+Usage: DJANGO_SETTINGS_MODULE=yatube.settings_production
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import ALLOWED_HOSTS, SECRET_KEY, TEMPLATES
+
+SECRET_KEY = os.getenv('SECRET_KEY', SECRET_KEY)
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.getenv(
+    'ALLOWED_HOSTS', ','.join(ALLOWED_HOSTS)).split(',')
+
+# Шаблоны читаются и разбираются один раз на процесс.
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+# Прогрев кэша шаблонов при старте WSGI-процесса, см. yatube/wsgi.py.
+PRELOAD_TEMPLATES = True
+
+# Переключатели статики в settings.py считаются по DEBUG из settings.py,
+# поэтому здесь они пересчитываются для DEBUG = False.
+SERVE_STATIC = True
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
@@ -9,8 +9,20 @@ https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+if settings.SERVE_STATIC:
+    from core.static import StaticFilesApplication
+    application = StaticFilesApplication(
+        application, settings.STATIC_ROOT, settings.STATIC_URL,
+        settings.STATIC_MAX_AGE,
+    )
+
+if getattr(settings, 'PRELOAD_TEMPLATES', False):
+    from core.templates_warmup import warm_templates
+    warm_templates()